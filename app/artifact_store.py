@@ -0,0 +1,251 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+
+INDEX_FILE = 'index.sqlite'
+META_FILE = 'meta.json'
+RESPONSE_FILE = 'response.json'
+
+# Format of new_run_id; IDs from URLs must match it before they touch the file system
+RUN_ID_PATTERN = re.compile(r'\d{8}-\d{6}-[0-9a-f]{8}')
+
+def new_run_id():
+    """Run ID that sorts by creation time."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+def _connect(root):
+    os.makedirs(root, exist_ok=True)
+    # Several worker processes write the index; they wait for each other's locks
+    conn = sqlite3.connect(os.path.join(root, INDEX_FILE), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS runs ("
+        "run_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, "
+        "finished_at REAL, score REAL, size_bytes INTEGER NOT NULL DEFAULT 0, files TEXT, cache_key TEXT)"
+    )
+    # Indexes written before results were cached lack the key column
+    if 'cache_key' not in {row['name'] for row in conn.execute("PRAGMA table_info(runs)")}:
+        conn.execute("ALTER TABLE runs ADD COLUMN cache_key TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS runs_cache_key ON runs (cache_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS runs_status_finished ON runs (status, finished_at)")
+    return conn
+
+def _row(row):
+    record = dict(row)
+    record['files'] = json.loads(record['files']) if record['files'] else {}
+    return record
+
+def is_run_id(value):
+    """Whether value has the format of new_run_id."""
+    return isinstance(value, str) and RUN_ID_PATTERN.fullmatch(value) is not None
+
+def run_dir(root, run_id):
+    """Directory of a run; raises ValueError for anything that is not a run ID."""
+    if not is_run_id(run_id):
+        raise ValueError(f"Invalid run ID: {run_id!r}")
+    return os.path.join(root, run_id)
+
+def create_run(root, run_id=None):
+    """
+    Create the directory of a new run and index it as running.
+
+    Returns:
+        tuple: (run_id, directory)
+    """
+    run_id = run_id or new_run_id()
+    directory = run_dir(root, run_id)
+    os.makedirs(directory, exist_ok=True)
+    with _connect(root) as conn:
+        conn.execute("INSERT OR REPLACE INTO runs (run_id, status, created_at) VALUES (?, ?, ?)",
+                     (run_id, 'running', time.time()))
+    conn.close()
+    return run_id, directory
+
+def record_run(root, run_id, metadata, files=None, response=None, cache_key=None):
+    """
+    Finish a run: write its metadata next to its artifacts and update the index.
+
+    Args:
+        root: Artifact root directory
+        run_id: ID returned by create_run
+        metadata: JSON-serializable dict; 'status' and 'score' are also indexed
+        files: Optional dict of artifact name to path
+        response: Optional response of the run, stored for find_cached_run
+        cache_key: Optional result cache key the response is found under
+
+    Returns:
+        dict: Index record of the run
+    """
+    directory = run_dir(root, run_id)
+    with open(os.path.join(directory, META_FILE), 'w') as f:
+        json.dump(metadata, f, indent=2, default=str)
+    if response is not None:
+        with open(os.path.join(directory, RESPONSE_FILE), 'w') as f:
+            json.dump(response, f, default=str)
+    size = _dir_size(directory)
+
+    with _connect(root) as conn:
+        conn.execute(
+            "UPDATE runs SET status = ?, finished_at = ?, score = ?, size_bytes = ?, files = ?, cache_key = ? "
+            "WHERE run_id = ?",
+            (metadata.get('status', 'success'), time.time(), metadata.get('score'), size,
+             json.dumps(files or {}), cache_key if response is not None else None, run_id)
+        )
+        record = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    conn.close()
+    return _row(record) if record else None
+
+def list_runs(root, limit=50, offset=0, status=None):
+    """Index records of the newest runs first, optionally of one status only."""
+    if not os.path.exists(os.path.join(root, INDEX_FILE)):
+        return []
+    conn = _connect(root)
+    query = "SELECT * FROM runs"
+    params = []
+    if status:
+        query += " WHERE status = ?"
+        params.append(status)
+    query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+    rows = conn.execute(query, params + [limit, offset]).fetchall()
+    conn.close()
+    return [_row(row) for row in rows]
+
+def get_run(root, run_id):
+    """
+    Index record of a run with its stored metadata, or None for unknown IDs.
+    """
+    if not is_run_id(run_id) or not os.path.exists(os.path.join(root, INDEX_FILE)):
+        return None
+    conn = _connect(root)
+    row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    conn.close()
+    if row is None:
+        return None
+
+    record = _row(row)
+    meta_path = os.path.join(run_dir(root, run_id), META_FILE)
+    try:
+        with open(meta_path) as f:
+            record['metadata'] = json.load(f)
+    except (OSError, ValueError):
+        record['metadata'] = None
+    return record
+
+def latest_run(root, status='success'):
+    """Index record of the most recently finished run with the given status."""
+    if not os.path.exists(os.path.join(root, INDEX_FILE)):
+        return None
+    conn = _connect(root)
+    row = conn.execute("SELECT * FROM runs WHERE status = ? ORDER BY finished_at DESC LIMIT 1",
+                       (status,)).fetchone()
+    conn.close()
+    return _row(row) if row else None
+
+def load_response(root, run_id):
+    """Stored response of a run, or None when it has none or its files are gone."""
+    if not is_run_id(run_id):
+        return None
+    try:
+        with open(os.path.join(run_dir(root, run_id), RESPONSE_FILE)) as f:
+            response = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all(os.path.exists(path) for path in response.get('files', {}).values()):
+        return None
+    return response
+
+def find_cached_run(root, cache_key):
+    """
+    Newest successful run stored under cache_key whose files still exist.
+
+    Returns:
+        tuple: (run_id, response), or (None, None) on a miss
+    """
+    if not os.path.exists(os.path.join(root, INDEX_FILE)):
+        return None, None
+    conn = _connect(root)
+    rows = conn.execute("SELECT run_id FROM runs WHERE cache_key = ? AND status = 'success' "
+                        "ORDER BY finished_at DESC", (cache_key,)).fetchall()
+    conn.close()
+    for row in rows:
+        response = load_response(root, row['run_id'])
+        if response is not None:
+            return row['run_id'], response
+    return None, None
+
+def _dir_size(directory):
+    try:
+        return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+    except OSError:
+        return 0
+
+def mark_stale_runs(conn, root, stale_after_hours):
+    """
+    Mark runs still 'running' after stale_after_hours as failed, with the size
+    of what they left behind; their worker died without recording them.
+
+    Returns:
+        list: Run IDs marked failed
+    """
+    cutoff = time.time() - stale_after_hours * 3600
+    stale = [row['run_id'] for row in conn.execute(
+        "SELECT run_id FROM runs WHERE status = 'running' AND created_at < ?", (cutoff,))]
+    with conn:
+        conn.executemany(
+            "UPDATE runs SET status = 'failed', finished_at = ?, size_bytes = ? WHERE run_id = ?",
+            [(time.time(), _dir_size(run_dir(root, run_id)), run_id) for run_id in stale]
+        )
+    return stale
+
+def evict_runs(root, max_bytes=0, max_age_days=0, keep=None, stale_after_hours=24):
+    """
+    Remove finished runs older than max_age_days, then the oldest finished
+    runs until the rest fit in max_bytes. Live runs are never evicted; runs
+    still 'running' after stale_after_hours are marked failed first, so they
+    count toward both bounds.
+
+    Args:
+        root: Artifact root directory
+        max_bytes: Size bound of all runs (0 = unbounded)
+        max_age_days: Age bound (0 = none)
+        keep: Optional run ID that is never evicted
+        stale_after_hours: Age after which a running run is considered crashed
+
+    Returns:
+        list: Evicted run IDs
+    """
+    if not os.path.exists(os.path.join(root, INDEX_FILE)):
+        return []
+    conn = _connect(root)
+    mark_stale_runs(conn, root, stale_after_hours)
+    evicted = []
+    evicted_bytes = 0
+    if max_age_days:
+        cutoff = time.time() - max_age_days * 86400
+        for row in conn.execute("SELECT run_id, size_bytes FROM runs WHERE status != 'running' "
+                                "AND created_at < ? AND run_id != ?", (cutoff, keep or '')):
+            evicted.append(row['run_id'])
+            evicted_bytes += row['size_bytes']
+    if max_bytes:
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM runs").fetchone()[0] - evicted_bytes
+        expired = set(evicted)
+        for row in conn.execute(
+                "SELECT run_id, size_bytes FROM runs WHERE status != 'running' AND run_id != ? "
+                "ORDER BY created_at", (keep or '',)):
+            if total <= max_bytes:
+                break
+            if row['run_id'] not in expired:
+                evicted.append(row['run_id'])
+                total -= row['size_bytes']
+
+    for run_id in evicted:
+        shutil.rmtree(run_dir(root, run_id), ignore_errors=True)
+    with conn:
+        conn.executemany("DELETE FROM runs WHERE run_id = ?", [(run_id,) for run_id in evicted])
+    conn.close()
+    return evicted
@@ -1,63 +1,394 @@
+import numpy as np
 import networkx as nx
 import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
 
-def build_conflict_graph(enrollments_df):
+class ConflictGraph:
+    """
+    Compact conflict graph: a symmetric CSR adjacency over course IDs with
+    shared-student counts as edge weights. It offers the small part of the
+    networkx.Graph API the schedulers use (nodes, neighbors, degree, G[node],
+    membership), while degrees and density come straight from the arrays.
+    """
+    
+    def __init__(self, courses, indptr, indices, weights):
+        self.courses = list(courses)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.int64)
+        self.index = {course_id: i for i, course_id in enumerate(self.courses)}
+    
+    @classmethod
+    def from_networkx(cls, G):
+        """ConflictGraph with the nodes, edges and 'weight' attributes of a networkx.Graph."""
+        courses = list(G.nodes())
+        if not courses:
+            return cls([], [0], [], [])
+        matrix = nx.to_scipy_sparse_array(G, nodelist=courses, weight='weight', dtype=np.int64, format='csr')
+        matrix.sort_indices()
+        return cls(courses, matrix.indptr, matrix.indices, matrix.data)
+    
+    def neighbor_sets(self):
+        """Neighbor index sets of every node."""
+        return [set(a.tolist()) for a in np.split(self.indices, self.indptr[1:-1])][:len(self.courses)]
+    
+    @property
+    def degrees(self):
+        """Number of conflicting courses per node."""
+        return np.diff(self.indptr)
+    
+    @property
+    def weighted_degrees(self):
+        """Shared students summed over each node's edges."""
+        totals = np.zeros(len(self.courses), dtype=np.int64)
+        np.add.at(totals, np.repeat(np.arange(len(self.courses)), self.degrees), self.weights)
+        return totals
+    
+    def number_of_nodes(self):
+        return len(self.courses)
+    
+    def number_of_edges(self):
+        return len(self.indices) // 2
+    
+    def density(self):
+        n = len(self.courses)
+        return 2.0 * self.number_of_edges() / (n * (n - 1)) if n > 1 else 0.0
+    
+    def nodes(self):
+        return list(self.courses)
+    
+    def __len__(self):
+        return len(self.courses)
+    
+    def __contains__(self, node):
+        return node in self.index
+    
+    def neighbor_indices(self, i):
+        """Neighbor node indices and edge weights of node index i."""
+        return self.indices[self.indptr[i]:self.indptr[i + 1]], self.weights[self.indptr[i]:self.indptr[i + 1]]
+    
+    def neighbors(self, node):
+        neighbors, _ = self.neighbor_indices(self.index[node])
+        return iter([self.courses[j] for j in neighbors.tolist()])
+    
+    def __getitem__(self, node):
+        neighbors, weights = self.neighbor_indices(self.index[node])
+        return {self.courses[j]: {'weight': w} for j, w in zip(neighbors.tolist(), weights.tolist())}
+    
+    def has_edge(self, u, v):
+        if u not in self.index or v not in self.index:
+            return False
+        neighbors, _ = self.neighbor_indices(self.index[u])
+        position = np.searchsorted(neighbors, self.index[v])
+        return position < len(neighbors) and neighbors[position] == self.index[v]
+    
+    def degree(self, weight=None):
+        """(node, degree) pairs, like networkx's degree view."""
+        values = self.weighted_degrees if weight else self.degrees
+        return list(zip(self.courses, values.tolist()))
+    
+    def edges(self, data=None):
+        """Each edge once as (u, v) or (u, v, weight) when data='weight'."""
+        rows = np.repeat(np.arange(len(self.courses)), self.degrees)
+        upper = rows < self.indices
+        triples = zip(rows[upper].tolist(), self.indices[upper].tolist(), self.weights[upper].tolist())
+        if data:
+            return [(self.courses[i], self.courses[j], w) for i, j, w in triples]
+        return [(self.courses[i], self.courses[j]) for i, j, _ in triples]
+    
+    def matrix(self):
+        """The adjacency as a scipy.sparse.csr_matrix."""
+        n = len(self.courses)
+        return sparse.csr_matrix((self.weights, self.indices, self.indptr), shape=(n, n))
+    
+    def add_nodes(self, nodes):
+        """Append courses that are not in the graph yet as isolated nodes."""
+        for node in nodes:
+            if node not in self.index:
+                self.index[node] = len(self.courses)
+                self.courses.append(node)
+        if len(self.indptr) <= len(self.courses):
+            padding = np.full(len(self.courses) + 1 - len(self.indptr), self.indptr[-1])
+            self.indptr = np.concatenate([self.indptr, padding])
+    
+    def apply_weight_changes(self, changes):
+        """
+        Add shared-student count changes to the edge weights. Existing edges
+        that stay positive are updated in place; if any edge appears or drops
+        to zero, the arrays are rebuilt by one sparse addition. Unknown courses
+        are appended as new nodes.
+
+        Args:
+            changes: Dict mapping (u, v) course ID pairs to weight changes
+
+        Returns:
+            tuple: (added_edges, removed_edges) as lists of (u, v) pairs
+        """
+        self.add_nodes(node for pair in changes for node in pair)
+        n = len(self.courses)
+
+        added, removed, positions, values = [], [], [], []
+        for (u, v), change in changes.items():
+            if change == 0:
+                continue
+            i, j = self.index[u], self.index[v]
+            neighbors, weights = self.neighbor_indices(i)
+            position = int(np.searchsorted(neighbors, j))
+            exists = position < len(neighbors) and neighbors[position] == j
+            weight = int(weights[position]) if exists else 0
+            if weight + change > 0 and exists:
+                positions.append((i, j, position))
+                values.append(weight + change)
+            elif weight + change > 0:
+                added.append((u, v))
+            elif exists:
+                removed.append((u, v))
+
+        if not added and not removed:
+            for (i, j, position), value in zip(positions, values):
+                self.weights[self.indptr[i] + position] = value
+                other = self.indptr[j] + int(np.searchsorted(self.neighbor_indices(j)[0], i))
+                self.weights[other] = value
+            return added, removed
+
+        rows, cols, data = [], [], []
+        for (u, v), change in changes.items():
+            if change:
+                rows += [self.index[u], self.index[v]]
+                cols += [self.index[v], self.index[u]]
+                data += [change, change]
+        delta = sparse.csr_matrix((np.array(data, dtype=np.int64), (rows, cols)), shape=(n, n))
+        matrix = (self.matrix() + delta).tocsr()
+        matrix.data[matrix.data < 0] = 0
+        matrix.eliminate_zeros()
+        matrix.sort_indices()
+        self.indptr = np.asarray(matrix.indptr, dtype=np.int64)
+        self.indices = np.asarray(matrix.indices, dtype=np.int32)
+        self.weights = np.asarray(matrix.data, dtype=np.int64)
+        return added, removed
+    
+    def connected_components(self):
+        """Node ID sets of the connected components."""
+        if not self.courses:
+            return []
+        n_components, labels = csgraph.connected_components(self.matrix(), directed=False)
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        return [{self.courses[i] for i in group.tolist()} for group in np.split(order, boundaries)]
+    
+    def to_networkx(self, nodes=None):
+        """networkx.Graph of the whole graph or of the subgraph on nodes."""
+        keep = None if nodes is None else set(nodes)
+        G = nx.Graph()
+        G.add_nodes_from(self.courses if keep is None else [c for c in self.courses if c in keep])
+        G.add_weighted_edges_from(
+            (u, v, w) for u, v, w in self.edges(data='weight')
+            if keep is None or (u in keep and v in keep)
+        )
+        return G
+
+def coenrollment_matrix(enroll_student, enroll_course, n_students, n_courses):
+    """
+    Course x course matrix of shared students, computed as the sparse product
+    B^T B of the binary student x course incidence matrix B. The diagonal
+    (course sizes) is dropped.
+
+    Args:
+        enroll_student: Student index of every enrollment
+        enroll_course: Course index of every enrollment
+        n_students: Number of students
+        n_courses: Number of courses
+
+    Returns:
+        scipy.sparse.csr_matrix: Symmetric shared-student counts
+    """
+    incidence = sparse.csr_matrix(
+        (np.ones(len(enroll_student), dtype=np.int64), (enroll_student, enroll_course)),
+        shape=(n_students, n_courses)
+    )
+    # Repeated enrollments in the same course count once
+    incidence.sum_duplicates()
+    incidence.data[:] = 1
+
+    shared = (incidence.T @ incidence).tocsr()
+    shared.setdiag(0)
+    shared.eliminate_zeros()
+    shared.sort_indices()
+    return shared
+
+def build_conflict_graph(enrollments_df, instance=None, output='networkx'):
     """
     Build conflict graph where nodes are courses and edges connect courses 
     that share at least one student (cannot be scheduled at same time).
+    Each edge carries a 'weight': the number of students the two courses share.
     
     Args:
         enrollments_df: DataFrame with columns ['student_id', 'course_id']
+        instance: Optional ProblemInstance; when given the graph is built from
+            its enrollment arrays and enrollments_df is not read
+        output: 'networkx' for a networkx.Graph, 'csr' for a ConflictGraph
+            holding the raw CSR arrays
     
     Returns:
-        networkx.Graph: Conflict graph
+        networkx.Graph or ConflictGraph
     """
-    G = nx.Graph()
+    if output not in ('networkx', 'csr'):
+        raise ValueError(f"Unknown conflict graph output '{output}', expected 'networkx' or 'csr'")
     
-    # Debug: Check enrollments DataFrame
-    print(f"DEBUG: Enrollments DataFrame shape: {enrollments_df.shape}")
-    print(f"DEBUG: Enrollments columns: {list(enrollments_df.columns)}")
-    if len(enrollments_df) > 0:
-        print(f"DEBUG: First few enrollments:\n{enrollments_df.head()}")
+    if instance is not None:
+        # Only courses someone is enrolled in become nodes, as with the DataFrame input
+        enrolled = np.flatnonzero(instance.course_sizes > 0)
+        courses = [instance.course_ids[c] for c in enrolled]
+        local = np.full(instance.n_courses, -1, dtype=np.int64)
+        local[enrolled] = np.arange(len(enrolled))
+        shared = coenrollment_matrix(instance.enroll_student, local[instance.enroll_course],
+                                     instance.n_students, len(courses))
+    elif len(enrollments_df) == 0:
+        courses = []
+        shared = sparse.csr_matrix((0, 0), dtype=np.int64)
     else:
-        print("DEBUG: Enrollments DataFrame is empty!")
-        return G
+        # Check if required columns exist
+        if 'course_id' not in enrollments_df.columns:
+            raise ValueError(f"Missing 'course_id' column in enrollments DataFrame. Available columns: {list(enrollments_df.columns)}")
+        if 'student_id' not in enrollments_df.columns:
+            raise ValueError(f"Missing 'student_id' column in enrollments DataFrame. Available columns: {list(enrollments_df.columns)}")
+        
+        enroll_course, courses = pd.factorize(enrollments_df['course_id'])
+        enroll_student, students = pd.factorize(enrollments_df['student_id'])
+        known = (enroll_course >= 0) & (enroll_student >= 0)
+        courses = courses.tolist()
+        shared = coenrollment_matrix(enroll_student[known], enroll_course[known], len(students), len(courses))
     
-    # Check if required columns exist
-    if 'course_id' not in enrollments_df.columns:
-        raise ValueError(f"Missing 'course_id' column in enrollments DataFrame. Available columns: {list(enrollments_df.columns)}")
-    if 'student_id' not in enrollments_df.columns:
-        raise ValueError(f"Missing 'student_id' column in enrollments DataFrame. Available columns: {list(enrollments_df.columns)}")
+    if output == 'csr':
+        return ConflictGraph(courses, shared.indptr, shared.indices, shared.data)
     
-    # Get all unique courses
-    courses = enrollments_df['course_id'].unique()
-    print(f"DEBUG: Found {len(courses)} unique courses: {courses}")
+    G = nx.Graph()
     G.add_nodes_from(courses)
-    
-    # Group enrollments by student to find conflicts
-    student_courses = enrollments_df.groupby('student_id')['course_id'].apply(list).to_dict()
-    print(f"DEBUG: Student-course mapping: {dict(list(student_courses.items())[:3])}...")  # Show first 3
-    
-    # Add edges between courses that share students
-    edges_added = 0
-    for student_id, course_list in student_courses.items():
-        # Add edge between every pair of courses for this student
-        for i in range(len(course_list)):
-            for j in range(i + 1, len(course_list)):
-                course1, course2 = course_list[i], course_list[j]
-                if not G.has_edge(course1, course2):
-                    G.add_edge(course1, course2)
-                    edges_added += 1
-    
-    print(f"DEBUG: Added {edges_added} conflict edges to graph")
+    upper = sparse.triu(shared, k=1).tocoo()
+    G.add_weighted_edges_from(
+        (courses[i], courses[j], int(w)) for i, j, w in zip(upper.row.tolist(), upper.col.tolist(), upper.data.tolist())
+    )
     return G
 
+def student_course_sets(enrollments_df):
+    """
+    Current course set of every student, the state update_conflict_graph
+    needs to turn enrollment changes into edge weight changes.
+
+    Returns:
+        dict: student_id -> set of course_ids
+    """
+    student_courses = {}
+    for student_id, course_id in zip(enrollments_df['student_id'], enrollments_df['course_id']):
+        student_courses.setdefault(student_id, set()).add(course_id)
+    return student_courses
+
+def _enrollment_pairs(enrollments):
+    """(student_id, course_id) pairs from a DataFrame or an iterable of pairs."""
+    if enrollments is None:
+        return []
+    if isinstance(enrollments, pd.DataFrame):
+        return list(zip(enrollments['student_id'], enrollments['course_id']))
+    return list(enrollments)
+
+def enrollment_weight_changes(student_courses, added=None, removed=None):
+    """
+    Edge weight changes caused by enrollment changes: dropping a course takes
+    one shared student off its edges to the student's other courses, adding
+    one puts one on. Removals are applied before additions; adding an existing
+    enrollment or removing a missing one changes nothing.
+
+    Args:
+        student_courses: Output of student_course_sets, updated in place
+        added: New (student_id, course_id) enrollments (pairs or DataFrame)
+        removed: Dropped (student_id, course_id) enrollments (pairs or DataFrame)
+
+    Returns:
+        dict: (u, v) course ID pair -> weight change, without zero entries
+    """
+    changes = {}
+
+    def shift(course_id, others, change):
+        for other in others:
+            key = (course_id, other) if str(course_id) <= str(other) else (other, course_id)
+            changes[key] = changes.get(key, 0) + change
+
+    for student_id, course_id in _enrollment_pairs(removed):
+        courses = student_courses.get(student_id)
+        if courses is not None and course_id in courses:
+            courses.discard(course_id)
+            shift(course_id, courses, -1)
+
+    for student_id, course_id in _enrollment_pairs(added):
+        courses = student_courses.setdefault(student_id, set())
+        if course_id not in courses:
+            shift(course_id, courses, 1)
+            courses.add(course_id)
+
+    return {key: change for key, change in changes.items() if change}
+
+def update_conflict_graph(G, student_courses, added=None, removed=None):
+    """
+    Apply enrollment add/drop changes to a conflict graph in place, touching
+    only the edges of the changed students' courses instead of rebuilding the
+    graph from all enrollments. Newly enrolled courses become nodes; courses
+    that lose all enrollments stay as isolated nodes.
+
+    Args:
+        G: ConflictGraph or networkx.Graph, modified in place
+        student_courses: Output of student_course_sets, updated in place
+        added: New (student_id, course_id) enrollments (pairs or DataFrame)
+        removed: Dropped (student_id, course_id) enrollments (pairs or DataFrame)
+
+    Returns:
+        dict: {changed_courses, added_edges, removed_edges, weight_changes}
+              where changed_courses are the courses whose conflicts changed
+    """
+    added_pairs = _enrollment_pairs(added)
+    changes = enrollment_weight_changes(student_courses, added_pairs, removed)
+
+    if isinstance(G, ConflictGraph):
+        G.add_nodes(course_id for _, course_id in added_pairs)
+        added_edges, removed_edges = G.apply_weight_changes(changes)
+    else:
+        G.add_nodes_from(course_id for _, course_id in added_pairs)
+        added_edges, removed_edges = [], []
+        for (u, v), change in changes.items():
+            weight = G[u][v]['weight'] if G.has_edge(u, v) else 0
+            if weight + change > 0:
+                if not weight:
+                    added_edges.append((u, v))
+                G.add_edge(u, v, weight=weight + change)
+            elif weight:
+                removed_edges.append((u, v))
+                G.remove_edge(u, v)
+
+    return {
+        'changed_courses': sorted({course_id for pair in changes for course_id in pair}, key=str),
+        'added_edges': added_edges,
+        'removed_edges': removed_edges,
+        'weight_changes': changes
+    }
+
+def connected_components(G):
+    """Connected components (sets of course IDs) of a ConflictGraph or networkx.Graph."""
+    if isinstance(G, ConflictGraph):
+        return G.connected_components()
+    return list(nx.connected_components(G))
+
+def to_networkx(G, nodes=None):
+    """networkx view of a conflict graph, optionally restricted to nodes."""
+    if isinstance(G, ConflictGraph):
+        return G.to_networkx(nodes)
+    return G if nodes is None else G.subgraph(nodes)
+
 def graph_stats(G):
     """
     Calculate statistics for the conflict graph.
     
     Args:
-        G: networkx.Graph
+        G: ConflictGraph or networkx.Graph
     
     Returns:
         dict: Graph statistics
@@ -74,18 +405,19 @@ def graph_stats(G):
             'max_degree_course': None
         }
     
-    density = nx.density(G)
-    degrees = dict(G.degree())
-    avg_degree = sum(degrees.values()) / len(degrees) if degrees else 0.0
-    
-    max_degree_course = max(degrees, key=degrees.get) if degrees else None
+    if isinstance(G, ConflictGraph):
+        nodes, degrees, density = G.courses, G.degrees, G.density()
+    else:
+        nodes = list(G.nodes())
+        degrees = np.fromiter((degree for _, degree in G.degree()), dtype=np.int64, count=n_nodes)
+        density = nx.density(G)
     
     return {
         'n_nodes': n_nodes,
         'n_edges': n_edges,
-        'density': density,
-        'avg_degree': avg_degree,
-        'max_degree_course': max_degree_course
+        'density': float(density),
+        'avg_degree': float(degrees.mean()),
+        'max_degree_course': nodes[int(np.argmax(degrees))]
     }
 
 if __name__ == "__main__":
@@ -110,4 +442,4 @@ if __name__ == "__main__":
     for key, value in stats.items():
         print(f"{key}: {value}")
     
-    print(f"\nEdges (conflicts): {list(G.edges())}")
\ No newline at end of file
+    print(f"\nEdges (conflicts): {list(G.edges(data='weight'))}")
\ No newline at end of file
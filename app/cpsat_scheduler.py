@@ -0,0 +1,103 @@
+import numpy as np
+from ortools.sat.python import cp_model
+
+STATUS_NAMES = {
+    cp_model.OPTIMAL: 'optimal',
+    cp_model.FEASIBLE: 'feasible',
+    cp_model.INFEASIBLE: 'infeasible',
+    cp_model.MODEL_INVALID: 'model_invalid',
+    cp_model.UNKNOWN: 'unknown'
+}
+
+def student_course_sets(fitness_data):
+    """
+    Distinct course sets taken by students, as sorted tuples of course indices.
+
+    Students with identical enrollments produce identical constraints, so each
+    set is modeled once; the fitness data already holds one row per student group.
+    """
+    order = np.argsort(fitness_data['enroll_group'], kind='stable')
+    groups = fitness_data['enroll_group'][order]
+    courses = fitness_data['enroll_course'][order]
+
+    boundaries = np.flatnonzero(np.diff(groups)) + 1
+    return {tuple(sorted(set(group.tolist()))) for group in np.split(courses, boundaries) if len(group)}
+
+def solve_cpsat(fitness_data, n_slots, slot_capacity, time_limit=30.0, workers=0, hint=None):
+    """
+    Assign exams to slots with CP-SAT.
+
+    Hard constraints: every course gets exactly one slot, no student sits more
+    than max_per_day exams on one day, and the students in a slot fit in the
+    total room capacity. The objective minimizes the peak slot load so rooms
+    are used evenly. Courses larger than the slot capacity fit no slot at all;
+    they are left out of the capacity constraint and reported, so the other
+    engines' unschedulable and makeup handling applies to them.
+
+    Args:
+        fitness_data: Output of compile_fitness_data
+        n_slots: Number of time slots
+        slot_capacity: Seats available in each slot
+        time_limit: Wall-clock limit in seconds
+        workers: Parallel search workers (0 = all cores)
+        hint: Optional slot vector to warm-start the search
+
+    Returns:
+        dict: {status, genes, objective, best_bound, gap, wall_time, oversized_courses}
+    """
+    n_courses = fitness_data['n_courses']
+    slot_day = fitness_data['slot_day']
+    sizes = [int(size) for size in fitness_data['course_sizes']]
+    max_per_day = fitness_data['max_per_day']
+
+    model = cp_model.CpModel()
+    x = [[model.NewBoolVar(f'x_{c}_{t}') for t in range(n_slots)] for c in range(n_courses)]
+    for c in range(n_courses):
+        model.AddExactlyOne(x[c])
+
+    day_slots = [np.flatnonzero(slot_day == d).tolist() for d in range(fitness_data['n_days'])]
+    for course_set in student_course_sets(fitness_data):
+        if len(course_set) <= max_per_day:
+            continue
+        for slots in day_slots:
+            model.Add(sum(x[c][t] for c in course_set for t in slots) <= max_per_day)
+
+    capacity = int(slot_capacity)
+    oversized = [c for c in range(n_courses) if sizes[c] > capacity]
+    fitting = [c for c in range(n_courses) if sizes[c] <= capacity]
+    peak = model.NewIntVar(0, max(capacity, 0), 'peak_load')
+    for t in range(n_slots):
+        model.Add(sum(sizes[c] * x[c][t] for c in fitting) <= peak)
+    model.Minimize(peak)
+
+    if hint is not None:
+        for c, slot in enumerate(hint):
+            for t in range(n_slots):
+                model.AddHint(x[c][t], t == slot)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(time_limit)
+    solver.parameters.num_workers = int(workers)
+    status = solver.Solve(model)
+
+    result = {
+        'status': STATUS_NAMES.get(status, 'unknown'),
+        'genes': None,
+        'objective': None,
+        'best_bound': None,
+        'gap': None,
+        'wall_time': solver.WallTime(),
+        'oversized_courses': oversized
+    }
+
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result['genes'] = [
+            next(t for t in range(n_slots) if solver.Value(x[c][t])) for c in range(n_courses)
+        ]
+        objective = solver.ObjectiveValue()
+        bound = solver.BestObjectiveBound()
+        result['objective'] = objective
+        result['best_bound'] = bound
+        result['gap'] = 0.0 if status == cp_model.OPTIMAL else (objective - bound) / max(1.0, abs(objective))
+
+    return result
@@ -0,0 +1,257 @@
+import os
+import time
+import random
+import numpy as np
+import networkx as nx
+from concurrent.futures import ProcessPoolExecutor
+from deap import creator, tools
+
+from app.conflict_graph import connected_components, to_networkx
+from app.fitness import evaluate_population, subset_fitness_data, init_eval_state
+from app.local_search import course_neighbors, local_search, memetic_operator
+from app.scheduler_core import create_toolbox, evolve, stopping_criteria
+
+def decompose(G, courses, max_size=0, min_size=1, seed=None):
+    """
+    Split courses into groups that can be scheduled independently: connected
+    components of the conflict graph, with components above max_size split
+    further into Louvain communities (weighted by edge 'weight' when present).
+    Components smaller than min_size are pooled into shared groups so that
+    thousands of isolated courses do not each become a task.
+
+    Args:
+        G: Conflict graph (ConflictGraph or networkx.Graph)
+        courses: List of course IDs in chromosome order
+        max_size: Split components with more courses than this (0 = never)
+        min_size: Pool components with fewer courses than this
+        seed: Seed for the community detection
+
+    Returns:
+        tuple: (groups, coupled) where groups are lists of course indices,
+               largest first, and coupled is True if any conflict edge
+               crosses two groups
+    """
+    index_of = {course_id: i for i, course_id in enumerate(courses)}
+    parts = []
+    coupled = False
+
+    for component in connected_components(G):
+        members = [node for node in component if node in index_of]
+        if max_size and len(members) > max_size:
+            communities = nx.community.louvain_communities(to_networkx(G, members), weight='weight', seed=seed)
+            parts.extend(sorted(index_of[node] for node in community) for community in communities)
+            coupled = coupled or len(communities) > 1
+        elif members:
+            parts.append(sorted(index_of[node] for node in members))
+
+    # Courses without any enrollment never conflict
+    placed = {i for part in parts for i in part}
+    parts.extend([i] for i in range(len(courses)) if i not in placed)
+
+    groups, pool = [], []
+    for part in sorted(parts, key=len, reverse=True):
+        if len(part) >= min_size:
+            groups.append(part)
+        else:
+            pool.extend(part)
+            if len(pool) >= min_size:
+                groups.append(sorted(pool))
+                pool = []
+    if pool:
+        groups.append(sorted(pool))
+
+    return groups, coupled
+
+def solve_group(sub_data, ga_params, pop_size, generations, seeds, seed, stopping, deadline=None):
+    """
+    Run the GA on one group of courses (a pool task).
+
+    Args:
+        sub_data: Output of subset_fitness_data for the group
+        ga_params: Dict with n_slots, cxpb, mutpb, tournament_size, local_search
+        pop_size, generations: GA size for this group
+        seeds: Constructed slot vectors restricted to the group's courses
+        seed: Seed for this task's random stream
+        stopping: Output of stopping_criteria for the group
+        deadline: Absolute time.time() by which the group must finish
+
+    Returns:
+        tuple: (genes, score, info)
+    """
+    random.seed(seed)
+    n_courses = sub_data['n_courses']
+
+    toolbox = create_toolbox(n_courses, ga_params['n_slots'], ga_params['tournament_size'])
+    toolbox.register("evaluate_population", lambda individuals: evaluate_population(
+        np.array(individuals, dtype=np.int64).reshape(len(individuals), n_courses), sub_data
+    ))
+    ls_config = ga_params.get('local_search', {})
+    if ls_config.get('enabled', False):
+        toolbox.register("improve", memetic_operator(sub_data, ls_config, rng=random.Random(seed)))
+
+    population = [creator.Individual(vector) for vector in seeds[:pop_size]]
+    population += toolbox.population(n=pop_size - len(population))
+    hof = tools.HallOfFame(1)
+
+    if deadline is not None:
+        remaining = max(0.0, deadline - time.time())
+        limit = stopping.get('time_limit')
+        stopping = dict(stopping, time_limit=remaining if limit is None else min(limit, remaining))
+
+    _, info = evolve(population, toolbox, cxpb=ga_params['cxpb'] if n_courses > 1 else 0.0,
+                     mutpb=ga_params['mutpb'], ngen=generations, halloffame=hof, **stopping)
+    return list(hof[0]), hof[0].fitness.values[0], info
+
+def balance_days(genes, groups, data, slot_sizes):
+    """
+    Permute the exam days of each independent group so that student load is
+    spread over the period. A day permutation keeps every student's daily exam
+    counts, so it never changes a group's violations.
+
+    Args:
+        genes: Merged slot vector, modified in place
+        groups: Lists of course indices
+        data: Fitness data with slot_day and course_sizes
+        slot_sizes: Number of slots per day
+
+    Returns:
+        numpy.ndarray: genes
+    """
+    n_days = data['n_days']
+    slot_day = data['slot_day']
+    day_slots = [np.flatnonzero(slot_day == d) for d in range(n_days)]
+    position = np.zeros(len(slot_day), dtype=np.int64)
+    for slots in day_slots:
+        position[slots] = np.arange(len(slots))
+
+    sizes = data['course_sizes']
+    day_load = np.zeros(n_days, dtype=np.int64)
+    for group in sorted(groups, key=lambda g: -int(sizes[g].sum())):
+        group = np.asarray(group, dtype=np.int64)
+        days = slot_day[genes[group]]
+        group_load = np.bincount(days, weights=sizes[group], minlength=n_days)
+
+        # Busiest group day goes to the quietest global day
+        mapping = np.empty(n_days, dtype=np.int64)
+        mapping[np.argsort(-group_load, kind='stable')] = np.argsort(day_load, kind='stable')
+
+        new_days = mapping[days]
+        genes[group] = [day_slots[d][position[s] % slot_sizes[d]] for d, s in zip(new_days, genes[group])]
+        day_load += np.bincount(new_days, weights=sizes[group], minlength=n_days).astype(np.int64)
+
+    return genes
+
+def balance_slots(genes, data):
+    """
+    Spread each day's courses over that day's slots, largest first onto the
+    least loaded slot, so that slot totals fit the shared room capacity.
+    Moves within a day never change the fitness.
+    """
+    slot_day = data['slot_day']
+    sizes = data['course_sizes']
+    slot_load = np.zeros(len(slot_day), dtype=np.int64)
+    for course in np.argsort(-sizes, kind='stable'):
+        slots = np.flatnonzero(slot_day == slot_day[genes[course]])
+        target = slots[np.argmin(slot_load[slots])]
+        genes[course] = target
+        slot_load[target] += sizes[course]
+    return genes
+
+def run_decomposed(fitness_data, conflict_graph, courses, ga_params, decomposition_config,
+                   pop_size, generations, seeds=None, opt_config=None, stop_event=None, callback=None):
+    """
+    Schedule each independent group of courses in its own process, then merge
+    the partial timetables: day permutations and slot balancing reconcile the
+    shared slot capacity, and a local-search repair pass removes clashes on
+    edges cut by community splitting.
+
+    Args:
+        fitness_data: Fitness data for all courses
+        conflict_graph: Conflict graph (ConflictGraph or networkx.Graph)
+        courses: List of course IDs in chromosome order
+        ga_params: Dict with n_slots, cxpb, mutpb, tournament_size, local_search
+        decomposition_config: Dict with max_component_size, min_component_size,
+            workers, repair_iterations
+        pop_size, generations: GA size for every group
+        seeds: Optional constructed slot vectors for all courses
+        opt_config: Optimization config, for the stopping criteria
+        stop_event: Groups not yet started are skipped once it is set
+        callback: Called as callback(generations, best_individual) after merging
+
+    Returns:
+        tuple: (best_genes, best_score, info)
+    """
+    opt_config = opt_config or {}
+    start = time.monotonic()
+    rng = random.Random(random.getrandbits(32))
+
+    groups, coupled = decompose(
+        conflict_graph, courses,
+        max_size=decomposition_config.get('max_component_size', 0),
+        min_size=decomposition_config.get('min_component_size', 1),
+        seed=rng.getrandbits(32)
+    )
+
+    time_limit = opt_config.get('time_limit_seconds') or None
+    deadline = time.time() + time_limit if time_limit else None
+    seeds = np.array(seeds, dtype=np.int64) if seeds else np.empty((0, len(courses)), dtype=np.int64)
+
+    workers = decomposition_config.get('workers', 0) or min(len(groups), os.cpu_count() or 1)
+    genes = np.zeros(len(courses), dtype=np.int64)
+    parts = []
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = []
+        for group in groups:
+            sub_data = subset_fitness_data(fitness_data, group)
+            futures.append(pool.submit(
+                solve_group, sub_data, ga_params, pop_size, generations,
+                seeds[:, group].tolist(), rng.getrandbits(32),
+                stopping_criteria(opt_config, sub_data), deadline
+            ))
+
+        for group, future in zip(groups, futures):
+            if stop_event is not None and stop_event.is_set() and future.cancel():
+                # Unsolved groups keep a constructed or random assignment
+                genes[group] = seeds[0, group] if len(seeds) else [
+                    rng.randrange(ga_params['n_slots']) for _ in group
+                ]
+                parts.append({'courses': len(group), 'stop_reason': 'cancelled'})
+                continue
+            group_genes, score, info = future.result()
+            genes[group] = group_genes
+            parts.append({'courses': len(group), 'score': score,
+                          'generations': info['generations'], 'stop_reason': info['stop_reason']})
+
+    slot_day = fitness_data['slot_day']
+    slot_sizes = np.bincount(slot_day, minlength=fitness_data['n_days'])
+    if not coupled:
+        balance_days(genes, groups, fitness_data, slot_sizes)
+
+    repaired = 0
+    before = init_eval_state(genes, fitness_data)['violations'] if coupled else 0
+    if before > 0:
+        repaired_genes, state = local_search(
+            genes, fitness_data, course_neighbors(fitness_data),
+            max_iterations=decomposition_config.get('repair_iterations', 200), rng=rng
+        )
+        genes = np.array(repaired_genes, dtype=np.int64)
+        repaired = before - state['violations']
+
+    balance_slots(genes, fitness_data)
+    best_score = float(evaluate_population(genes[None, :], fitness_data)[0])
+
+    if callback is not None:
+        best_individual = creator.Individual(genes.tolist())
+        best_individual.fitness.values = (best_score,)
+        callback(max((part.get('generations', 0) for part in parts), default=0), best_individual)
+
+    info = {
+        'generations': max((part.get('generations', 0) for part in parts), default=0),
+        'stop_reason': 'decomposed',
+        'elapsed': time.monotonic() - start,
+        'best_score': best_score,
+        'groups': parts,
+        'coupled': coupled,
+        'repaired_violations': repaired
+    }
+    return genes.tolist(), best_score, info
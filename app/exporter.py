@@ -8,86 +8,78 @@ from reportlab.lib import colors
 import os
 from datetime import datetime
 
-def get_section_from_student_id(student_id, students_df=None):
-    """Get section from student ID by looking up in students_df"""
-    if not student_id or students_df is None:
-        return ""
-    
-    student_id_str = str(student_id)
-    
-    try:
-        # Convert students_df student_id to string for comparison
-        students_df_copy = students_df.copy()
-        students_df_copy['student_id'] = students_df_copy['student_id'].astype(str)
-        
-        # Find matching student
-        student_row = students_df_copy[students_df_copy['student_id'] == student_id_str]
-        
-        if not student_row.empty:
-            section = student_row.iloc[0].get('section', '')
-            return str(section)
-    except Exception as e:
-        pass
-    
-    return ""
+def build_student_lookup(students_df=None, instance=None):
+    """
+    Map str(student_id) to (section, batch_type) once for the whole export.
 
-def get_batch_from_student_id(student_id, students_df=None):
-    """Extract batch from student ID based on batch_type (first 4 for regular, first 5 for evening)"""
-    if not student_id:
-        print(f"Debug: Empty student_id")
-        return ""
-    
+    Returns:
+        dict, or None when no student data is available
+    """
+    if instance is not None:
+        return {
+            str(student_id): (section, batch_type)
+            for student_id, section, batch_type in zip(
+                instance.student_ids, instance.student_sections, instance.student_batch_types
+            )
+        }
     if students_df is None:
-        print(f"Debug: students_df is None")
+        return None
+    
+    lookup = {}
+    for record in students_df.to_dict('records'):
+        key = str(record['student_id'])
+        if key not in lookup:
+            section = record.get('section', '')
+            batch_type = record.get('batch_type', '')
+            lookup[key] = ('' if pd.isna(section) else str(section),
+                           '' if pd.isna(batch_type) else str(batch_type))
+    return lookup
+
+def lookup_section(student_id, lookup):
+    """Section of a student from a build_student_lookup table"""
+    if not student_id or lookup is None:
+        return ""
+    return lookup.get(str(student_id), ('', ''))[0]
+
+def lookup_batch(student_id, lookup):
+    """Batch digits of a student: first 5 for evening batches, first 4 otherwise"""
+    if not student_id or lookup is None:
         return ""
     
-    # Convert to string and get digits only
     student_id_str = str(student_id)
     digits_only = ''.join(filter(str.isdigit, student_id_str))
-    
-    print(f"Debug: student_id={student_id_str}, digits_only={digits_only}")
-    print(f"Debug: students_df shape: {students_df.shape}")
-    print(f"Debug: students_df columns: {list(students_df.columns)}")
-    print(f"Debug: First few student_ids in df: {students_df['student_id'].head().tolist()}")
-    
     if not digits_only:
         return ""
     
-    # Look up student in students_df to get batch_type
-    try:
-        # Convert students_df student_id to string for comparison
-        students_df_copy = students_df.copy()
-        students_df_copy['student_id'] = students_df_copy['student_id'].astype(str)
-        
-        print(f"Debug: Looking for student_id '{student_id_str}' in converted df")
-        
-        # Find matching student
-        student_row = students_df_copy[students_df_copy['student_id'] == student_id_str]
-        
-        print(f"Debug: Found {len(student_row)} matching rows")
-        
-        if not student_row.empty:
-            batch_type = student_row.iloc[0].get('batch_type', '').lower()
-            print(f"Debug: Found batch_type='{batch_type}' for student {student_id_str}")
-            
-            # Extract digits based on batch_type
-            if 'evening' in batch_type:
-                result = digits_only[:5]  # Evening: first 5 digits
-                print(f"Debug: Evening student, returning first 5 digits: {result}")
-                return result
-            else:
-                result = digits_only[:4]  # Regular: first 4 digits
-                print(f"Debug: Regular student, returning first 4 digits: {result}")
-                return result
-        else:
-            print(f"Debug: No matching student found for {student_id_str}")
-    except Exception as e:
-        print(f"Debug: Exception in lookup: {e}")
-    
-    # Default fallback: assume regular (first 4 digits)
-    result = digits_only[:4]
-    print(f"Debug: Using fallback, returning: {result}")
-    return result
+    _, batch_type = lookup.get(student_id_str, ('', ''))
+    return digits_only[:5] if 'evening' in batch_type.lower() else digits_only[:4]
+
+def decode_timetable(timetable, instance=None):
+    """
+    Timetable with student IDs in place of the student indices carried by
+    compact instances; returned unchanged otherwise.
+    """
+    if instance is None or not instance.compact:
+        return timetable
+    
+    labels = instance.student_ids
+    decoded = []
+    for exam in timetable:
+        exam = dict(exam)
+        exam['assignments'] = [
+            dict(
+                assignment,
+                students=instance.student_labels(assignment.get('students', [])),
+                **({'seat_assignments': [dict(seat, student_id=labels[seat['student_id']])
+                                         for seat in assignment['seat_assignments']]}
+                   if 'seat_assignments' in assignment else {})
+            )
+            for assignment in exam.get('assignments', [])
+        ]
+        if 'unassigned_students' in exam:
+            exam['unassigned_students'] = instance.student_labels(exam['unassigned_students'])
+        decoded.append(exam)
+    return decoded
 
 def get_day_name(date_str):
     """Get day name from date string"""
@@ -144,14 +136,17 @@ def convert_to_12hour_format(time_str):
     except:
         return time_str
 
-def export_excel(timetable, out_path):
+def export_excel(timetable, out_path, instance=None):
     """
     Export timetable to Excel with multiple sheets.
     
     Args:
         timetable: List of exam assignments
         out_path: Output file path
+        instance: Optional ProblemInstance, needed to decode compact timetables
     """
+    timetable = decode_timetable(timetable, instance)
+    
     # Ensure outputs directory exists
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     
@@ -235,14 +230,18 @@ def export_excel(timetable, out_path):
     
     wb.save(out_path)
 
-def export_pdf(timetable, out_path, students_df=None):
+def export_pdf(timetable, out_path, students_df=None, instance=None):
     """
     Export timetable to PDF with summary and seat maps.
     
     Args:
         timetable: List of exam assignments
         out_path: Output file path
+        students_df: Optional DataFrame with section and batch_type per student
+        instance: Optional ProblemInstance used instead of students_df
     """
+    timetable = decode_timetable(timetable, instance)
+    
     # Ensure outputs directory exists
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     
@@ -281,6 +280,8 @@ def export_pdf(timetable, out_path, students_df=None):
     
     sorted_groups = sorted(exam_groups.items(), key=lambda x: sort_key(x[0]))
     
+    student_lookup = build_student_lookup(students_df, instance)
+    
     # Summary table with new format
     summary_data = [['Date and Time', 'Batch', 'Section', 'Course Code', 'Course Title']]
     
@@ -299,12 +300,11 @@ def export_pdf(timetable, out_path, students_df=None):
             
             # Extract unique batches and sections from student IDs
             for student_id in all_students:
-                batch = get_batch_from_student_id(student_id, students_df)
+                batch = lookup_batch(student_id, student_lookup)
                 if batch:
                     all_batches.add(batch)
                 
-                # Get section from students_df
-                section = get_section_from_student_id(student_id, students_df)
+                section = lookup_section(student_id, student_lookup)
                 if section:
                     all_sections.add(section)
             
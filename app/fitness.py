@@ -0,0 +1,492 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Fitness weights shared by every evaluator
+BASE_SCORE = 1000
+HARD_PENALTY = 1000  # per extra exam a student sits on one day
+ROOM_SPLIT_THRESHOLD = 50  # simplified: courses above this size need a room split
+ROOM_SPLIT_PENALTY = 10
+
+# Upper bound on (individual x student x day) counters held in memory at once
+_BLOCK_CELLS = 1 << 22
+
+# Compiled fitness data installed once per pool worker by _init_worker
+_worker_data = None
+
+# Above this share of changed genes a full recount is cheaper than a delta update
+DELTA_MAX_CHANGED_FRACTION = 0.5
+
+def compile_fitness_data(courses, enrollments_df, time_slots, max_per_day=1):
+    """
+    Compile enrollments once into the arrays used by the batched evaluator.
+
+    Args:
+        courses: List of course IDs in chromosome order
+        enrollments_df: DataFrame with columns ['student_id', 'course_id']
+        time_slots: List of slot dicts with a 'date' key
+        max_per_day: Maximum exams a student may sit on one day
+
+    Returns:
+        dict: Student x course incidence (as parallel index arrays), slot -> day
+              index array and the constant room-split penalty
+    """
+    course_index = {course_id: i for i, course_id in enumerate(courses)}
+
+    day_index = {}
+    for slot in time_slots:
+        day_index.setdefault(slot['date'], len(day_index))
+    slot_day = np.array([day_index[slot['date']] for slot in time_slots], dtype=np.int64)
+
+    if len(enrollments_df) > 0:
+        enroll_course = enrollments_df['course_id'].map(course_index)
+        known = enroll_course.notna().to_numpy()
+        enroll_course = enroll_course[known].to_numpy(dtype=np.int64)
+        enroll_student, student_ids = pd.factorize(enrollments_df['student_id'][known])
+        enroll_student = enroll_student.astype(np.int64)
+    else:
+        enroll_course = np.empty(0, dtype=np.int64)
+        enroll_student = np.empty(0, dtype=np.int64)
+        student_ids = []
+
+    return _fitness_data(len(student_ids), slot_day, enroll_student, enroll_course, len(courses),
+                         max_per_day)
+
+def fitness_data_from_instance(instance, max_per_day=1):
+    """
+    Fitness data for a compiled ProblemInstance, reusing its arrays.
+
+    Returns:
+        dict: Same layout as compile_fitness_data
+    """
+    return _fitness_data(instance.n_students, instance.slot_day, instance.enroll_student,
+                         instance.enroll_course, instance.n_courses, max_per_day)
+
+def subset_fitness_data(data, course_indices):
+    """
+    Fitness data for a subset of courses, with courses renumbered in the given
+    order and only their students kept.
+
+    Returns:
+        dict: Same layout as compile_fitness_data
+    """
+    course_indices = np.asarray(course_indices, dtype=np.int64)
+    local = np.full(data['n_courses'], -1, dtype=np.int64)
+    local[course_indices] = np.arange(len(course_indices))
+
+    enroll_course = local[data['enroll_course']]
+    kept = enroll_course >= 0
+    groups, enroll_group = np.unique(data['enroll_group'][kept], return_inverse=True)
+
+    # Groups that differed only outside the subset are merged again
+    weights = data['group_weights'][groups]
+    return _fitness_data(int(weights.sum()), data['slot_day'], enroll_group.astype(np.int64),
+                         enroll_course[kept], len(course_indices), data['max_per_day'], weights)
+
+def touching_fitness_data(data, course_indices):
+    """
+    Fitness data over all courses but only the student groups enrolled in at
+    least one of course_indices. Moving those courses cannot change the
+    violations of the other groups, so this is enough to compare assignments
+    that differ only on course_indices.
+
+    Returns:
+        dict: Same layout as compile_fitness_data
+    """
+    groups, _ = course_groups_of(course_indices, data)
+    keep = np.zeros(data['n_groups'], dtype=bool)
+    keep[groups] = True
+    kept = keep[data['enroll_group']]
+    groups, enroll_group = np.unique(data['enroll_group'][kept], return_inverse=True)
+
+    weights = data['group_weights'][groups]
+    return _fitness_data(int(weights.sum()), data['slot_day'], enroll_group.astype(np.int64),
+                         data['enroll_course'][kept], data['n_courses'], data['max_per_day'], weights)
+
+def group_students(enroll_student, enroll_course, n_students, weights=None):
+    """
+    Collapse students with identical course lists into weighted groups. Members
+    of a group always have the same exams on the same days, so each group is
+    counted once and its violations are multiplied by its size.
+
+    Args:
+        enroll_student: Student index of every enrollment
+        enroll_course: Course index of every enrollment
+        n_students: Number of students
+        weights: Optional weight per student (default 1)
+
+    Returns:
+        tuple: (student_group, enroll_group, group_course, group_weights) where
+               student_group maps students to groups (-1 without enrollments)
+               and enroll_group/group_course are the enrollments of one
+               representative per group
+    """
+    order = np.lexsort((enroll_course, enroll_student))
+    students = enroll_student[order]
+    courses = enroll_course[order]
+
+    student_group = np.full(n_students, -1, dtype=np.int64)
+    if len(students) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return student_group, empty, empty, empty
+
+    starts = np.flatnonzero(np.concatenate([[True], students[1:] != students[:-1]]))
+    lengths = np.diff(np.append(starts, len(students)))
+
+    # Canonical key per student: the bytes of its sorted course list
+    keys = {}
+    member_group = np.array([
+        keys.setdefault(course_list.tobytes(), len(keys)) for course_list in np.split(courses, starts[1:])
+    ], dtype=np.int64)
+    student_group[students[starts]] = member_group
+
+    member_weights = np.ones(len(starts)) if weights is None else np.asarray(weights)[students[starts]]
+    group_weights = np.bincount(member_group, weights=member_weights, minlength=len(keys)).astype(np.int64)
+
+    representative = np.zeros(len(starts), dtype=bool)
+    representative[np.unique(member_group, return_index=True)[1]] = True
+    rows = np.repeat(representative, lengths)
+
+    return (student_group, np.repeat(member_group, lengths)[rows], courses[rows], group_weights)
+
+def _fitness_data(n_students, slot_day, enroll_student, enroll_course, n_courses, max_per_day,
+                  student_weights=None):
+    _, enroll_group, enroll_course, group_weights = group_students(
+        enroll_student, enroll_course, n_students, student_weights
+    )
+
+    # Course -> groups CSR used by incremental evaluation
+    course_sizes = np.bincount(enroll_course, weights=group_weights[enroll_group],
+                               minlength=n_courses).astype(np.int64)
+    course_ptr = np.concatenate([[0], np.cumsum(np.bincount(enroll_course, minlength=n_courses))]).astype(np.int64)
+    order = np.argsort(enroll_course, kind='stable')
+
+    # Room-split term depends only on course sizes, so it is computed once
+    room_split_penalty = ROOM_SPLIT_PENALTY * int((course_sizes > ROOM_SPLIT_THRESHOLD).sum())
+
+    n_days = int(slot_day.max()) + 1 if len(slot_day) else 0
+    return {
+        'n_courses': n_courses,
+        'n_students': n_students,
+        'n_groups': len(group_weights),
+        'n_days': n_days,
+        'slot_day': slot_day,
+        'group_weights': group_weights,
+        'cell_weights': np.repeat(group_weights, n_days),
+        'enroll_group': enroll_group,
+        'enroll_course': enroll_course,
+        'course_sizes': course_sizes,
+        'course_ptr': course_ptr,
+        'course_groups': enroll_group[order],
+        'room_split_penalty': room_split_penalty,
+        'max_per_day': max_per_day
+    }
+
+def count_violations(genes, data):
+    """
+    Count extra same-day exams for every individual in one batched pass.
+
+    Args:
+        genes: Integer array of shape (population, n_courses) with slot indices
+        data: Output of compile_fitness_data
+
+    Returns:
+        numpy.ndarray: Violations per individual, weighted by group size
+    """
+    genes = np.asarray(genes, dtype=np.int64)
+    n_pop = genes.shape[0]
+    violations = np.zeros(n_pop, dtype=np.int64)
+
+    n_cells = data['n_groups'] * data['n_days']
+    if n_pop == 0 or n_cells == 0:
+        return violations
+
+    block = max(1, _BLOCK_CELLS // n_cells)
+    cell_base = data['enroll_group'] * data['n_days']
+
+    for start in range(0, n_pop, block):
+        rows = genes[start:start + block]
+        n_rows = rows.shape[0]
+
+        # Day of every enrollment for every individual, offset into its own counter row
+        enroll_days = data['slot_day'][rows[:, data['enroll_course']]]
+        keys = enroll_days + cell_base + (np.arange(n_rows) * n_cells)[:, None]
+
+        counts = np.bincount(keys.ravel(), minlength=n_rows * n_cells).reshape(n_rows, n_cells)
+        violations[start:start + n_rows] = np.maximum(counts - data['max_per_day'], 0) @ data['cell_weights']
+
+    return violations
+
+def evaluate_population(genes, data):
+    """
+    Score a whole population at once.
+
+    Args:
+        genes: Integer array of shape (population, n_courses) with slot indices
+        data: Output of compile_fitness_data
+
+    Returns:
+        numpy.ndarray: Fitness per individual (higher is better)
+    """
+    violations = count_violations(genes, data)
+    penalty = violations * HARD_PENALTY + data['room_split_penalty']
+    return (BASE_SCORE - penalty).astype(float)
+
+def course_groups_of(course_indices, data):
+    """
+    Gather the enrolled student groups of several courses from the CSR arrays.
+
+    Returns:
+        tuple: (groups, lengths) where groups is the concatenation of each
+               course's group indices and lengths the per-course counts
+    """
+    course_indices = np.asarray(course_indices, dtype=np.int64)
+    starts = data['course_ptr'][course_indices]
+    lengths = data['course_ptr'][course_indices + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), lengths
+
+    # Flat positions of every range without a Python loop over courses
+    shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return data['course_groups'][np.arange(total) + shifts], lengths
+
+def init_eval_state(genes, data):
+    """
+    Build the per-(student group, day) exam counters for one individual.
+
+    Returns:
+        dict: {'genes', 'counts', 'violations'}
+    """
+    genes = np.array(genes, dtype=np.int64)
+    keys = data['enroll_group'] * data['n_days'] + data['slot_day'][genes[data['enroll_course']]]
+    counts = np.bincount(keys, minlength=data['n_groups'] * data['n_days']).astype(np.int32)
+    violations = int(np.maximum(counts - data['max_per_day'], 0) @ data['cell_weights'])
+    return {'genes': genes, 'counts': counts, 'violations': violations}
+
+def apply_gene_changes(state, genes, changed, data):
+    """
+    Update an evaluation state in place for a set of changed genes.
+
+    Only the student groups enrolled in the changed courses are touched, so the cost
+    is proportional to their enrollments rather than to all enrollments.
+
+    Args:
+        state: Output of init_eval_state for the previous genes
+        genes: New slot vector
+        changed: Indices of courses whose slot differs from state['genes']
+        data: Output of compile_fitness_data
+
+    Returns:
+        int: Updated violation count
+    """
+    genes = np.asarray(genes, dtype=np.int64)
+    changed = np.asarray(changed, dtype=np.int64)
+
+    old_days = data['slot_day'][state['genes'][changed]]
+    new_days = data['slot_day'][genes[changed]]
+    state['genes'][changed] = genes[changed]
+
+    # Moves within the same day cannot change any student's daily count
+    moved = old_days != new_days
+    if not moved.any():
+        return state['violations']
+
+    groups, lengths = course_groups_of(changed[moved], data)
+    if len(groups) == 0:
+        return state['violations']
+
+    cells = groups * data['n_days']
+    removed = cells + np.repeat(old_days[moved], lengths)
+    added = cells + np.repeat(new_days[moved], lengths)
+
+    counts = state['counts']
+    max_per_day = data['max_per_day']
+    touched = np.unique(np.concatenate([removed, added]))
+    weights = data['cell_weights'][touched]
+    before = np.maximum(counts[touched] - max_per_day, 0) @ weights
+
+    np.subtract.at(counts, removed, 1)
+    np.add.at(counts, added, 1)
+
+    after = np.maximum(counts[touched] - max_per_day, 0) @ weights
+    state['violations'] += int(after - before)
+    return state['violations']
+
+def gene_change_delta(state, changed, new_slots, data):
+    """
+    Change in violations if the given courses moved to new slots, without
+    modifying the state. Used to rank candidate moves in local search.
+
+    Args:
+        state: Output of init_eval_state for the current genes
+        changed: Indices of the courses to move
+        new_slots: New slot of each changed course
+        data: Output of compile_fitness_data
+
+    Returns:
+        int: Violations after the move minus violations before it
+    """
+    changed = np.asarray(changed, dtype=np.int64)
+    new_slots = np.asarray(new_slots, dtype=np.int64)
+
+    old_days = data['slot_day'][state['genes'][changed]]
+    new_days = data['slot_day'][new_slots]
+    moved = old_days != new_days
+    if not moved.any():
+        return 0
+
+    groups, lengths = course_groups_of(changed[moved], data)
+    if len(groups) == 0:
+        return 0
+
+    cells = groups * data['n_days']
+    removed = cells + np.repeat(old_days[moved], lengths)
+    added = cells + np.repeat(new_days[moved], lengths)
+
+    # Net count change per touched cell; a group in several moved courses is summed correctly
+    touched, inverse = np.unique(np.concatenate([removed, added]), return_inverse=True)
+    n_removed = len(removed)
+    diff = (np.bincount(inverse[n_removed:], minlength=len(touched)) -
+            np.bincount(inverse[:n_removed], minlength=len(touched)))
+
+    counts = state['counts'][touched].astype(np.int64)
+    max_per_day = data['max_per_day']
+    excess = np.maximum(counts + diff - max_per_day, 0) - np.maximum(counts - max_per_day, 0)
+    return int(excess @ data['cell_weights'][touched])
+
+def evaluate_incremental(individuals, data):
+    """
+    Score individuals using the evaluation state they inherited from a parent.
+
+    Each individual carries an ``eval_state`` attribute that DEAP's clone copies
+    to offspring. Offspring that differ from that state in a few genes are
+    rescored with apply_gene_changes; the rest get a full recount.
+
+    Returns:
+        numpy.ndarray: Fitness per individual (higher is better)
+    """
+    max_changed = DELTA_MAX_CHANGED_FRACTION * data['n_courses']
+    violations = np.zeros(len(individuals), dtype=np.int64)
+
+    for i, individual in enumerate(individuals):
+        genes = np.asarray(individual, dtype=np.int64)
+        state = getattr(individual, 'eval_state', None)
+
+        changed = None
+        if state is not None and len(state['genes']) == len(genes):
+            changed = np.flatnonzero(state['genes'] != genes)
+
+        if changed is None or len(changed) > max_changed:
+            state = init_eval_state(genes, data)
+            individual.eval_state = state
+        elif len(changed) > 0:
+            apply_gene_changes(state, genes, changed, data)
+
+        violations[i] = state['violations']
+
+    penalty = violations * HARD_PENALTY + data['room_split_penalty']
+    return (BASE_SCORE - penalty).astype(float)
+
+class FitnessCache:
+    """
+    Bounded LRU cache of fitness values keyed on a compact hash of the slot vector.
+    Converged populations contain many identical individuals, which are then
+    scored once.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(genes):
+        """16-byte digest of a slot vector."""
+        return hashlib.blake2b(np.asarray(genes, dtype=np.int32).tobytes(), digest_size=16).digest()
+
+    def get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'max_size': self.max_size
+        }
+
+def cached_evaluator(evaluate_fn, cache):
+    """
+    Wrap a batch evaluator so that cached individuals are not rescored and
+    duplicates within a batch are evaluated once.
+
+    Args:
+        evaluate_fn: Callable taking a list of individuals, returning scores
+        cache: FitnessCache
+
+    Returns:
+        Callable with the same signature as evaluate_fn
+    """
+    def evaluate(individuals):
+        scores = np.empty(len(individuals), dtype=float)
+        pending = {}
+        for i, individual in enumerate(individuals):
+            key = cache.key(individual)
+            score = cache.get(key)
+            if score is None:
+                pending.setdefault(key, []).append(i)
+            else:
+                scores[i] = score
+
+        if pending:
+            first = [positions[0] for positions in pending.values()]
+            fresh = evaluate_fn([individuals[i] for i in first])
+            for (key, positions), score in zip(pending.items(), fresh):
+                cache.put(key, float(score))
+                scores[positions] = score
+
+        return scores
+
+    return evaluate
+
+def _init_worker(data):
+    """Pool initializer: keep the immutable enrollment arrays in the worker."""
+    global _worker_data
+    _worker_data = data
+
+def evaluate_chunk(genes):
+    """Evaluate a chunk of individuals inside a pool worker."""
+    return evaluate_population(genes, _worker_data)
+
+def create_evaluation_pool(data, workers=0):
+    """
+    Start a process pool whose workers already hold the compiled fitness data,
+    so tasks only carry the slot vectors being scored.
+
+    Args:
+        data: Output of compile_fitness_data
+        workers: Number of worker processes (0 = all CPU cores)
+
+    Returns:
+        ProcessPoolExecutor
+    """
+    workers = workers or os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,))
@@ -0,0 +1,225 @@
+import random
+import numpy as np
+import networkx as nx
+from collections import defaultdict
+
+from app.conflict_graph import ConflictGraph
+
+COLORING_METHODS = ('dsatur', 'rlf')
+
+def _index_adjacency(G):
+    """
+    Node list plus neighbor indices and edge weights per node, read once from a
+    ConflictGraph or networkx.Graph so the colorings work on plain integers.
+    """
+    if isinstance(G, ConflictGraph):
+        boundaries = G.indptr[1:-1]
+        return (G.nodes(), [a.tolist() for a in np.split(G.indices, boundaries)],
+                [w.tolist() for w in np.split(G.weights, boundaries)])
+    
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    adjacency, weights = [], []
+    for node in nodes:
+        items = G[node].items()
+        adjacency.append([index[neighbor] for neighbor, _ in items])
+        weights.append([attrs.get('weight', 1) for _, attrs in items])
+    return nodes, adjacency, weights
+
+def dsatur_coloring(G, rng=None):
+    """
+    Color the conflict graph with DSatur: repeatedly color the vertex that sees
+    the most distinct neighbor colors, breaking ties by weighted degree (shared
+    students when edges carry a 'weight') so heavy conflicts are placed first.
+
+    Args:
+        G: Conflict graph (ConflictGraph or networkx.Graph)
+        rng: Optional random.Random for randomized tie-breaking
+
+    Returns:
+        dict: {node: color} with colors 0, 1, 2, ...
+    """
+    nodes, adjacency, weights = _index_adjacency(G)
+    tiebreak = [rng.random() if rng else 0.0 for _ in nodes]
+    degree = [sum(w) for w in weights]
+    neighbor_colors = [set() for _ in nodes]
+
+    colors = [None] * len(nodes)
+    uncolored = dict.fromkeys(range(len(nodes)))  # insertion-ordered for deterministic ties
+    while uncolored:
+        node = max(uncolored, key=lambda n: (len(neighbor_colors[n]), degree[n], tiebreak[n]))
+
+        color = 0
+        while color in neighbor_colors[node]:
+            color += 1
+
+        colors[node] = color
+        del uncolored[node]
+        for neighbor in adjacency[node]:
+            if neighbor in uncolored:
+                neighbor_colors[neighbor].add(color)
+
+    return dict(zip(nodes, colors))
+
+def rlf_coloring(G, rng=None):
+    """
+    Color the conflict graph with Recursive Largest First: build one color
+    class at a time as a large independent set of the uncolored vertices.
+
+    Args:
+        G: Conflict graph (ConflictGraph or networkx.Graph)
+        rng: Optional random.Random for randomized tie-breaking
+
+    Returns:
+        dict: {node: color} with colors 0, 1, 2, ...
+    """
+    nodes, adjacency, _ = _index_adjacency(G)
+    tiebreak = [rng.random() if rng else 0.0 for _ in nodes]
+
+    colors = [None] * len(nodes)
+    uncolored = dict.fromkeys(range(len(nodes)))
+    color = 0
+    while uncolored:
+        # Candidates that can still join this color, and those excluded from it
+        candidates = dict.fromkeys(uncolored)
+        excluded = set()
+
+        node = max(candidates, key=lambda n: (
+            sum(1 for nb in adjacency[n] if nb in uncolored), tiebreak[n]
+        ))
+        while True:
+            colors[node] = color
+            del uncolored[node]
+            del candidates[node]
+            for neighbor in adjacency[node]:
+                if neighbor in candidates:
+                    del candidates[neighbor]
+                    excluded.add(neighbor)
+
+            if not candidates:
+                break
+
+            # Prefer vertices that share the most neighbors with the excluded set
+            node = max(candidates, key=lambda n: (
+                sum(1 for nb in adjacency[n] if nb in excluded),
+                -sum(1 for nb in adjacency[n] if nb in candidates),
+                tiebreak[n]
+            ))
+
+        color += 1
+
+    return dict(zip(nodes, colors))
+
+def coloring_to_slots(coloring, G, courses, time_slots, course_sizes, rng=None):
+    """
+    Map a coloring to a slot vector: colors become exam days, and each day's
+    courses are spread over that day's slots to balance student load.
+
+    Colors beyond the number of days are folded onto the day where the course
+    clashes least with already placed neighbors (by edge 'weight' when present).
+
+    Args:
+        coloring: {course_id: color}
+        G: Conflict graph the coloring was computed on
+        courses: List of course IDs in chromosome order
+        time_slots: List of slot dicts with a 'date' key
+        course_sizes: Enrolled students per course, in chromosome order
+        rng: Optional random.Random for randomized tie-breaking
+
+    Returns:
+        list: Slot index per course
+    """
+    days = list(dict.fromkeys(slot['date'] for slot in time_slots))
+    day_slots = defaultdict(list)
+    for slot_idx, slot in enumerate(time_slots):
+        day_slots[days.index(slot['date'])].append(slot_idx)
+
+    n_days = len(days)
+    jitter = (lambda: rng.random()) if rng else (lambda: 0.0)
+    index_of = {course_id: i for i, course_id in enumerate(courses)}
+    order = sorted(range(len(courses)), key=lambda i: (coloring.get(courses[i], -1), -course_sizes[i]))
+
+    # Graph neighbors translated to chromosome positions
+    nodes, adjacency, weights = _index_adjacency(G)
+    chromosome = [index_of.get(node) for node in nodes]
+    node_of = {course_id: n for n, course_id in enumerate(nodes)}
+
+    course_day = {}
+    day_load = [0] * n_days
+    for i in order:
+        course_id = courses[i]
+        color = coloring.get(course_id)
+
+        if color is not None and color < n_days:
+            day = color
+        else:
+            n = node_of.get(course_id)
+            neighbors = zip(adjacency[n], weights[n]) if n is not None else []
+            clashes = [0] * n_days
+            for neighbor, weight in neighbors:
+                j = chromosome[neighbor]
+                if j is not None and j in course_day:
+                    clashes[course_day[j]] += weight
+            day = min(range(n_days), key=lambda d: (clashes[d], day_load[d], jitter()))
+
+        course_day[i] = day
+        day_load[day] += course_sizes[i]
+
+    slot_load = [0] * len(time_slots)
+    genes = [0] * len(courses)
+    for i in sorted(range(len(courses)), key=lambda i: -course_sizes[i]):
+        slot_idx = min(day_slots[course_day[i]], key=lambda s: (slot_load[s], jitter()))
+        genes[i] = slot_idx
+        slot_load[slot_idx] += course_sizes[i]
+
+    return genes
+
+def color_courses(G, courses, time_slots, course_sizes, method='dsatur', rng=None):
+    """
+    Construct a timetable greedily from the conflict graph.
+
+    Args:
+        G: Conflict graph (ConflictGraph or networkx.Graph)
+        courses: List of course IDs in chromosome order
+        time_slots: List of slot dicts with a 'date' key
+        course_sizes: Enrolled students per course, in chromosome order
+        method: 'dsatur' or 'rlf'
+        rng: Optional random.Random for randomized tie-breaking
+
+    Returns:
+        list: Slot index per course
+    """
+    if method == 'dsatur':
+        coloring = dsatur_coloring(G, rng)
+    elif method == 'rlf':
+        coloring = rlf_coloring(G, rng)
+    else:
+        raise ValueError(f"Unknown coloring method '{method}', expected one of {COLORING_METHODS}")
+
+    return coloring_to_slots(coloring, G, courses, time_slots, course_sizes, rng)
+
+def seed_population(G, courses, time_slots, course_sizes, n_seeds, rng=None):
+    """
+    Generate diverse constructed slot vectors for seeding a GA population,
+    alternating DSatur and RLF with randomized tie-breaking.
+
+    Returns:
+        list: n_seeds slot vectors
+    """
+    rng = rng or random.Random()
+    return [
+        color_courses(G, courses, time_slots, course_sizes, COLORING_METHODS[k % 2], rng)
+        for k in range(n_seeds)
+    ]
+
+if __name__ == "__main__":
+    # Demo: a 5-cycle needs three colors
+    G = nx.cycle_graph(['C001', 'C002', 'C003', 'C004', 'C005'])
+    time_slots = [
+        {'date': day, 'start_time': '09:00', 'end_time': '12:00'}
+        for day in ['2024-05-01', '2024-05-02', '2024-05-03']
+    ]
+
+    for method in COLORING_METHODS:
+        genes = color_courses(G, list(G.nodes()), time_slots, [10] * 5, method)
+        print(f"{method}: {dict(zip(G.nodes(), genes))}")
@@ -1,7 +1,9 @@
 import pandas as pd
 from collections import defaultdict
 
-def assign_invigilators(timetable, invigilators_df, config):
+from app.problem_instance import compile_teachers
+
+def assign_invigilators(timetable, invigilators_df, config, instance=None):
     """
     Assign invigilators to exam rooms respecting availability and load limits.
     
@@ -9,6 +11,7 @@ def assign_invigilators(timetable, invigilators_df, config):
         timetable: List of exam assignments with room allocations
         invigilators_df: DataFrame with teacher information and availability
         config: Configuration with max_rooms_per_teacher
+        instance: Optional ProblemInstance whose compiled teachers are used
     
     Returns:
         Updated timetable with invigilator assignments and warnings
@@ -17,11 +20,15 @@ def assign_invigilators(timetable, invigilators_df, config):
     updated_timetable = []
     warnings = []
     
+    # Availability is turned into (date, time) sets once rather than rescanned per room
+    teachers = instance.teachers if instance is not None and instance.teachers else compile_teachers(invigilators_df)
+    
     # Track teacher assignments per slot
     teacher_assignments = defaultdict(lambda: defaultdict(int))  # {slot: {teacher_id: room_count}}
     
     for exam in timetable:
         slot_key = f"{exam['slot_date']}_{exam['slot_time']}"
+        slot = (exam['slot_date'], exam['slot_time'])
         
         for assignment in exam['assignments']:
             room_id = assignment['room_id']
@@ -29,20 +36,9 @@ def assign_invigilators(timetable, invigilators_df, config):
             # Find available teacher for this slot
             assigned_teacher = None
             
-            for _, teacher in invigilators_df.iterrows():
-                teacher_id = teacher['teacher_id']
-                availability = teacher.get('availability', [])
-                
+            for teacher_id, availability in teachers:
                 # Check if teacher is available for this slot
-                is_available = True
-                if availability:  # If availability is specified, check it
-                    slot_available = any(
-                        slot.get('date') == exam['slot_date'] and 
-                        slot.get('time') == exam['slot_time']
-                        for slot in availability
-                    )
-                    if not slot_available:
-                        is_available = False
+                is_available = availability is None or slot in availability
                 
                 # Check if teacher hasn't exceeded room limit
                 current_rooms = teacher_assignments[slot_key][teacher_id]
@@ -0,0 +1,245 @@
+import os
+import time
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from deap import creator, tools
+
+from app.fitness import evaluate_population, FitnessCache, cached_evaluator
+from app.local_search import course_neighbors, memetic_operator
+from app.scheduler_core import create_toolbox, evolve
+
+TOPOLOGIES = ('ring', 'complete', 'random')
+
+# Fitness data and GA parameters installed once per worker by _init_island_worker
+_island_context = None
+
+def _init_island_worker(fitness_data, ga_params):
+    """Pool initializer: keep enrollment arrays, GA settings, a fitness cache and
+    the local-search adjacency in the worker."""
+    global _island_context
+    cache_size = ga_params.get('cache_size', 0)
+    memetic = ga_params.get('local_search', {}).get('enabled', False)
+    _island_context = {
+        'data': fitness_data,
+        'params': ga_params,
+        'cache': FitnessCache(cache_size) if cache_size > 0 else None,
+        'neighbors': course_neighbors(fitness_data) if memetic else None
+    }
+
+def evolve_island(genes, scores, ngen, seed, time_limit=None, target_score=None,
+                  fitness_data=None, ga_params=None):
+    """
+    Evolve one island's population for ngen generations.
+
+    Args:
+        genes: List of slot vectors
+        scores: Fitness of each vector, or None where it is unknown
+        ngen: Generations to run before the next migration
+        seed: Seed for this island's random stream
+        time_limit: Remaining wall-clock budget in seconds
+        target_score: Stop early once this score is reached
+        fitness_data: Compiled fitness data (defaults to the worker's copy)
+        ga_params: Dict with n_courses, n_slots, cxpb, mutpb, tournament_size
+            and optionally local_search
+
+    Returns:
+        tuple: (genes, scores, generations_run) of the evolved population
+    """
+    data = fitness_data if fitness_data is not None else _island_context['data']
+    params = ga_params if ga_params is not None else _island_context['params']
+    n_courses = params['n_courses']
+
+    # Forked workers share the parent's random state, so every task reseeds
+    random.seed(seed)
+
+    toolbox = create_toolbox(n_courses, params['n_slots'], params['tournament_size'])
+    evaluate_fn = lambda individuals: evaluate_population(
+        np.array(individuals, dtype=np.int64).reshape(len(individuals), n_courses), data
+    )
+    cache = _island_context['cache'] if _island_context is not None else None
+    if cache is not None:
+        evaluate_fn = cached_evaluator(evaluate_fn, cache)
+    toolbox.register("evaluate_population", evaluate_fn)
+
+    ls_config = params.get('local_search', {})
+    if ls_config.get('enabled', False):
+        neighbors = _island_context['neighbors'] if _island_context is not None else None
+        toolbox.register("improve", memetic_operator(data, ls_config, neighbors, random.Random(seed)))
+
+    population = []
+    for vector, score in zip(genes, scores):
+        individual = creator.Individual(vector)
+        if score is not None:
+            individual.fitness.values = (score,)
+        population.append(individual)
+
+    _, info = evolve(population, toolbox, cxpb=params['cxpb'], mutpb=params['mutpb'],
+                     ngen=ngen, halloffame=tools.HallOfFame(1),
+                     time_limit=time_limit, target_score=target_score)
+
+    return [list(ind) for ind in population], [ind.fitness.values[0] for ind in population], info['generations']
+
+def _evolve_island_task(genes, scores, ngen, seed, time_limit, target_score):
+    return evolve_island(genes, scores, ngen, seed, time_limit, target_score)
+
+def migration_targets(n_islands, topology, rng):
+    """
+    List the destination islands of each source island.
+
+    Args:
+        n_islands: Number of islands
+        topology: 'ring', 'complete' or 'random'
+        rng: random.Random used by the random topology
+
+    Returns:
+        list: targets[i] is the list of islands receiving migrants from island i
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology '{topology}', expected one of {TOPOLOGIES}")
+    if n_islands < 2:
+        return [[] for _ in range(n_islands)]
+
+    if topology == 'ring':
+        return [[(i + 1) % n_islands] for i in range(n_islands)]
+    if topology == 'complete':
+        return [[j for j in range(n_islands) if j != i] for i in range(n_islands)]
+    return [[rng.choice([j for j in range(n_islands) if j != i])] for i in range(n_islands)]
+
+def migrate(islands, migration_size, topology, rng):
+    """
+    Copy the best individuals of every island over the worst of its targets.
+
+    Emigrants are chosen from the populations before any replacement happens,
+    so the exchange is synchronous and independent of island order.
+
+    Args:
+        islands: List of (genes, scores) tuples, modified in place
+        migration_size: Individuals sent per source/target pair
+        topology: 'ring', 'complete' or 'random'
+        rng: random.Random for the random topology
+
+    Returns:
+        list: The same islands list
+    """
+    targets = migration_targets(len(islands), topology, rng)
+
+    emigrants = []
+    for genes, scores in islands:
+        best = sorted(range(len(genes)), key=lambda i: scores[i], reverse=True)[:migration_size]
+        emigrants.append([(list(genes[i]), scores[i]) for i in best])
+
+    incoming = [[] for _ in islands]
+    for source, destinations in enumerate(targets):
+        for destination in destinations:
+            incoming[destination].extend(emigrants[source])
+
+    for (genes, scores), arrivals in zip(islands, incoming):
+        # Always keep at least one native individual
+        arrivals = arrivals[:max(0, len(genes) - 1)]
+        worst = sorted(range(len(genes)), key=lambda i: scores[i])[:len(arrivals)]
+        for slot, (vector, score) in zip(worst, arrivals):
+            genes[slot] = vector
+            scores[slot] = score
+
+    return islands
+
+def run_islands(fitness_data, ga_params, island_config, pop_size, generations, workers=0, seeds=None,
+                stagnation=0, target_score=None, time_limit=None, stop_event=None, callback=None):
+    """
+    Run an island-model GA: independent subpopulations evolve in separate
+    processes and exchange their best individuals every migration interval.
+    Stopping criteria are the same as scheduler_core.evolve; stagnation, the
+    stop event and the callback are handled between migrations.
+
+    Args:
+        fitness_data: Output of compile_fitness_data
+        ga_params: Dict with n_courses, n_slots, cxpb, mutpb, tournament_size
+        island_config: Dict with count, migration_interval, migration_size, topology
+        pop_size: Individuals per island
+        generations: Total generations per island
+        workers: Worker processes (0 = one per island, capped at CPU count)
+        seeds: Optional constructed slot vectors, dealt round-robin to the islands
+        stagnation, target_score, time_limit, stop_event, callback: See evolve
+
+    Returns:
+        tuple: (best_genes, best_score, info)
+    """
+    n_islands = island_config.get('count', 4)
+    interval = max(1, island_config.get('migration_interval', 10))
+    migration_size = island_config.get('migration_size', 2)
+    topology = island_config.get('topology', 'ring')
+    rng = random.Random(random.getrandbits(32))
+
+    migration_targets(n_islands, topology, rng)  # validate topology up front
+
+    n_slots = ga_params['n_slots']
+    islands = []
+    for _ in range(n_islands):
+        genes = [[rng.randint(0, n_slots - 1) for _ in range(ga_params['n_courses'])]
+                 for _ in range(pop_size)]
+        islands.append((genes, [None] * pop_size))
+
+    for k, vector in enumerate(seeds or []):
+        island_genes = islands[k % n_islands][0]
+        island_genes[(k // n_islands) % pop_size] = list(vector)
+
+    start = time.monotonic()
+    best_genes, best_score = None, None
+    last_improvement = 0
+    done = 0
+    stop_reason = 'generations'
+
+    workers = workers or min(n_islands, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_island_worker,
+                             initargs=(fitness_data, ga_params)) as pool:
+        remaining = generations
+        while True:
+            ngen = min(interval, remaining)
+            budget = None if time_limit is None else max(0.0, time_limit - (time.monotonic() - start))
+            futures = [
+                pool.submit(_evolve_island_task, genes, scores, ngen, rng.getrandbits(32),
+                            budget, target_score)
+                for genes, scores in islands
+            ]
+            results = [future.result() for future in futures]
+            islands = [(genes, scores) for genes, scores, _ in results]
+            done += max(generations_run for _, _, generations_run in results)
+            remaining -= ngen
+
+            for genes, scores in islands:
+                i = max(range(len(scores)), key=scores.__getitem__)
+                if best_score is None or scores[i] > best_score:
+                    best_score, best_genes = scores[i], list(genes[i])
+                    last_improvement = done
+
+            if callback is not None:
+                best_individual = creator.Individual(best_genes)
+                best_individual.fitness.values = (best_score,)
+                callback(done, best_individual)
+
+            if remaining <= 0:
+                break
+            if target_score is not None and best_score >= target_score:
+                stop_reason = 'target_reached'
+                break
+            if stagnation and done - last_improvement >= stagnation:
+                stop_reason = 'stagnation'
+                break
+            if time_limit is not None and time.monotonic() - start >= time_limit:
+                stop_reason = 'time_limit'
+                break
+            if stop_event is not None and stop_event.is_set():
+                stop_reason = 'cancelled'
+                break
+
+            migrate(islands, migration_size, topology, rng)
+
+    info = {
+        'generations': done,
+        'stop_reason': stop_reason,
+        'elapsed': time.monotonic() - start,
+        'best_score': best_score,
+        'islands': n_islands
+    }
+    return best_genes, best_score, info
@@ -0,0 +1,168 @@
+import time
+import uuid
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+
+JOB_STATES = ('queued', 'running', 'cancelling', 'succeeded', 'failed', 'cancelled')
+
+class JobCancelled(Exception):
+    """Raised inside a job whose cancellation was requested."""
+
+class QueueFull(Exception):
+    """Raised by submit when max_pending jobs are already waiting or running."""
+
+def check_cancelled(stop_event):
+    """Raise JobCancelled once stop_event is set; jobs call this between stages."""
+    if stop_event is not None and stop_event.is_set():
+        raise JobCancelled("Job was cancelled")
+
+def _run_job(fn, args, stop_event):
+    """Worker-side wrapper: a job cancelled while queued never starts."""
+    check_cancelled(stop_event)
+    return fn(*args, stop_event=stop_event)
+
+class JobQueue:
+    """
+    Bounded process pool running submitted jobs in the background.
+
+    Jobs are called as fn(*args, stop_event=event), where event is shared with
+    the worker process; cancel() sets it so a running job can stop at its next
+    check, and a queued job is dropped before it starts. Finished jobs are kept
+    for status and result lookups, the oldest beyond keep_finished are forgotten.
+    """
+
+    def __init__(self, workers=1, max_pending=20, keep_finished=100):
+        self.workers = max(1, int(workers))
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._executor = None
+        self._manager = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # The pool and the event manager start on first use, not at import
+        if self._executor is None:
+            self._manager = multiprocessing.Manager()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['future'].done()]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def submit(self, fn, *args, job_id=None):
+        """
+        Queue fn(*args) for a worker process.
+
+        Args:
+            fn: Module-level (picklable) function accepting a stop_event keyword
+            *args: Picklable arguments
+            job_id: Optional ID to use instead of a generated one
+
+        Returns:
+            str: Job ID
+        """
+        with self._lock:
+            self._start()
+            pending = sum(1 for job in self._jobs.values() if not job['future'].done())
+            if self.max_pending and pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs are already queued or running")
+
+            job_id = job_id or uuid.uuid4().hex
+            stop_event = self._manager.Event()
+            future = self._executor.submit(_run_job, fn, args, stop_event)
+            self._jobs[job_id] = {
+                'future': future,
+                'stop_event': stop_event,
+                'submitted_at': time.time(),
+                'finished_at': None
+            }
+            future.add_done_callback(lambda _, job=self._jobs[job_id]: job.update(finished_at=time.time()))
+            self._prune()
+        return job_id
+
+    def _state(self, job):
+        future = job['future']
+        if future.cancelled():
+            return 'cancelled'
+        if not future.done():
+            # Asked to stop, but the worker has not reached its next check yet
+            if job['stop_event'].is_set():
+                return 'cancelling'
+            return 'running' if future.running() else 'queued'
+        error = future.exception()
+        if isinstance(error, JobCancelled):
+            return 'cancelled'
+        return 'failed' if error is not None else 'succeeded'
+
+    def status(self, job_id):
+        """
+        State of a job.
+
+        Returns:
+            dict: {job_id, status, submitted_at, finished_at, elapsed, error},
+                  or None for unknown IDs
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        state = self._state(job)
+        end = job['finished_at'] or time.time()
+        error = None
+        if state == 'failed':
+            error = str(job['future'].exception())
+        return {
+            'job_id': job_id,
+            'status': state,
+            'submitted_at': job['submitted_at'],
+            'finished_at': job['finished_at'],
+            'elapsed': end - job['submitted_at'],
+            'error': error
+        }
+
+    def result(self, job_id):
+        """
+        Return value of a succeeded job; re-raises the exception of a failed one
+        and raises CancelledError for a cancelled one.
+
+        Raises:
+            KeyError: Unknown job ID
+        """
+        future = self._jobs[job_id]['future']
+        try:
+            return future.result(timeout=0)
+        except JobCancelled as e:
+            raise CancelledError(str(e))
+
+    def all_jobs(self):
+        """Status of every known job, oldest first."""
+        return [self.status(job_id) for job_id in list(self._jobs)]
+
+    def cancel(self, job_id):
+        """
+        Cancel a job: a queued one is dropped, a running one is asked to stop.
+
+        Returns:
+            bool: False for unknown or already finished jobs
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job['future'].done():
+            return False
+        job['stop_event'].set()
+        job['future'].cancel()
+        return True
+
+    def shutdown(self, wait=False):
+        """Cancel what is queued, stop running jobs and release the workers."""
+        with self._lock:
+            for job in self._jobs.values():
+                if not job['future'].done():
+                    job['stop_event'].set()
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._manager.shutdown()
+            self._executor = None
+            self._manager = None
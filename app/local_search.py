@@ -0,0 +1,226 @@
+import random
+import numpy as np
+from collections import deque
+
+from app.fitness import (
+    BASE_SCORE, HARD_PENALTY, init_eval_state, apply_gene_changes, gene_change_delta
+)
+
+def course_neighbors(data):
+    """
+    Conflict-graph adjacency by course index, derived from the fitness data.
+
+    Returns:
+        list: neighbors[c] is an array of the courses sharing a student with c
+    """
+    # Each student group contributes its course list once
+    order = np.argsort(data['enroll_group'], kind='stable')
+    groups = data['enroll_group'][order]
+    courses = data['enroll_course'][order]
+
+    neighbors = [set() for _ in range(data['n_courses'])]
+    boundaries = np.flatnonzero(np.diff(groups)) + 1
+    for course_list in np.split(courses, boundaries):
+        course_list = course_list.tolist()
+        if len(course_list) > 1:
+            for course in course_list:
+                neighbors[course].update(course_list)
+
+    return [
+        np.array(sorted(adjacent - {course}), dtype=np.int64)
+        for course, adjacent in enumerate(neighbors)
+    ]
+
+def conflicted_courses(state, data):
+    """Courses with at least one student over the daily limit on their day."""
+    cells = (data['enroll_group'] * data['n_days'] +
+             data['slot_day'][state['genes'][data['enroll_course']]])
+    over = state['counts'][cells] > data['max_per_day']
+    return np.unique(data['enroll_course'][over])
+
+def kempe_chain(course, other_day, genes, neighbors, slot_day):
+    """
+    Courses reachable from course through conflict edges while staying on
+    course's day or other_day. Swapping the days of the whole chain keeps every
+    edge inside it between the two days.
+    """
+    days = (slot_day[genes[course]], other_day)
+    chain = {course}
+    queue = deque([course])
+    while queue:
+        current = queue.popleft()
+        for neighbor in neighbors[current].tolist():
+            if neighbor not in chain and slot_day[genes[neighbor]] in days:
+                chain.add(neighbor)
+                queue.append(neighbor)
+    return sorted(chain)
+
+def candidate_moves(course, genes, neighbors, day_slots, slot_day, swap_candidates, rng):
+    """
+    Moves for one course as (changed, new_slots) pairs: a plain move and a
+    Kempe-chain swap to every other day, plus slot swaps with random courses on
+    other days. Courses keep their position within the day when they change day.
+    """
+    n_days = len(day_slots)
+    day = slot_day[genes[course]]
+    moves = []
+
+    def same_position(slot, target_day):
+        position = int(np.searchsorted(day_slots[slot_day[slot]], slot))
+        return day_slots[target_day][position % len(day_slots[target_day])]
+
+    for other_day in range(n_days):
+        if other_day == day or len(day_slots[other_day]) == 0:
+            continue
+        moves.append(([course], [same_position(genes[course], other_day)]))
+
+        chain = kempe_chain(course, other_day, genes, neighbors, slot_day)
+        if len(chain) > 1:
+            moves.append((chain, [
+                same_position(genes[c], other_day if slot_day[genes[c]] == day else day)
+                for c in chain
+            ]))
+
+    for _ in range(swap_candidates):
+        partner = rng.randrange(len(genes))
+        if slot_day[genes[partner]] != day:
+            moves.append(([course, partner], [genes[partner], genes[course]]))
+
+    return moves
+
+def local_search(genes, data, neighbors, max_iterations=50, tabu_tenure=7, swap_candidates=5,
+                 rng=None, state=None):
+    """
+    Improve a slot vector with tabu search over single moves, Kempe-chain swaps
+    and slot swaps. Each iteration picks a course involved in a violation and
+    applies its best non-tabu move, even if it is worsening; leaving a day makes
+    returning to it tabu for tabu_tenure iterations unless that would beat the
+    best solution found. Moves are scored incrementally from the day counters.
+
+    Args:
+        genes: Slot vector to improve
+        data: Output of compile_fitness_data
+        neighbors: Output of course_neighbors
+        max_iterations: Number of moves to make at most
+        tabu_tenure: Iterations a course may not return to a day it left
+        swap_candidates: Random slot-swap partners tried per iteration
+        rng: Optional random.Random
+        state: Optional init_eval_state of genes, to avoid a full recount
+
+    Returns:
+        tuple: (best_genes, best_state)
+    """
+    rng = rng or random.Random()
+    slot_day = data['slot_day']
+    day_slots = [np.flatnonzero(slot_day == d) for d in range(data['n_days'])]
+
+    if state is None or not np.array_equal(state['genes'], genes):
+        state = init_eval_state(genes, data)
+    else:
+        state = {'genes': state['genes'].copy(), 'counts': state['counts'].copy(),
+                 'violations': state['violations']}
+
+    best_genes = state['genes'].copy()
+    best_violations = state['violations']
+    tabu = {}  # (course, day) -> first iteration at which the course may return
+
+    if data['n_days'] < 2:
+        return best_genes.tolist(), state
+
+    for iteration in range(max_iterations):
+        if state['violations'] == 0:
+            break
+
+        conflicted = conflicted_courses(state, data)
+        course = int(conflicted[rng.randrange(len(conflicted))])
+        genes_now = state['genes']
+
+        best_move = None
+        for changed, new_slots in candidate_moves(course, genes_now, neighbors, day_slots, slot_day,
+                                                  swap_candidates, rng):
+            violations = state['violations'] + gene_change_delta(state, changed, new_slots, data)
+            is_tabu = any(tabu.get((c, slot_day[s]), 0) > iteration for c, s in zip(changed, new_slots))
+            if is_tabu and violations >= best_violations:
+                continue
+            key = (violations, rng.random())
+            if best_move is None or key < best_move[0]:
+                best_move = (key, changed, new_slots)
+
+        if best_move is None:
+            continue
+
+        _, changed, new_slots = best_move
+        for c in changed:
+            tabu[(c, slot_day[genes_now[c]])] = iteration + 1 + tabu_tenure
+
+        new_genes = genes_now.copy()
+        new_genes[changed] = new_slots
+        apply_gene_changes(state, new_genes, changed, data)
+
+        if state['violations'] < best_violations:
+            best_violations = state['violations']
+            best_genes = state['genes'].copy()
+
+    if state['violations'] != best_violations:
+        state = init_eval_state(best_genes, data)
+    return best_genes.tolist(), state
+
+def memetic_operator(data, ls_config, neighbors=None, rng=None):
+    """
+    Build the toolbox 'improve' step of the memetic GA: after each generation
+    is scored, the best offspring and a random share of the others are
+    replaced by their local-search optimum.
+
+    Args:
+        data: Output of compile_fitness_data
+        ls_config: Dict with rate, max_iterations, tabu_tenure, swap_candidates
+        neighbors: Optional output of course_neighbors
+        rng: Optional random.Random
+
+    Returns:
+        Callable taking the evaluated offspring list, modified in place
+    """
+    rng = rng or random.Random()
+    neighbors = course_neighbors(data) if neighbors is None else neighbors
+    rate = ls_config.get('rate', 0.1)
+    params = {
+        'max_iterations': ls_config.get('max_iterations', 50),
+        'tabu_tenure': ls_config.get('tabu_tenure', 7),
+        'swap_candidates': ls_config.get('swap_candidates', 5)
+    }
+
+    def improve(individuals):
+        if not individuals:
+            return
+        best = max(range(len(individuals)), key=lambda i: individuals[i].fitness.values[0])
+        others = [i for i in range(len(individuals)) if i != best]
+        n_random = min(len(others), max(0, int(round(rate * len(individuals))) - 1))
+        chosen = [best] + rng.sample(others, n_random)
+
+        for i in chosen:
+            individual = individuals[i]
+            genes, state = local_search(individual, data, neighbors, rng=rng,
+                                        state=getattr(individual, 'eval_state', None), **params)
+            individual[:] = genes
+            individual.fitness.values = (
+                float(BASE_SCORE - state['violations'] * HARD_PENALTY - data['room_split_penalty']),
+            )
+            if hasattr(individual, 'eval_state'):
+                individual.eval_state = state
+
+    return improve
+
+if __name__ == "__main__":
+    # Demo: six courses in a ring of shared students, three days
+    import pandas as pd
+    from app.fitness import compile_fitness_data
+
+    courses = [f'C{i:03d}' for i in range(6)]
+    enrollments_df = pd.DataFrame([
+        {'student_id': f'S{i:03d}', 'course_id': courses[(i + k) % 6]} for i in range(6) for k in range(2)
+    ])
+    time_slots = [{'date': day} for day in ['2024-05-01', '2024-05-02', '2024-05-03']]
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+
+    genes, state = local_search([0] * 6, data, course_neighbors(data), rng=random.Random(0))
+    print(f"Improved {[0] * 6} -> {genes} with {state['violations']} violations")
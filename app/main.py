@@ -15,6 +15,12 @@ from app.routes import upload, schedule
 app.include_router(upload.router)
 app.include_router(schedule.router)
 
+@app.on_event("shutdown")
+def stop_jobs():
+    # Running schedules are asked to stop; queued ones are dropped
+    if schedule.job_queue is not None:
+        schedule.job_queue.shutdown()
+
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import pandas as pd
+
+from app.parser import PARSER_VERSION, parse_csvs
+
+# Entries are parquet files; part of the key so entries of other formats are never read
+CACHE_FORMAT = 'parquet'
+
+FRAMES = ('students', 'courses', 'rooms', 'enrollments')
+HASH_BLOCK_SIZE = 1 << 20
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_key(students_csv_path, courses_csv_path, rooms_csv_path, compact=False):
+    """Key of a parse: the content of the three files, the parser version and mode."""
+    digest = hashlib.sha256(f"parser-{PARSER_VERSION}-{CACHE_FORMAT}{'-compact' if compact else ''}".encode())
+    for path in (students_csv_path, courses_csv_path, rooms_csv_path):
+        digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+def _parquet_safe(df):
+    """Copy of df whose object columns hold strings only; mixed types have no parquet type."""
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'empty')
+    ]
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def _write_frame(df, base_path):
+    _parquet_safe(df).to_parquet(base_path + '.parquet', index=False)
+
+def _read_frame(base_path):
+    return pd.read_parquet(base_path + '.parquet')
+
+def _entry_size(entry_path):
+    return sum(entry.stat().st_size for entry in os.scandir(entry_path) if entry.is_file())
+
+def evict(cache_dir, max_bytes, keep=None):
+    """
+    Remove the least recently used entries until the cache fits in max_bytes.
+
+    Args:
+        cache_dir: Cache directory
+        max_bytes: Size bound (0 = unbounded)
+        keep: Optional key that is never evicted
+
+    Returns:
+        list: Evicted keys
+    """
+    if not max_bytes or not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        meta_path = os.path.join(entry.path, 'meta.json')
+        if entry.is_dir() and os.path.exists(meta_path):
+            entries.append((os.stat(meta_path).st_mtime, entry.name, _entry_size(entry.path)))
+
+    total = sum(size for _, _, size in entries)
+    evicted = []
+    for _, key, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if key == keep:
+            continue
+        shutil.rmtree(os.path.join(cache_dir, key), ignore_errors=True)
+        total -= size
+        evicted.append(key)
+    return evicted
+
+def load_cached(cache_dir, key):
+    """Parsed data stored under key, or None on a miss."""
+    entry_path = os.path.join(cache_dir, key)
+    meta_path = os.path.join(entry_path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        parsed_data = {name: _read_frame(os.path.join(entry_path, name)) for name in FRAMES}
+    except (OSError, ValueError, EOFError):
+        # Partially evicted or corrupt entries count as misses
+        return None
+
+    parsed_data['unknown_codes'] = meta.get('unknown_codes', {})
+    # The meta file's mtime orders entries for eviction
+    os.utime(meta_path)
+    return parsed_data
+
+def store(cache_dir, key, parsed_data):
+    """Write parsed data under key; concurrent writers of the same key are harmless."""
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_path = os.path.join(cache_dir, key)
+    tmp_path = f"{entry_path}.tmp-{os.getpid()}-{time.monotonic_ns()}"
+    os.makedirs(tmp_path)
+    try:
+        for name in FRAMES:
+            _write_frame(parsed_data[name], os.path.join(tmp_path, name))
+        # Written last: an entry without meta.json is never read
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({'parser_version': PARSER_VERSION,
+                       'unknown_codes': parsed_data.get('unknown_codes', {})}, f)
+        os.rename(tmp_path, entry_path)
+    except OSError:
+        if not os.path.exists(os.path.join(entry_path, 'meta.json')):
+            raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+def cached_parse_csvs(students_csv_path, courses_csv_path, rooms_csv_path, cache_dir='data/parse_cache',
+                      max_bytes=0, compact=False):
+    """
+    parse_csvs with a content-addressed cache: parsed frames are stored under
+    a key derived from the file contents and the parser version, so a rerun
+    on the same uploads skips parsing entirely.
+
+    Args:
+        students_csv_path, courses_csv_path, rooms_csv_path: CSV paths
+        cache_dir: Directory holding one subdirectory per key
+        max_bytes: Evict least recently used entries above this size (0 = never)
+        compact: Passed on to parse_csvs; compact parses are cached separately
+
+    Returns:
+        dict: Output of parse_csvs plus 'cache': {key, hit}
+    """
+    try:
+        key = cache_key(students_csv_path, courses_csv_path, rooms_csv_path, compact)
+    except OSError as e:
+        raise ValueError(f"Error reading CSV files: {e}")
+
+    parsed_data = load_cached(cache_dir, key)
+    hit = parsed_data is not None
+    if not hit:
+        parsed_data = parse_csvs(students_csv_path, courses_csv_path, rooms_csv_path, compact)
+        store(cache_dir, key, parsed_data)
+        evict(cache_dir, max_bytes, keep=key)
+
+    parsed_data['cache'] = {'key': key, 'hit': hit}
+    return parsed_data
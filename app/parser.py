@@ -1,9 +1,99 @@
+import numpy as np
 import pandas as pd
-import re
 import os
 
-def parse_csvs(students_csv_path, courses_csv_path, rooms_csv_path):
-    """Parse CSV files and return normalized DataFrames"""
+# Bump when parsing results change, so that cached parses are not reused
+PARSER_VERSION = 2
+
+# Separators allowed between course codes in enrolled_courses
+COURSE_CODE_SEPARATORS = r'[,;|/\s]+'
+
+# Columns every input CSV must have (after lowercasing)
+REQUIRED_COLUMNS = {
+    'students': ['student_id', 'name', 'enrolled_courses'],
+    'courses': ['course_id', 'code', 'name'],
+    'rooms': ['room_id', 'name', 'capacity'],
+    'holidays': ['date']
+}
+
+# Rows per chunk when the students CSV is streamed
+DEFAULT_CHUNK_SIZE = 50000
+
+def validate_columns(df, kind):
+    """Raise ValueError if df lacks a required column of the given CSV kind."""
+    for col in REQUIRED_COLUMNS[kind]:
+        if col not in df.columns:
+            raise ValueError(f"Missing required column in {kind} CSV: {col}")
+
+def parse_enrollments(students_df, courses_df, compact=False):
+    """
+    Turn the enrolled_courses strings into (student_id, course_id) rows with
+    one vectorized split, an explode and a hash join on the course codes.
+    
+    Args:
+        students_df: DataFrame with student_id and enrolled_courses
+        courses_df: DataFrame with course_id and code; the first course of a
+            duplicated code wins
+        compact: Return student_id and course_id as categoricals whose codes
+            index the student and course lookup tables
+    
+    Returns:
+        tuple: (enrollments_df, unknown_codes) where unknown_codes maps every
+               code without a course to the number of enrollments naming it
+    """
+    codes = (
+        students_df['enrolled_courses'].reset_index(drop=True).fillna('').astype(str)
+        .str.split(COURSE_CODE_SEPARATORS, regex=True)
+        .explode()
+    )
+    # Leading or trailing separators leave empty strings, blank cells NaN
+    codes = codes[codes.notna() & (codes != '')]
+    
+    first = courses_df.drop_duplicates('code')
+    course_codes, course_labels = pd.factorize(first['course_id'])
+    code_index = pd.Series(course_codes, index=first['code'].astype(str))
+    course_positions = codes.map(code_index)
+    known = course_positions.notna()
+    unknown_codes = codes[~known].value_counts(sort=False).to_dict()
+    
+    rows = codes.index[known].to_numpy()
+    course_positions = course_positions[known].to_numpy(dtype=np.int64)
+    if compact:
+        student_codes, student_labels = pd.factorize(students_df['student_id'])
+        enrollments_df = pd.DataFrame({
+            'student_id': pd.Categorical.from_codes(student_codes[rows], categories=student_labels),
+            'course_id': pd.Categorical.from_codes(course_positions, categories=course_labels)
+        })
+    else:
+        enrollments_df = pd.DataFrame({
+            'student_id': students_df['student_id'].to_numpy()[rows],
+            'course_id': course_labels.to_numpy()[course_positions]
+        })
+    return enrollments_df, unknown_codes
+
+def compact_students(students_df):
+    """
+    Drop the raw enrolled_courses strings and store the text columns as
+    categoricals, so repeated sections and batch types are held once.
+    """
+    students_df = students_df.drop(columns='enrolled_courses')
+    for col in students_df.columns:
+        if students_df[col].dtype == object:
+            students_df[col] = students_df[col].astype('category')
+    return students_df
+
+def parse_csvs(students_csv_path, courses_csv_path, rooms_csv_path, compact=False):
+    """
+    Parse CSV files and return normalized DataFrames.
+    
+    Args:
+        compact: Intern IDs as categoricals (see parse_enrollments) and drop
+            the raw enrolled_courses column once it is parsed
+    
+    Returns:
+        dict: {students, courses, rooms, enrollments, unknown_codes} where
+              unknown_codes counts enrollments naming a code with no course
+    """
     
     # Read CSVs
     try:
@@ -19,73 +109,86 @@ def parse_csvs(students_csv_path, courses_csv_path, rooms_csv_path):
     rooms_df.columns = rooms_df.columns.str.lower()
     
     # Validate required columns
-    required_student_cols = ['student_id', 'name', 'enrolled_courses']
-    required_course_cols = ['course_id', 'code', 'name']
-    required_room_cols = ['room_id', 'name', 'capacity']
-    
-    for col in required_student_cols:
-        if col not in students_df.columns:
-            raise ValueError(f"Missing required column in students CSV: {col}")
-    
-    for col in required_course_cols:
-        if col not in courses_df.columns:
-            raise ValueError(f"Missing required column in courses CSV: {col}")
-    
-    for col in required_room_cols:
-        if col not in rooms_df.columns:
-            raise ValueError(f"Missing required column in rooms CSV: {col}")
-    
-    # Debug: Print actual CSV data
-    print("DEBUG: Students CSV data:")
-    print(students_df.head())
-    print(f"DEBUG: Student ID column type: {students_df['student_id'].dtype}")
-    print(f"DEBUG: First few student IDs: {students_df['student_id'].head().tolist()}")
-    print(f"DEBUG: All columns: {list(students_df.columns)}")
-    print(f"DEBUG: CSV shape: {students_df.shape}")
-    print("DEBUG: First 3 rows raw data:")
-    for i in range(min(3, len(students_df))):
-        row = students_df.iloc[i]
-        print(f"Row {i}: {dict(row)}")
-    
-    # Parse enrollments from students' enrolled_courses column
-    enrollments = []
-    print(f"DEBUG: Available course codes in courses_df: {courses_df['code'].tolist()}")
-    
-    for _, student in students_df.iterrows():
-        student_id = student['student_id']
-        enrolled_courses = str(student['enrolled_courses'])
-        print(f"DEBUG: Processing student_id={student_id}, enrolled_courses={enrolled_courses}")
-        
-        # Split by various separators
-        course_codes = re.split(r'[,;|/\s]+', enrolled_courses)
-        course_codes = [code.strip() for code in course_codes if code.strip()]
-        print(f"DEBUG: Parsed course codes: {course_codes}")
-        
-        for course_code in course_codes:
-            # Find course_id from courses_df
-            course_match = courses_df[courses_df['code'] == course_code]
-            if not course_match.empty:
-                course_id = course_match.iloc[0]['course_id']
-                enrollments.append({'student_id': student_id, 'course_id': course_id})
-                print(f"DEBUG: Added enrollment: student_id={student_id}, course_id={course_id}")
-            else:
-                print(f"DEBUG: Course code '{course_code}' not found in courses_df")
-    
-    enrollments_df = pd.DataFrame(enrollments)
-    print(f"DEBUG: Created enrollments_df with {len(enrollments_df)} rows")
-    if len(enrollments_df) > 0:
-        print(f"DEBUG: Enrollments columns: {list(enrollments_df.columns)}")
-        print(f"DEBUG: First few enrollments:\n{enrollments_df.head()}")
-    else:
-        print("DEBUG: No enrollments created - check course code matching!")
+    validate_columns(students_df, 'students')
+    validate_columns(courses_df, 'courses')
+    validate_columns(rooms_df, 'rooms')
     
-    print(f"DEBUG: Final result - Students: {len(students_df)}, Courses: {len(courses_df)}, Rooms: {len(rooms_df)}, Enrollments: {len(enrollments_df)}")
+    enrollments_df, unknown_codes = parse_enrollments(students_df, courses_df, compact)
+    if compact:
+        students_df = compact_students(students_df)
     
     return {
         'students': students_df,
         'courses': courses_df,
         'rooms': rooms_df,
-        'enrollments': enrollments_df
+        'enrollments': enrollments_df,
+        'unknown_codes': unknown_codes
+    }
+
+def iter_student_chunks(students_csv_path, courses_df, chunksize=DEFAULT_CHUNK_SIZE, unknown_codes=None):
+    """
+    Stream the students CSV in chunks of rows. Columns are validated on the
+    first chunk, and each chunk's enrolled_courses strings are parsed and then
+    dropped, so only one chunk of raw text is held at a time.
+    
+    Args:
+        students_csv_path: Path of the students CSV
+        courses_df: Courses DataFrame with lowercase columns
+        chunksize: Rows per chunk
+        unknown_codes: Optional dict receiving the unknown code counts of all chunks
+    
+    Yields:
+        tuple: (students_df, enrollments_df) per chunk, students_df without
+               the enrolled_courses column
+    """
+    try:
+        reader = pd.read_csv(students_csv_path, chunksize=chunksize)
+    except Exception as e:
+        raise ValueError(f"Error reading CSV files: {e}")
+    
+    with reader:
+        for i, students_df in enumerate(reader):
+            students_df.columns = students_df.columns.str.lower()
+            if i == 0:
+                validate_columns(students_df, 'students')
+            
+            enrollments_df, chunk_unknown = parse_enrollments(students_df, courses_df)
+            if unknown_codes is not None:
+                for code, count in chunk_unknown.items():
+                    unknown_codes[code] = unknown_codes.get(code, 0) + count
+            yield students_df.drop(columns='enrolled_courses'), enrollments_df
+
+def parse_csvs_streaming(students_csv_path, courses_csv_path, rooms_csv_path, config,
+                         chunksize=DEFAULT_CHUNK_SIZE, invigilators_df=None):
+    """
+    Parse the CSVs straight into a ProblemInstance, streaming the students
+    file in chunks so that peak memory does not grow with its raw size.
+    
+    Returns:
+        dict: {courses, rooms, instance, unknown_codes}
+    """
+    from app.problem_instance import compile_instance_from_chunks
+    
+    try:
+        courses_df = pd.read_csv(courses_csv_path)
+        rooms_df = pd.read_csv(rooms_csv_path)
+    except Exception as e:
+        raise ValueError(f"Error reading CSV files: {e}")
+    
+    courses_df.columns = courses_df.columns.str.lower()
+    rooms_df.columns = rooms_df.columns.str.lower()
+    validate_columns(courses_df, 'courses')
+    validate_columns(rooms_df, 'rooms')
+    
+    unknown_codes = {}
+    chunks = iter_student_chunks(students_csv_path, courses_df, chunksize, unknown_codes)
+    instance = compile_instance_from_chunks(chunks, courses_df, rooms_df, config, invigilators_df)
+    
+    return {
+        'courses': courses_df,
+        'rooms': rooms_df,
+        'instance': instance,
+        'unknown_codes': unknown_codes
     }
 
 if __name__ == "__main__":
@@ -110,6 +213,8 @@ if __name__ == "__main__":
             print(f"Courses: {len(result['courses'])} rows")
             print(f"Rooms: {len(result['rooms'])} rows")
             print(f"Enrollments: {len(result['enrollments'])} rows")
+            if result['unknown_codes']:
+                print(f"Unknown course codes: {result['unknown_codes']}")
             
         except Exception as e:
             print(f"Error: {e}")
@@ -0,0 +1,156 @@
+import math
+import numpy as np
+
+from app.conflict_graph import ConflictGraph, build_conflict_graph
+from app.graph_coloring import dsatur_coloring
+
+# Overloaded students listed in the report
+MAX_REPORTED_STUDENTS = 20
+
+def greedy_clique(neighbor_sets, start):
+    """
+    Grow a clique from the nodes in start (which must already be a clique) by
+    repeatedly adding the common neighbor with the most common neighbors.
+
+    Returns:
+        list: Node indices of the clique
+    """
+    clique = list(start)
+    common = set.intersection(*(neighbor_sets[n] for n in clique)) if clique else set()
+    while common:
+        node = max(common, key=lambda n: (len(common & neighbor_sets[n]), -n))
+        clique.append(node)
+        common &= neighbor_sets[node]
+    return clique
+
+def largest_clique(graph, student_sets, n_starts=50):
+    """
+    Lower bound on the maximum clique: every student's course set is a clique,
+    and greedily extending the largest sets and the highest-degree courses
+    often finds bigger ones.
+
+    Args:
+        graph: ConflictGraph
+        student_sets: Course index lists (graph node indices), one per student
+        n_starts: Highest-degree courses also used as starting points
+
+    Returns:
+        list: Node indices of the largest clique found
+    """
+    neighbor_sets = graph.neighbor_sets()
+    starts = sorted(student_sets, key=len, reverse=True)[:n_starts]
+    starts += [[int(n)] for n in np.argsort(-graph.degrees, kind='stable')[:n_starts]]
+
+    best = []
+    for start in starts:
+        clique = greedy_clique(neighbor_sets, start)
+        if len(clique) > len(best):
+            best = clique
+    return best
+
+def analyze_feasibility(instance, config, conflict_graph=None):
+    """
+    Check cheap necessary conditions for a valid timetable before searching.
+
+    A student with k exams needs ceil(k / max_per_day) days. With one exam per
+    student per day, every clique of the conflict graph must get distinct days,
+    so the largest clique found is a lower bound on the days needed; a DSatur
+    coloring gives an upper bound. Every course must fit the total room
+    capacity in one slot, and all enrollments must fit the seats of all slots.
+
+    Args:
+        instance: ProblemInstance
+        config: Configuration with max_exams_per_student_per_day
+        conflict_graph: Optional ConflictGraph or networkx.Graph of the instance
+
+    Returns:
+        dict: {feasible, issues, n_days, min_days, coloring_days, extra_days_needed,
+               max_clique, overloaded_students, oversized_courses}
+    """
+    max_per_day = config.get('max_exams_per_student_per_day', 1)
+    n_days = instance.n_days
+    slots_per_day = len(instance.time_slots) / n_days if n_days else 0
+    issues = []
+
+    if conflict_graph is None:
+        conflict_graph = build_conflict_graph(None, instance=instance, output='csr')
+    elif not isinstance(conflict_graph, ConflictGraph):
+        conflict_graph = ConflictGraph.from_networkx(conflict_graph)
+
+    # Students who cannot fit their exams into the period at all
+    exams_per_student = np.diff(instance.student_ptr)
+    days_per_student = -(-exams_per_student // max_per_day)
+    overloaded = np.flatnonzero(days_per_student > n_days)
+    student_days = int(days_per_student.max()) if len(days_per_student) else 0
+    overloaded_students = [
+        {'student_id': instance.student_ids[s], 'exams': int(exams_per_student[s])}
+        for s in overloaded[np.argsort(-exams_per_student[overloaded], kind='stable')][:MAX_REPORTED_STUDENTS]
+    ]
+    if len(overloaded):
+        issues.append(
+            f"{len(overloaded)} students have more exams than fit in {n_days} days "
+            f"at {max_per_day} per day (up to {int(exams_per_student.max())} exams)"
+        )
+
+    # Clique bound and DSatur upper bound only hold with one exam per day
+    min_days = student_days
+    max_clique = []
+    coloring_days = None
+    if max_per_day == 1 and conflict_graph.number_of_nodes():
+        node_of = [conflict_graph.index.get(course_id) for course_id in instance.course_ids]
+        student_sets = [
+            sorted({node_of[c] for c in instance.courses_of(s).tolist() if node_of[c] is not None})
+            for s in range(instance.n_students)
+        ]
+        clique = largest_clique(conflict_graph, student_sets)
+        max_clique = [conflict_graph.courses[n] for n in clique]
+        min_days = max(min_days, len(clique))
+        coloring_days = max(dsatur_coloring(conflict_graph).values()) + 1
+        if len(clique) > n_days:
+            issues.append(
+                f"Courses {', '.join(map(str, max_clique))} all share students pairwise and need "
+                f"{len(clique)} different days, but only {n_days} are available"
+            )
+
+    # Capacity: a course sits in one slot, and all slots together seat everyone
+    total_capacity = instance.total_capacity
+    oversized = np.flatnonzero(instance.course_sizes > total_capacity)
+    oversized_courses = [
+        {'course_id': instance.course_ids[c], 'students': int(instance.course_sizes[c])} for c in oversized
+    ]
+    if len(oversized):
+        issues.append(
+            f"{len(oversized)} courses have more students than all rooms seat ({total_capacity}); "
+            "adding days does not help"
+        )
+
+    total_students = int(instance.course_sizes.sum())
+    if total_capacity > 0 and slots_per_day:
+        capacity_days = math.ceil(math.ceil(total_students / total_capacity) / slots_per_day)
+        if capacity_days > n_days:
+            issues.append(
+                f"{total_students} exam seats are needed but {n_days} days of {int(slots_per_day)} "
+                f"slots offer only {int(n_days * slots_per_day * total_capacity)}"
+            )
+        min_days = max(min_days, capacity_days)
+    elif total_students > 0:
+        issues.append("No room capacity or exam slots are available")
+
+    return {
+        'feasible': not issues,
+        'issues': issues,
+        'n_days': n_days,
+        'min_days': min_days,
+        'coloring_days': coloring_days,
+        'extra_days_needed': max(0, min_days - n_days),
+        'max_clique': max_clique,
+        'overloaded_students': overloaded_students,
+        'oversized_courses': oversized_courses
+    }
+
+def feasibility_message(report):
+    """One-line diagnostic for a report that is not feasible."""
+    message = "Timetable is infeasible: " + "; ".join(report['issues'])
+    if report['extra_days_needed'] and not report['oversized_courses']:
+        message += f". At least {report['extra_days_needed']} more exam day(s) are needed"
+    return message
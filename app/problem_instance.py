@@ -0,0 +1,267 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+
+def build_time_slots(config):
+    """Expand configured exam days and slots into a flat list of time slots."""
+    exam_days = config.get('exam_days', ['2024-05-01', '2024-05-02'])
+    exam_slots = config.get('exam_slots', [{'start_time': '09:00', 'end_time': '12:00'}])
+    
+    time_slots = []
+    for day in exam_days:
+        for slot in exam_slots:
+            time_slots.append({
+                'date': day,
+                'start_time': slot['start_time'],
+                'end_time': slot['end_time']
+            })
+    return time_slots
+
+@dataclass
+class ProblemInstance:
+    """
+    Everything the pipeline stages need, compiled once from the parsed
+    DataFrames: dense integer IDs, enrollment CSR arrays, slots and rooms.
+    """
+    # Courses, in courses_df order (= chromosome order)
+    course_ids: list
+    course_codes: list
+    course_names: list
+    course_index: dict
+    course_sizes: np.ndarray
+
+    # Students: every student in students_df, then any only seen in enrollments
+    student_ids: list
+    student_index: dict
+    student_sections: list
+    student_batch_types: list
+
+    # Enrollments as parallel index arrays plus CSR in both directions
+    enroll_student: np.ndarray
+    enroll_course: np.ndarray
+    student_ptr: np.ndarray
+    student_courses: np.ndarray
+    course_ptr: np.ndarray
+    course_students: np.ndarray
+
+    # Time slots
+    time_slots: list
+    slot_day: np.ndarray
+    n_days: int
+
+    # Rooms, largest first
+    rooms: list
+    room_capacities: np.ndarray
+    total_capacity: int
+
+    # Invigilators as (teacher_id, availability set or None)
+    teachers: list = field(default_factory=list)
+
+    # Compact mode: index arrays are int32 and timetables carry student
+    # indices; student_ids is the lookup table the exporters decode with
+    compact: bool = False
+
+    @property
+    def n_courses(self):
+        return len(self.course_ids)
+
+    @property
+    def n_students(self):
+        return len(self.student_ids)
+
+    def students_of(self, course):
+        """Student indices enrolled in a course index."""
+        return self.course_students[self.course_ptr[course]:self.course_ptr[course + 1]]
+
+    def courses_of(self, student):
+        """Course indices taken by a student index."""
+        return self.student_courses[self.student_ptr[student]:self.student_ptr[student + 1]]
+
+    def student_labels(self, students):
+        """Student IDs of student indices, for display."""
+        return [self.student_ids[s] for s in np.asarray(students).tolist()]
+
+def _csr(rows, cols, n_rows):
+    """Group cols by rows into (ptr, values), keeping the input order within a row."""
+    order = np.argsort(rows, kind='stable')
+    ptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_rows))]).astype(np.int64)
+    return ptr, cols[order]
+
+def _column_list(df, column, default=''):
+    if column not in df.columns:
+        return [default] * len(df)
+    return ['' if pd.isna(value) else str(value) for value in df[column]]
+
+def compile_rooms(rooms_df):
+    """Room records sorted by capacity, largest first."""
+    rooms_sorted = rooms_df.sort_values('capacity', ascending=False, kind='stable')
+    return [
+        {
+            'room_id': room['room_id'],
+            'capacity': int(room['capacity']),
+            'num_columns': room.get('num_columns', 4)
+        }
+        for room in rooms_sorted.to_dict('records')
+    ]
+
+def compile_teachers(invigilators_df):
+    """Turn an invigilators DataFrame into (teacher_id, availability) pairs.
+
+    Availability is a set of (date, time) pairs, or None when the teacher is
+    available for every slot.
+    """
+    teachers = []
+    if invigilators_df is None:
+        return teachers
+    for record in invigilators_df.to_dict('records'):
+        availability = record.get('availability') or []
+        slots = {(slot.get('date'), slot.get('time')) for slot in availability}
+        teachers.append((record['teacher_id'], slots or None))
+    return teachers
+
+def compile_instance(parsed_data, config, invigilators_df=None):
+    """
+    Compile parsed CSV data into a ProblemInstance.
+
+    Args:
+        parsed_data: Output of parse_csvs
+        config: Configuration dictionary (exam days and slots)
+        invigilators_df: Optional DataFrame with teacher_id and availability
+
+    Returns:
+        ProblemInstance
+    """
+    students_df = parsed_data['students']
+    courses_df = parsed_data['courses']
+    enrollments_df = parsed_data['enrollments']
+
+    course_index = {course_id: i for i, course_id in enumerate(courses_df['course_id'].tolist())}
+    students = _StudentTable()
+    students.add(students_df)
+    enroll_student, enroll_course = students.encode(enrollments_df, course_index)
+
+    return _assemble_instance(courses_df, parsed_data['rooms'], students, enroll_student, enroll_course,
+                              config, invigilators_df)
+
+def compile_instance_from_chunks(chunks, courses_df, rooms_df, config, invigilators_df=None):
+    """
+    Compile a ProblemInstance from student batches, e.g. parser.iter_student_chunks,
+    so that the whole students file never has to be in memory: each batch's
+    enrollments are turned into integer arrays as soon as it arrives.
+
+    Args:
+        chunks: Iterable of (students_df, enrollments_df) batches
+        courses_df: DataFrame with course_id, code and name
+        rooms_df: DataFrame with room_id and capacity
+        config: Configuration dictionary (exam days and slots)
+        invigilators_df: Optional DataFrame with teacher_id and availability
+
+    Returns:
+        ProblemInstance
+    """
+    course_index = {course_id: i for i, course_id in enumerate(courses_df['course_id'].tolist())}
+    students = _StudentTable()
+    enroll_students, enroll_courses = [], []
+    for students_df, enrollments_df in chunks:
+        students.add(students_df)
+        enroll_student, enroll_course = students.encode(enrollments_df, course_index)
+        enroll_students.append(enroll_student)
+        enroll_courses.append(enroll_course)
+
+    enroll_student = np.concatenate(enroll_students) if enroll_students else np.empty(0, dtype=np.int64)
+    enroll_course = np.concatenate(enroll_courses) if enroll_courses else np.empty(0, dtype=np.int64)
+    return _assemble_instance(courses_df, rooms_df, students, enroll_student, enroll_course,
+                              config, invigilators_df)
+
+class _StudentTable:
+    """Student IDs in first-seen order with their section and batch type."""
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self.sections = {}
+        self.batch_types = {}
+
+    def _extend(self, student_ids):
+        for student_id in student_ids:
+            if student_id not in self.index:
+                self.index[student_id] = len(self.ids)
+                self.ids.append(student_id)
+
+    def add(self, students_df):
+        student_ids = students_df['student_id'].tolist()
+        self._extend(student_ids)
+        self.sections.update(zip(student_ids, _column_list(students_df, 'section')))
+        self.batch_types.update(zip(student_ids, _column_list(students_df, 'batch_type')))
+
+    def encode(self, enrollments_df, course_index):
+        """(student, course) index arrays of the enrollments with a known course."""
+        if len(enrollments_df) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # Students only seen in enrollments are appended after the listed ones
+        self._extend(enrollments_df['student_id'].drop_duplicates().tolist())
+        enroll_course = _encode_column(enrollments_df['course_id'], course_index)
+        known = enroll_course >= 0
+        enroll_student = _encode_column(enrollments_df['student_id'][known], self.index)
+        return enroll_student, enroll_course[known]
+
+def _encode_column(values, index):
+    """
+    Index of every value in a Series (-1 if missing). Categorical columns are
+    encoded through their categories, so each distinct ID is hashed once.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # The trailing -1 is picked by the code -1 of missing values
+        lookup = np.array([index.get(c, -1) for c in values.cat.categories.tolist()] + [-1], dtype=np.int64)
+        return lookup[values.cat.codes.to_numpy()]
+    return values.map(index).fillna(-1).to_numpy(dtype=np.int64)
+
+def _assemble_instance(courses_df, rooms_df, students, enroll_student, enroll_course, config,
+                       invigilators_df):
+    course_ids = courses_df['course_id'].tolist()
+    course_index = {course_id: i for i, course_id in enumerate(course_ids)}
+    student_ids = students.ids
+
+    compact = config.get('ingestion', {}).get('compact_ids', False)
+    if compact:
+        enroll_student = enroll_student.astype(np.int32)
+        enroll_course = enroll_course.astype(np.int32)
+
+    course_ptr, course_students = _csr(enroll_course, enroll_student, len(course_ids))
+    student_ptr, student_courses = _csr(enroll_student, enroll_course, len(student_ids))
+
+    time_slots = build_time_slots(config)
+    day_index = {}
+    for slot in time_slots:
+        day_index.setdefault(slot['date'], len(day_index))
+    slot_day = np.array([day_index[slot['date']] for slot in time_slots], dtype=np.int64)
+
+    rooms = compile_rooms(rooms_df)
+    room_capacities = np.array([room['capacity'] for room in rooms], dtype=np.int64)
+
+    return ProblemInstance(
+        course_ids=course_ids,
+        course_codes=_column_list(courses_df, 'code'),
+        course_names=_column_list(courses_df, 'name'),
+        course_index=course_index,
+        course_sizes=np.diff(course_ptr),
+        student_ids=student_ids,
+        student_index=students.index,
+        student_sections=[students.sections.get(sid, '') for sid in student_ids],
+        student_batch_types=[students.batch_types.get(sid, '') for sid in student_ids],
+        enroll_student=enroll_student,
+        enroll_course=enroll_course,
+        student_ptr=student_ptr,
+        student_courses=student_courses,
+        course_ptr=course_ptr,
+        course_students=course_students,
+        time_slots=time_slots,
+        slot_day=slot_day,
+        n_days=len(day_index),
+        rooms=rooms,
+        room_capacities=room_capacities,
+        total_capacity=int(room_capacities.sum()),
+        teachers=compile_teachers(invigilators_df),
+        compact=compact
+    )
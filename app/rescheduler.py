@@ -0,0 +1,210 @@
+import time
+import random
+import numpy as np
+from deap import creator, tools
+
+from app.fitness import (
+    BASE_SCORE, HARD_PENALTY, count_violations, subset_fitness_data, touching_fitness_data,
+    init_eval_state
+)
+from app.local_search import course_neighbors, conflicted_courses
+from app.scheduler_core import create_toolbox, evolve, stopping_criteria
+
+def previous_assignment(previous, instance):
+    """
+    Slot index of every course in a previously published timetable.
+
+    Args:
+        previous: Timetable entries as returned by schedule() (dicts with
+            course_id, slot_date and slot_time), or a dict mapping course_id to
+            a slot index or to {'slot_date', 'slot_time'}
+        instance: ProblemInstance of the new data
+
+    Returns:
+        numpy.ndarray: Slot per course, -1 for courses that are new or whose
+                       slot no longer exists
+    """
+    slot_index = {
+        (slot['date'], f"{slot['start_time']}-{slot['end_time']}"): i
+        for i, slot in enumerate(instance.time_slots)
+    }
+    if not isinstance(previous, dict):
+        previous = {entry['course_id']: entry for entry in previous}
+
+    genes = np.full(instance.n_courses, -1, dtype=np.int64)
+    for course_id, slot in previous.items():
+        course = instance.course_index.get(course_id)
+        if course is None:
+            continue
+        if isinstance(slot, dict):
+            slot = slot_index.get((slot.get('slot_date'), slot.get('slot_time')), -1)
+        elif not 0 <= int(slot) < len(instance.time_slots):
+            slot = -1
+        genes[course] = int(slot)
+    return genes
+
+def affected_courses(previous_genes, data, changed=None):
+    """
+    Courses that need a new slot: the changed ones, those without a previous
+    slot, and those involved in a clash when the previous slots are kept.
+
+    Args:
+        previous_genes: Output of previous_assignment
+        data: Fitness data of the new enrollments
+        changed: Optional course indices whose conflicts changed
+
+    Returns:
+        list: Sorted course indices
+    """
+    # Clashes among the courses that keep a previous slot; new ones are free anyway
+    placed = np.flatnonzero(previous_genes >= 0)
+    placed_data = subset_fitness_data(data, placed)
+    clashing = conflicted_courses(init_eval_state(previous_genes[placed], placed_data), placed_data)
+    affected = set(placed[clashing].tolist())
+    affected.update(np.flatnonzero(previous_genes < 0).tolist())
+    affected.update(int(c) for c in (changed if changed is not None else []))
+    return sorted(affected)
+
+def solve_free_courses(genes, free, previous_genes, data, ga_params, move_penalty, pop_size,
+                       generations, stopping, stop_event=None):
+    """
+    Run the GA over the free courses only, with all other courses fixed at
+    their slots in genes. Every free course placed away from its previous slot
+    costs move_penalty, so the search prefers the smallest change that removes
+    the clashes.
+
+    Args:
+        genes: Slot vector of all courses; the free entries are replaced by the result
+        free: Course indices to search over
+        previous_genes: Output of previous_assignment (-1 courses move freely)
+        data: Fitness data of all courses
+        ga_params: Dict with n_slots, cxpb, mutpb, tournament_size
+        move_penalty: Score cost per course moved away from its previous slot
+        pop_size, generations: GA size
+        stopping: Output of stopping_criteria
+
+    Returns:
+        dict: {generations, stop_reason, violations, moved}
+    """
+    free = np.asarray(free, dtype=np.int64)
+    n_free = len(free)
+    anchor = previous_genes[free]
+    anchored = anchor >= 0
+
+    # Groups without a free course keep their violations whatever the free courses do
+    sub_data = touching_fitness_data(data, free)
+    fixed_violations = int(count_violations(genes[None, :], data)[0] - count_violations(genes[None, :], sub_data)[0])
+    base_score = BASE_SCORE - fixed_violations * HARD_PENALTY - data['room_split_penalty']
+
+    def evaluate(individuals):
+        rows = np.array(individuals, dtype=np.int64).reshape(len(individuals), n_free)
+        full = np.tile(genes, (len(rows), 1))
+        full[:, free] = rows
+        moved = ((rows != anchor) & anchored).sum(axis=1)
+        return (base_score - count_violations(full, sub_data) * HARD_PENALTY - moved * move_penalty).astype(float)
+
+    toolbox = create_toolbox(n_free, ga_params['n_slots'], ga_params['tournament_size'])
+    toolbox.register("evaluate_population", evaluate)
+
+    # Start around the current slots rather than from random timetables; only
+    # courses without a previous slot are drawn at random
+    population = [creator.Individual(genes[free].tolist())]
+    for _ in range(pop_size - 1):
+        individual = toolbox.mutate(creator.Individual(genes[free].tolist()))[0]
+        for i in np.flatnonzero(~anchored).tolist():
+            individual[i] = toolbox.attr_int()
+        population.append(individual)
+    hof = tools.HallOfFame(1)
+
+    # No clash and no move is the best any assignment can score
+    target = stopping['target_score']
+    stopping = dict(stopping, target_score=base_score if target is None else min(target, base_score))
+
+    _, info = evolve(population, toolbox, cxpb=ga_params['cxpb'] if n_free > 1 else 0.0,
+                     mutpb=ga_params['mutpb'], ngen=generations, halloffame=hof,
+                     stop_event=stop_event, **stopping)
+
+    genes[free] = hof[0]
+    return {
+        'generations': info['generations'],
+        'stop_reason': info['stop_reason'],
+        'violations': int(count_violations(genes[None, :], data)[0]),
+        'moved': int(((genes[free] != anchor) & anchored).sum())
+    }
+
+def reschedule(fitness_data, previous_genes, ga_params, rescheduling_config, pop_size, generations,
+               changed=None, opt_config=None, stop_event=None, callback=None):
+    """
+    Minimal-perturbation rescheduling: keep a published timetable and search
+    only over the courses affected by enrollment changes. While clashes
+    remain, the searched set grows by the conflict neighbors of its courses,
+    up to max_expansions times.
+
+    Args:
+        fitness_data: Fitness data of the new enrollments
+        previous_genes: Output of previous_assignment
+        ga_params: Dict with n_slots, cxpb, mutpb, tournament_size
+        rescheduling_config: Dict with move_penalty and max_expansions
+        pop_size, generations: GA size for every round
+        changed: Optional course indices whose conflicts changed
+        opt_config: Optimization config, for the stopping criteria
+        stop_event: Object with is_set() to stop on demand
+        callback: Called as callback(generations, best_individual) at the end
+
+    Returns:
+        tuple: (best_genes, best_score, info)
+    """
+    opt_config = opt_config or {}
+    start = time.monotonic()
+    rng = random.Random(random.getrandbits(32))
+    move_penalty = rescheduling_config.get('move_penalty', 10)
+    max_expansions = rescheduling_config.get('max_expansions', 2)
+    stopping = stopping_criteria(opt_config, fitness_data)
+
+    previous_genes = np.asarray(previous_genes, dtype=np.int64)
+    genes = previous_genes.copy()
+    new = genes < 0
+    genes[new] = [rng.randrange(ga_params['n_slots']) for _ in range(int(new.sum()))]
+
+    free = affected_courses(previous_genes, fitness_data, changed)
+    n_affected = len(free)
+    neighbors = None
+    rounds = []
+    time_limit = stopping['time_limit']
+    while free:
+        if time_limit is not None:
+            stopping['time_limit'] = max(0.0, time_limit - (time.monotonic() - start))
+        result = solve_free_courses(genes, free, previous_genes, fitness_data, ga_params, move_penalty,
+                                    pop_size, generations, stopping, stop_event)
+        rounds.append(dict(result, courses=len(free)))
+
+        if result['violations'] == 0 or len(rounds) > max_expansions or result['stop_reason'] in ('cancelled', 'time_limit'):
+            break
+        if neighbors is None:
+            neighbors = course_neighbors(fitness_data)
+        grown = set(free).union(*(neighbors[c].tolist() for c in free))
+        if len(grown) == len(free):
+            break
+        free = sorted(grown)
+
+    best_score = float(BASE_SCORE - count_violations(genes[None, :], fitness_data)[0] * HARD_PENALTY
+                       - fitness_data['room_split_penalty'])
+    generations_run = sum(r['generations'] for r in rounds)
+    if callback is not None:
+        best_individual = creator.Individual(genes.tolist())
+        best_individual.fitness.values = (best_score,)
+        callback(generations_run, best_individual)
+
+    moved = (genes != previous_genes) & (previous_genes >= 0)
+    info = {
+        'generations': generations_run,
+        'stop_reason': 'rescheduled',
+        'elapsed': time.monotonic() - start,
+        'best_score': best_score,
+        'affected_courses': n_affected,
+        'searched_courses': rounds[-1]['courses'] if rounds else 0,
+        'moved_courses': np.flatnonzero(moved).tolist(),
+        'new_courses': int(new.sum()),
+        'rounds': rounds
+    }
+    return genes.tolist(), best_score, info
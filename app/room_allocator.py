@@ -1,7 +1,9 @@
 import pandas as pd
 import math
 
-def allocate_rooms(timetable, rooms_df, config):
+from app.problem_instance import compile_rooms
+
+def allocate_rooms(timetable, rooms_df, config, instance=None):
     """
     Allocate rooms to exams and assign seats with column-based interleaving.
     
@@ -9,12 +11,17 @@ def allocate_rooms(timetable, rooms_df, config):
         timetable: List of exam assignments
         rooms_df: DataFrame with room information
         config: Configuration dictionary
+        instance: Optional ProblemInstance whose compiled rooms are used
     
     Returns:
         Updated timetable with room assignments and seat maps
     """
     updated_timetable = []
     
+    # Rooms are sorted once, largest first, and reused for every slot
+    rooms = instance.rooms if instance is not None else compile_rooms(rooms_df)
+    total_capacity = sum(room['capacity'] for room in rooms)
+    
     # Group exams by time slot
     slot_groups = {}
     for exam in timetable:
@@ -26,7 +33,6 @@ def allocate_rooms(timetable, rooms_df, config):
     for slot_key, exams in slot_groups.items():
         # Calculate total capacity needed for this slot
         total_students = sum(len(exam['assignments'][0]['students']) for exam in exams)
-        total_capacity = rooms_df['capacity'].sum()
         
         # Mark as unschedulable if insufficient capacity
         if total_students > total_capacity:
@@ -37,8 +43,6 @@ def allocate_rooms(timetable, rooms_df, config):
             continue
         
         # Allocate rooms to exams
-        available_rooms = rooms_df.copy().sort_values('capacity', ascending=False)
-        
         for exam in exams:
             students = exam['assignments'][0]['students']
             students_needed = len(students)
@@ -47,8 +51,8 @@ def allocate_rooms(timetable, rooms_df, config):
             allocated_rooms = []
             remaining_students = students[:]
             
-            for _, room in available_rooms.iterrows():
-                if not remaining_students:
+            for room in rooms:
+                if len(remaining_students) == 0:
                     break
                 
                 room_capacity = room['capacity']
@@ -59,7 +63,7 @@ def allocate_rooms(timetable, rooms_df, config):
                 seat_assignments = assign_seats_for_room(
                     room['room_id'], 
                     room_students, 
-                    room.get('num_columns', 4)
+                    room['num_columns']
                 )
                 
                 allocated_rooms.append({
@@ -70,9 +74,9 @@ def allocate_rooms(timetable, rooms_df, config):
             
             # Update exam with room allocations
             exam['assignments'] = allocated_rooms
-            exam['status'] = 'scheduled' if not remaining_students else 'partial'
+            exam['status'] = 'scheduled' if len(remaining_students) == 0 else 'partial'
             
-            if remaining_students:
+            if len(remaining_students):
                 exam['unassigned_students'] = remaining_students
             
             updated_timetable.append(exam)
@@ -85,15 +89,18 @@ def assign_seats_for_room(room_id, students_list, num_columns):
     
     Args:
         room_id: Room identifier
-        students_list: List of student IDs
+        students_list: List of student IDs (or an array of student indices
+            for compact instances)
         num_columns: Number of columns in the room
     
     Returns:
         List of seat assignments with student_id, row, column
     """
-    if not students_list:
+    if len(students_list) == 0:
         return []
     
+    if not isinstance(students_list, list):
+        students_list = students_list.tolist()
     seat_assignments = []
     num_students = len(students_list)
     num_rows = math.ceil(num_students / num_columns)
@@ -1,17 +1,30 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, FileResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Union
 import yaml
 import os
+import time
+import json
+import hashlib
 
-from app.parser import parse_csvs
+from app.parser import parse_csvs, parse_csvs_streaming
+from app.parse_cache import cached_parse_csvs, file_digest
+from app.problem_instance import compile_instance
 from app.conflict_graph import build_conflict_graph, graph_stats
+from app.presolve import analyze_feasibility, feasibility_message
 from app.scheduler_core import schedule
 from app.room_allocator import allocate_rooms
 from app.invigilator_assigner import assign_invigilators
 from app.conflict_handler import detect_unschedulable, schedule_makeup
 from app.exporter import export_excel, export_pdf
 from app.holiday_manager import load_holidays, filter_holidays_from_dates
+from app.jobs import JobQueue, JobCancelled, QueueFull, check_cancelled
+from app.artifact_store import (
+    create_run, record_run, evict_runs, list_runs, get_run, latest_run, new_run_id, find_cached_run, load_response,
+    is_run_id, run_dir
+)
 
 router = APIRouter()
 
@@ -25,147 +38,544 @@ class ScheduleRequest(BaseModel):
     exam_time_slots: Optional[list] = None
     max_global_exams_per_day: Optional[int] = None
     buffer_days: Optional[int] = None
+    time_limit_seconds: Optional[float] = None
+    stream_chunk_size: Optional[int] = None
+    previous_timetable: Optional[Union[list, dict]] = None
+    changed_courses: Optional[list] = None
+    seed: Optional[int] = None
+    no_cache: bool = False
 
-@router.post("/schedule")
-async def run_schedule_pipeline(request: ScheduleRequest):
+# Bumped when a change to the pipeline invalidates stored results
+RESULT_CACHE_VERSION = 1
+
+# Config sections that do not change a run's result
+NON_RESULT_SECTIONS = ('jobs', 'artifacts', 'result_cache', 'upload', 'parse_cache')
+
+def build_config(request):
+    """
+    Effective configuration of a run: app/config.yaml with the request's overrides.
+
+    Args:
+        request: ScheduleRequest
+
+    Returns:
+        dict: Configuration
+    """
+    # Load configuration
+    config_path = "app/config.yaml"
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+
+    # Apply overrides from request
+    if request.exam_start_date and request.exam_end_date:
+        # Generate exam days from start and end dates
+        from datetime import datetime, timedelta
+        start_date = datetime.strptime(request.exam_start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(request.exam_end_date, '%Y-%m-%d')
+
+        exam_days = []
+        current_date = start_date
+        while current_date <= end_date:
+            exam_days.append(current_date.strftime('%Y-%m-%d'))
+            current_date += timedelta(days=1)
+
+        # Load holidays and filter them out
+        holidays_csv_path = request.holidays_csv_path or "data/holidays.csv"
+        holidays = load_holidays(holidays_csv_path)
+        exam_days = filter_holidays_from_dates(exam_days, holidays)
+
+        config['exam_days'] = exam_days
+
+    if request.exam_time_slots:
+        # Use custom time slots from request
+        config['exam_slots'] = request.exam_time_slots
+
+    if request.max_global_exams_per_day:
+        config['max_global_exams_per_day'] = request.max_global_exams_per_day
+    if request.buffer_days:
+        config['buffer_days'] = request.buffer_days
+    if request.time_limit_seconds:
+        config.setdefault('optimization', {})['time_limit_seconds'] = request.time_limit_seconds
+    if request.seed is not None:
+        config.setdefault('optimization', {})['seed'] = request.seed
+    return config
+
+def input_hashes(request):
+    """SHA-256 of every input file of a request; None for files that cannot be read."""
+    paths = {
+        'students': request.students_csv_path,
+        'courses': request.courses_csv_path,
+        'rooms': request.rooms_csv_path,
+        'holidays': request.holidays_csv_path
+    }
+    hashes = {}
+    for kind, path in paths.items():
+        try:
+            hashes[kind] = file_digest(path) if path else None
+        except OSError:
+            hashes[kind] = None
+    return hashes
+
+def result_cache_key(request, config, hashes):
+    """
+    Key of a run's result: the input file contents, the effective config
+    (including the seed) and the rescheduling inputs.
+
+    Args:
+        request: ScheduleRequest
+        config: Output of build_config
+        hashes: Output of input_hashes
+
+    Returns:
+        str: SHA-256 hex digest
     """
-    Execute the complete scheduling pipeline.
-    
-    Returns JSON with status, score, and file paths.
+    payload = {
+        'version': RESULT_CACHE_VERSION,
+        # Holidays only act through the exam days of the config
+        'inputs': {kind: digest for kind, digest in hashes.items() if kind != 'holidays'},
+        'config': {name: value for name, value in config.items() if name not in NON_RESULT_SECTIONS},
+        'seed': config.get('optimization', {}).get('seed'),
+        'previous_timetable': request.previous_timetable,
+        'changed_courses': request.changed_courses
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def lookup_result(request, force=False):
+    """
+    Result cache lookup for a request.
+
+    Args:
+        request: ScheduleRequest
+        force: Skip the lookup but still return the key, so the recomputed
+               result replaces the stored one
+
+    Returns:
+        tuple: (cache_key, run_id, response); the key is None when the cache
+               is disabled or the inputs cannot be read, run_id and response
+               are None on a miss
     """
     try:
-        # Load configuration
-        config_path = "app/config.yaml"
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        # Apply overrides from request
-        if request.exam_start_date and request.exam_end_date:
-            # Generate exam days from start and end dates
-            from datetime import datetime, timedelta
-            start_date = datetime.strptime(request.exam_start_date, '%Y-%m-%d')
-            end_date = datetime.strptime(request.exam_end_date, '%Y-%m-%d')
-            
-            exam_days = []
-            current_date = start_date
-            while current_date <= end_date:
-                exam_days.append(current_date.strftime('%Y-%m-%d'))
-                current_date += timedelta(days=1)
-            
-            # Load holidays and filter them out
-            holidays_csv_path = request.holidays_csv_path or "data/holidays.csv"
-            holidays = load_holidays(holidays_csv_path)
-            exam_days = filter_holidays_from_dates(exam_days, holidays)
-            
-            config['exam_days'] = exam_days
-        
-        if request.exam_time_slots:
-            # Use custom time slots from request
-            config['exam_slots'] = request.exam_time_slots
-        
-        if request.max_global_exams_per_day:
-            config['max_global_exams_per_day'] = request.max_global_exams_per_day
-        if request.buffer_days:
-            config['buffer_days'] = request.buffer_days
-        
-        # Step 1: Parse CSVs
-        parsed_data = parse_csvs(
+        config = build_config(request)
+        if not config.get('result_cache', {}).get('enabled', False):
+            return None, None, None
+        hashes = input_hashes(request)
+    except (OSError, ValueError):
+        # The run itself reports unreadable inputs
+        return None, None, None
+    if None in (hashes['students'], hashes['courses'], hashes['rooms']):
+        return None, None, None
+
+    cache_key = result_cache_key(request, config, hashes)
+    if force:
+        return cache_key, None, None
+    run_id, response = find_cached_run(config.get('artifacts', {}).get('directory', 'data/runs'), cache_key)
+    return cache_key, run_id, response
+
+def run_pipeline(request, run_id=None, cache_key=None, stop_event=None):
+    """
+    Execute the complete scheduling pipeline. Runs in a job worker process.
+
+    The run's exports and its metadata (input hashes, effective config, stage
+    timings, score) are written to its own directory in the artifact store.
+
+    Args:
+        request: ScheduleRequest fields as a dict
+        run_id: Optional ID of the run's artifact directory
+        cache_key: Optional result cache key the response is stored under
+        stop_event: Optional object with is_set(); the run stops with
+                    JobCancelled at the next stage once it is set
+
+    Returns:
+        dict: Response with status, score, statistics, run ID and file paths
+    """
+    request = ScheduleRequest(**request)
+    config = build_config(request)
+
+    artifacts_config = config.get('artifacts', {})
+    root = artifacts_config.get('directory', 'data/runs')
+    run_id, run_directory = create_run(root, run_id)
+    metadata = {
+        'run_id': run_id,
+        'request': request.model_dump(exclude={'previous_timetable'}),
+        'input_hashes': input_hashes(request),
+        'config': config
+    }
+    timings = {}
+    start = time.perf_counter()
+
+    try:
+        response = execute_pipeline(request, config, run_directory, timings, stop_event)
+        # A cancel that arrived during the export still ends the run as cancelled
+        check_cancelled(stop_event)
+    except BaseException as e:
+        timings['total'] = time.perf_counter() - start
+        status = 'cancelled' if isinstance(e, JobCancelled) else 'failed'
+        record_run(root, run_id, dict(metadata, status=status, error=str(e), timings=timings))
+        raise
+
+    timings['total'] = time.perf_counter() - start
+    response['run_id'] = run_id
+    response['downloads'] = download_urls(run_id)
+    response['result_cache'] = {'key': cache_key, 'hit': False}
+    record_run(root, run_id, dict(metadata, status='success', score=response['score'],
+                                  statistics=response['statistics'], timings=timings),
+               files=response['files'], response=response, cache_key=cache_key)
+    evict_runs(root, max_bytes=int(artifacts_config.get('max_size_mb', 0) * 1024 * 1024),
+               max_age_days=artifacts_config.get('max_age_days', 0), keep=run_id,
+               stale_after_hours=artifacts_config.get('stale_after_hours', 24))
+    return response
+
+def execute_pipeline(request, config, run_directory, timings, stop_event=None):
+    """
+    Parse, schedule, allocate and export one run.
+
+    Args:
+        request: ScheduleRequest
+        config: Output of build_config
+        run_directory: Directory the exports are written to
+        timings: Dict receiving the seconds spent per stage
+        stop_event: Optional object with is_set()
+
+    Returns:
+        dict: Response with status, score, statistics and file paths
+    """
+    # Create dummy invigilators if none exist
+    import pandas as pd
+    invigilators_df = pd.DataFrame([
+        {
+            'teacher_id': f'T{i:03d}',
+            'name': f'Teacher {i}',
+            'availability': []  # Available for all slots
+        }
+        for i in range(1, 11)  # Create 10 dummy teachers
+    ])
+
+    # Step 1: Parse CSVs and compile once; every later stage reads the same IDs and arrays
+    stage_start = time.perf_counter()
+    chunk_size = request.stream_chunk_size or config.get('ingestion', {}).get('chunk_size', 0)
+    if chunk_size:
+        # Large student files are streamed straight into the compiled instance
+        parsed_data = parse_csvs_streaming(
             request.students_csv_path,
             request.courses_csv_path,
-            request.rooms_csv_path
+            request.rooms_csv_path,
+            config,
+            chunksize=chunk_size,
+            invigilators_df=invigilators_df
         )
-        
+        instance = parsed_data['instance']
+        students_df = enrollments_df = None
+    else:
+        cache_config = config.get('parse_cache', {})
+        compact = config.get('ingestion', {}).get('compact_ids', False)
+        if cache_config.get('enabled', False):
+            parsed_data = cached_parse_csvs(
+                request.students_csv_path,
+                request.courses_csv_path,
+                request.rooms_csv_path,
+                cache_dir=cache_config.get('directory', 'data/parse_cache'),
+                max_bytes=int(cache_config.get('max_size_mb', 0) * 1024 * 1024),
+                compact=compact
+            )
+        else:
+            parsed_data = parse_csvs(
+                request.students_csv_path,
+                request.courses_csv_path,
+                request.rooms_csv_path,
+                compact=compact
+            )
         students_df = parsed_data['students']
-        courses_df = parsed_data['courses']
-        rooms_df = parsed_data['rooms']
         enrollments_df = parsed_data['enrollments']
-        
-        # Step 2: Build conflict graph
-        conflict_graph = build_conflict_graph(enrollments_df)
-        graph_statistics = graph_stats(conflict_graph)
-        
-        # Step 3: Schedule exams using GA
-        schedule_result = schedule(courses_df, students_df, rooms_df, enrollments_df, config)
-        timetable = schedule_result['timetable']
-        score = schedule_result['score']
-        
-        # Step 4: Allocate rooms and assign seats
-        timetable = allocate_rooms(timetable, rooms_df, config)
-        
-        # Step 5: Assign invigilators (create dummy invigilators if none exist)
-        import pandas as pd
-        invigilators_df = pd.DataFrame([
-            {
-                'teacher_id': f'T{i:03d}',
-                'name': f'Teacher {i}',
-                'availability': []  # Available for all slots
-            }
-            for i in range(1, 11)  # Create 10 dummy teachers
-        ])
-        
-        timetable = assign_invigilators(timetable, invigilators_df, config)
-        
-        # Step 6: Detect unschedulable exams
-        unschedulable = detect_unschedulable(timetable, rooms_df)
-        
-        # Step 7: Schedule makeup exams if needed
-        makeup_schedule = []
-        if unschedulable:
-            exam_days = config.get('exam_days', ['2024-05-01'])
-            start_date = exam_days[0] if exam_days else '2024-05-01'
-            makeup_schedule = schedule_makeup(unschedulable, config, start_date)
-        
-        # Step 8: Export files
-        excel_path = "outputs/timetable.xlsx"
-        pdf_path = "outputs/timetable.pdf"
-        
-        export_excel(timetable, excel_path)
-        export_pdf(timetable, pdf_path, students_df)
-        
-        # Prepare response
-        response = {
-            "status": "success",
-            "score": score,
-            "statistics": {
-                "total_courses": len(courses_df),
-                "total_students": len(students_df),
-                "total_enrollments": len(enrollments_df),
-                "conflict_graph": graph_statistics,
-                "scheduled_exams": len([e for e in timetable if e.get('status') != 'unschedulable']),
-                "unschedulable_exams": len(unschedulable),
-                "makeup_exams": len(makeup_schedule)
-            },
-            "files": {
-                "excel": excel_path,
-                "pdf": pdf_path
-            },
-            "unschedulable": unschedulable,
-            "makeup_schedule": makeup_schedule
-        }
-        
+        instance = compile_instance(parsed_data, config, invigilators_df)
+
+    courses_df = parsed_data['courses']
+    rooms_df = parsed_data['rooms']
+    timings['parse'] = time.perf_counter() - stage_start
+
+    check_cancelled(stop_event)
+
+    # Step 2: Build conflict graph
+    stage_start = time.perf_counter()
+    conflict_graph = build_conflict_graph(enrollments_df, instance=instance, output='csr')
+    graph_statistics = graph_stats(conflict_graph)
+
+    # Step 2b: Pre-solve feasibility check
+    presolve_config = config.get('presolve', {})
+    presolve_report = None
+    if presolve_config.get('enabled', True):
+        presolve_report = analyze_feasibility(instance, config, conflict_graph)
+        if not presolve_report['feasible'] and presolve_config.get('fail_on_infeasible', False):
+            raise ValueError(feasibility_message(presolve_report))
+    timings['conflict_graph'] = time.perf_counter() - stage_start
+
+    check_cancelled(stop_event)
+
+    # Step 3: Schedule exams using GA; a cancelled search stops at its next generation
+    stage_start = time.perf_counter()
+    schedule_result = schedule(courses_df, students_df, rooms_df, enrollments_df, config,
+                               conflict_graph=conflict_graph, instance=instance,
+                               previous_timetable=request.previous_timetable,
+                               changed_courses=request.changed_courses, stop_event=stop_event)
+    timings['schedule'] = time.perf_counter() - stage_start
+    check_cancelled(stop_event)
+    timetable = schedule_result['timetable']
+    score = schedule_result['score']
+
+    # Step 4: Allocate rooms and assign seats
+    stage_start = time.perf_counter()
+    timetable = allocate_rooms(timetable, rooms_df, config, instance=instance)
+
+    # Step 5: Assign invigilators
+    timetable = assign_invigilators(timetable, invigilators_df, config, instance=instance)
+
+    # Step 6: Detect unschedulable exams
+    unschedulable = detect_unschedulable(timetable, rooms_df)
+
+    # Step 7: Schedule makeup exams if needed
+    makeup_schedule = []
+    if unschedulable:
+        exam_days = config.get('exam_days', ['2024-05-01'])
+        start_date = exam_days[0] if exam_days else '2024-05-01'
+        makeup_schedule = schedule_makeup(unschedulable, config, start_date)
+    timings['allocate'] = time.perf_counter() - stage_start
+
+    check_cancelled(stop_event)
+
+    # Step 8: Export files into the run's directory
+    stage_start = time.perf_counter()
+    excel_path = os.path.join(run_directory, "timetable.xlsx")
+    pdf_path = os.path.join(run_directory, "timetable.pdf")
+
+    export_excel(timetable, excel_path, instance=instance)
+    export_pdf(timetable, pdf_path, students_df, instance=instance)
+    timings['export'] = time.perf_counter() - stage_start
+
+    # Prepare response
+    response = {
+        "status": "success",
+        "score": score,
+        "search": schedule_result.get('search'),
+        "solver": schedule_result.get('solver'),
+        "presolve": presolve_report,
+        "statistics": {
+            "total_courses": len(courses_df),
+            "total_students": instance.n_students,
+            "total_enrollments": len(instance.enroll_student),
+            "unknown_course_codes": parsed_data.get('unknown_codes', {}),
+            "parse_cache": parsed_data.get('cache'),
+            "conflict_graph": graph_statistics,
+            "scheduled_exams": len([e for e in timetable if e.get('status') != 'unschedulable']),
+            "unschedulable_exams": len(unschedulable),
+            "makeup_exams": len(makeup_schedule)
+        },
+        "files": {
+            "excel": excel_path,
+            "pdf": pdf_path
+        },
+        "unschedulable": unschedulable,
+        "makeup_schedule": makeup_schedule
+    }
+
+    return response
+
+def error_status(error):
+    """HTTP status code of an exception raised by the pipeline."""
+    if isinstance(error, FileNotFoundError):
+        return 404
+    if isinstance(error, ValueError):
+        return 400
+    return 500
+
+def error_detail(error):
+    if isinstance(error, FileNotFoundError):
+        return f"File not found: {str(error)}"
+    if isinstance(error, ValueError):
+        return f"Data validation error: {str(error)}"
+    return f"Internal server error: {str(error)}"
+
+def load_config_section(name):
+    with open("app/config.yaml", 'r') as f:
+        return (yaml.safe_load(f) or {}).get(name, {})
+
+def artifacts_root():
+    """Directory of the artifact store."""
+    return load_config_section('artifacts').get('directory', 'data/runs')
+
+# Files of a run that may be downloaded; the index and metadata are never served
+EXPORT_FILES = {'excel': 'timetable.xlsx', 'pdf': 'timetable.pdf'}
+
+def download_urls(run_id):
+    """URLs of a run's exports, served by /schedule/jobs/{job_id}/files/{name}."""
+    return {kind: f"/schedule/jobs/{run_id}/files/{name}" for kind, name in EXPORT_FILES.items()}
+
+job_queue = None
+
+def get_job_queue():
+    """Job queue of the scheduling runs, created from the config on first use."""
+    global job_queue
+    if job_queue is None:
+        jobs_config = load_config_section('jobs')
+        job_queue = JobQueue(
+            workers=jobs_config.get('workers', 1),
+            max_pending=jobs_config.get('max_pending', 20),
+            keep_finished=jobs_config.get('keep_finished', 100)
+        )
+    return job_queue
+
+@router.post("/schedule")
+async def run_schedule_pipeline(request: ScheduleRequest, cache_control: Optional[str] = Header(None)):
+    """
+    Queue a scheduling run.
+
+    Returns JSON with the job ID; poll /schedule/jobs/{job_id} for its status
+    and fetch /schedule/jobs/{job_id}/result once it has finished. The job ID
+    is also the ID of the run's directory in the artifact store.
+
+    When an earlier run had the same input files, effective config and seed,
+    its stored response is returned right away (status "success"). Set
+    no_cache in the request or send "Cache-Control: no-cache" to recompute.
+    """
+    force = request.no_cache or any(
+        directive.strip() in ('no-cache', 'no-store') for directive in (cache_control or '').lower().split(',')
+    )
+    # Hashing large inputs must not block the event loop
+    cache_key, cached_run, response = await run_in_threadpool(lookup_result, request, force)
+    if response is not None:
+        return dict(
+            response,
+            job_id=cached_run,
+            result_url=f"/schedule/jobs/{cached_run}/result",
+            run_url=f"/schedule/runs/{cached_run}",
+            result_cache={'key': cache_key, 'hit': True, 'run_id': cached_run}
+        )
+
+    run_id = new_run_id()
+    try:
+        job_id = get_job_queue().submit(run_pipeline, request.model_dump(), run_id, cache_key, job_id=run_id)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Scheduler is busy: {str(e)}")
+    return {
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"/schedule/jobs/{job_id}",
+        "result_url": f"/schedule/jobs/{job_id}/result",
+        "run_url": f"/schedule/runs/{job_id}",
+        "result_cache": {'key': cache_key, 'hit': False}
+    }
+
+@router.get("/schedule/jobs")
+async def list_schedule_jobs():
+    """Status of the queued, running and recently finished runs."""
+    return {"jobs": get_job_queue().all_jobs()}
+
+def stored_job_status(run_id):
+    """
+    Job status of a run the queue no longer knows (pruned, from before a
+    restart, or returned by a result cache hit), from the artifact store.
+
+    Returns:
+        dict: Same fields as JobQueue.status, or None for unknown runs
+    """
+    run = get_run(artifacts_root(), run_id)
+    if run is None:
+        return None
+    finished_at = run['finished_at']
+    metadata = run['metadata'] or {}
+    return {
+        'job_id': run_id,
+        'status': 'succeeded' if run['status'] == 'success' else run['status'],
+        'submitted_at': run['created_at'],
+        'finished_at': finished_at,
+        'elapsed': (finished_at or time.time()) - run['created_at'],
+        'error': metadata.get('error') if run['status'] == 'failed' else None
+    }
+
+@router.get("/schedule/jobs/{job_id}")
+async def get_schedule_job(job_id: str):
+    """Status of one run."""
+    status = get_job_queue().status(job_id) or stored_job_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return status
+
+@router.get("/schedule/jobs/{job_id}/result")
+async def get_schedule_result(job_id: str):
+    """
+    Result of a finished run: the pipeline response, or the run's error with
+    the status code the pipeline error maps to. Unfinished runs answer 202
+    with their status. Runs the queue no longer knows, such as result cache
+    hits, are answered from the artifact store.
+    """
+    queue = get_job_queue()
+    status = queue.status(job_id)
+    if status is None:
+        response = load_response(artifacts_root(), job_id)
+        if response is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
         return response
-        
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=f"File not found: {str(e)}")
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Data validation error: {str(e)}")
+    if status['status'] in ('queued', 'running', 'cancelling'):
+        return JSONResponse(status_code=202, content=status)
+    if status['status'] == 'cancelled':
+        raise HTTPException(status_code=409, detail="Job was cancelled")
+
+    try:
+        return queue.result(job_id)
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Schedule error: {str(e)}")
-        print(f"Full traceback: {error_details}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        if error_status(e) == 500:
+            # The worker's traceback is attached as the cause
+            print(f"Schedule error: {str(e)}")
+            print(f"Full traceback: {e.__cause__ or ''}")
+        raise HTTPException(status_code=error_status(e), detail=error_detail(e))
+
+@router.delete("/schedule/jobs/{job_id}")
+async def cancel_schedule_job(job_id: str):
+    """Cancel a queued or running run."""
+    queue = get_job_queue()
+    if queue.status(job_id) is None:
+        if stored_job_status(job_id) is not None:
+            raise HTTPException(status_code=409, detail="Job has already finished")
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if not queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job has already finished")
+    return queue.status(job_id)
+
+@router.get("/schedule/jobs/{job_id}/files/{name}")
+async def download_schedule_file(job_id: str, name: str):
+    """Download an export of a run: timetable.xlsx or timetable.pdf."""
+    if name not in EXPORT_FILES.values() or not is_run_id(job_id):
+        raise HTTPException(status_code=404, detail=f"Unknown file: {name}")
+    path = os.path.join(run_dir(artifacts_root(), job_id), name)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"Unknown file: {name}")
+    return FileResponse(path, filename=name)
+
+@router.get("/schedule/runs")
+async def list_schedule_runs(limit: int = 50, offset: int = 0, status: Optional[str] = None):
+    """Stored runs, newest first, from the artifact store index."""
+    return {"runs": list_runs(artifacts_root(), limit=min(limit, 1000), offset=offset, status=status)}
+
+@router.get("/schedule/runs/{run_id}")
+async def get_schedule_run(run_id: str):
+    """A stored run with its metadata: input hashes, config, timings and score."""
+    run = get_run(artifacts_root(), run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown run: {run_id}")
+    return run
 
 @router.get("/schedule/status")
 async def get_schedule_status():
-    """Get current scheduling status and available files."""
-    excel_exists = os.path.exists("outputs/timetable.xlsx")
-    pdf_exists = os.path.exists("outputs/timetable.pdf")
-    
+    """Get current scheduling status and the files of the latest successful run."""
+    from datetime import datetime
+    latest = latest_run(artifacts_root())
+    files = latest['files'] if latest else {}
+
     return {
         "files_available": {
-            "excel": excel_exists,
-            "pdf": pdf_exists
+            "excel": bool(files.get('excel')) and os.path.exists(files['excel']),
+            "pdf": bool(files.get('pdf')) and os.path.exists(files['pdf'])
         },
-        "last_generated": "N/A"  # Could be enhanced to track timestamps
-    }
\ No newline at end of file
+        "files": files,
+        "downloads": download_urls(latest['run_id']) if latest else {},
+        "run_id": latest['run_id'] if latest else None,
+        "last_generated": datetime.fromtimestamp(latest['finished_at']).isoformat(timespec='seconds') if latest else "N/A"
+    }
@@ -1,47 +1,268 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import FormParserError
 import os
+import csv
 import uuid
-from typing import Dict
+import hashlib
+import yaml
+
+from app.parser import REQUIRED_COLUMNS
 
 router = APIRouter()
 
-@router.post("/upload")
-async def upload_csvs(
-    students: UploadFile = File(...),
-    courses: UploadFile = File(...),
-    rooms: UploadFile = File(...),
-    holidays: UploadFile = File(None)
-):
-    # Validate file extensions
-    required_files = [(students, "students"), (courses, "courses"), (rooms, "rooms")]
-    if holidays:
-        required_files.append((holidays, "holidays"))
-    
-    for file, name in required_files:
-        if file and not file.filename.endswith('.csv'):
+# A header line longer than this is rejected
+MAX_HEADER_BYTES = 1 << 16
+
+# Per-file size limits in MB when the config sets none
+DEFAULT_MAX_FILE_MB = {'students': 200, 'courses': 20, 'rooms': 5, 'holidays': 5}
+
+# Allowance for multipart boundaries and part headers in the request size limit
+MULTIPART_OVERHEAD = 1 << 16
+
+UPLOAD_KINDS = ('students', 'courses', 'rooms', 'holidays')
+REQUIRED_UPLOADS = ('students', 'courses', 'rooms')
+
+def check_header(head, kind):
+    """
+    Validate the header line of an uploaded CSV against the columns the
+    parser requires, before the rest of the file is accepted.
+    """
+    line = head.decode('utf-8-sig', errors='replace').splitlines()[0] if head else ''
+    columns = [column.strip().lower() for column in next(csv.reader([line]), [])]
+    for col in REQUIRED_COLUMNS[kind]:
+        if col not in columns:
+            raise HTTPException(status_code=400, detail=f"Missing required column in {kind} CSV: {col}")
+
+def request_size_limit(max_file_mb):
+    """
+    Largest accepted upload request in bytes: all per-file limits plus the
+    multipart framing (0 = unbounded when any file has no limit).
+    """
+    limits = [max_file_mb.get(kind, 0) for kind in UPLOAD_KINDS]
+    if not all(limits):
+        return 0
+    return int(sum(limits) * 1024 * 1024) + MULTIPART_OVERHEAD
+
+class UploadWriter:
+    """
+    Writes one uploaded CSV to disk as its bytes arrive, hashing and checking
+    it on the way. The file is stored under its SHA-256, so an identical upload
+    reuses the stored copy.
+    """
+
+    def __init__(self, kind, directory, max_bytes=0):
+        """
+        Args:
+            kind: 'students', 'courses', 'rooms' or 'holidays'
+            directory: Directory of the stored uploads
+            max_bytes: Size limit (0 = none); larger uploads are rejected with 413
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.kind = kind
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+        self.file = open(self.tmp_path, "wb")
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+        self.header_checked = False
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"{self.kind} file exceeds the {self.max_bytes // (1024 * 1024)} MB upload limit"
+            )
+
+        # The header is checked as soon as its line is complete
+        if not self.header_checked:
+            self.head += chunk
+            if b'\n' in self.head or len(self.head) >= MAX_HEADER_BYTES:
+                check_header(self.head, self.kind)
+                self.header_checked = True
+                self.head = b''
+
+        self.digest.update(chunk)
+        self.file.write(chunk)
+
+    def finish(self):
+        """
+        Close the file and move it to its content address.
+
+        Returns:
+            dict: {path, sha256, size, deduplicated}
+        """
+        self.file.close()
+        if not self.header_checked:
+            check_header(self.head, self.kind)
+
+        sha256 = self.digest.hexdigest()
+        file_path = os.path.join(self.directory, f"{sha256}.csv")
+        deduplicated = os.path.exists(file_path)
+        if deduplicated:
+            os.remove(self.tmp_path)
+        else:
+            os.replace(self.tmp_path, file_path)
+        return {'path': file_path, 'sha256': sha256, 'size': self.size, 'deduplicated': deduplicated}
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+class UploadParser:
+    """
+    Incremental multipart parser for the upload form. Every CSV part goes
+    straight into an UploadWriter as the request body arrives, so checking,
+    hashing and writing happen in one pass without spooling the body first.
+    Non-file fields are ignored.
+    """
+
+    def __init__(self, boundary, directory, max_file_bytes, max_request_bytes=0):
+        """
+        Args:
+            boundary: Multipart boundary of the request
+            directory: Directory of the stored uploads
+            max_file_bytes: Dict of kind to size limit in bytes (0 = none)
+            max_request_bytes: Limit on the whole body (0 = none)
+        """
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.max_request_bytes = max_request_bytes
+        self.received = 0
+        self.saved = {}
+        self.writer = None
+        self.writers = []
+        self.headers = {}
+        self.header_field = b''
+        self.header_value = b''
+        self.parser = MultipartParser(boundary, {
+            'on_part_begin': self.on_part_begin,
+            'on_header_field': self.on_header_field,
+            'on_header_value': self.on_header_value,
+            'on_header_end': self.on_header_end,
+            'on_headers_finished': self.on_headers_finished,
+            'on_part_data': self.on_part_data,
+            'on_part_end': self.on_part_end
+        })
+
+    def on_part_begin(self):
+        self.headers = {}
+        self.writer = None
+
+    def on_header_field(self, data, start, end):
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[self.header_field.lower()] = self.header_value
+        self.header_field = self.header_value = b''
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b'content-disposition', b''))
+        name = options.get(b'name', b'').decode('latin-1')
+        filename = options.get(b'filename', b'').decode('utf-8', errors='replace')
+        if name not in UPLOAD_KINDS or not filename:
+            return
+        if not filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail=f"{name} file must be CSV")
-    
-    # Save files with unique names
-    saved_paths = {}
-    for file, key in [(students, "students"), (courses, "courses"), (rooms, "rooms")]:
-        unique_filename = f"{uuid.uuid4()}_{file.filename}"
-        file_path = os.path.join("data", unique_filename)
-        
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        saved_paths[key] = file_path
-    
-    # Handle optional holidays file
-    if holidays:
-        unique_filename = f"{uuid.uuid4()}_{holidays.filename}"
-        file_path = os.path.join("data", unique_filename)
-        
-        with open(file_path, "wb") as f:
-            content = await holidays.read()
-            f.write(content)
-        
-        saved_paths["holidays"] = file_path
-    
-    return {"status": "ok", "paths": saved_paths}
\ No newline at end of file
+        if name in self.saved:
+            raise HTTPException(status_code=400, detail=f"{name} file was sent twice")
+        self.writer = UploadWriter(name, self.directory, self.max_file_bytes.get(name, 0))
+        self.writers.append(self.writer)
+
+    def on_part_data(self, data, start, end):
+        if self.writer is not None:
+            self.writer.write(data[start:end])
+
+    def on_part_end(self):
+        if self.writer is not None:
+            self.saved[self.writer.kind] = self.writer.finish()
+            self.writers.remove(self.writer)
+            self.writer = None
+
+    def feed(self, chunk):
+        """Parse the next chunk of the body; the limit applies to the running byte count."""
+        self.received += len(chunk)
+        if self.max_request_bytes and self.received > self.max_request_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload exceeds the {self.max_request_bytes // (1024 * 1024)} MB request limit"
+            )
+        self.parser.write(chunk)
+
+    def finalize(self):
+        """
+        Finish parsing once the body has ended.
+
+        Returns:
+            dict: kind -> {path, sha256, size, deduplicated}
+        """
+        self.parser.finalize()
+        if self.writers:
+            raise HTTPException(status_code=400, detail="Upload ended in the middle of a file")
+        for name in REQUIRED_UPLOADS:
+            if name not in self.saved:
+                raise HTTPException(status_code=400, detail=f"{name} file is required")
+        return self.saved
+
+    def abort(self):
+        """Remove the partial file of an upload that failed."""
+        for writer in self.writers:
+            writer.abort()
+        self.writers = []
+
+@router.post("/upload")
+async def upload_csvs(request: Request):
+    """
+    Store the students, courses and rooms CSVs (and optionally holidays) of a
+    multipart form, streaming each file to disk while the body arrives.
+    """
+    with open("app/config.yaml", 'r') as f:
+        upload_config = (yaml.safe_load(f) or {}).get('upload', {})
+    directory = upload_config.get('directory', 'data/uploads')
+    max_file_mb = dict(DEFAULT_MAX_FILE_MB, **upload_config.get('max_file_mb', {}))
+
+    content_type, options = parse_options_header(request.headers.get('content-type', ''))
+    if content_type != b'multipart/form-data' or not options.get(b'boundary'):
+        raise HTTPException(status_code=400, detail="Upload must be a multipart form")
+
+    # A declared size over the limit is refused before anything is read;
+    # chunked requests are held to the same limit as their bytes arrive
+    max_request_bytes = request_size_limit(max_file_mb)
+    content_length = request.headers.get('content-length', '')
+    if max_request_bytes and content_length.isdigit() and int(content_length) > max_request_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload exceeds the {max_request_bytes // (1024 * 1024)} MB request limit"
+        )
+
+    upload = UploadParser(
+        options[b'boundary'], directory,
+        {kind: int(mb * 1024 * 1024) for kind, mb in max_file_mb.items()},
+        max_request_bytes
+    )
+    try:
+        # File writes run in the threadpool so the event loop is not blocked
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(upload.feed, chunk)
+        saved = await run_in_threadpool(upload.finalize)
+    except FormParserError:
+        upload.abort()
+        raise HTTPException(status_code=400, detail="Invalid multipart data")
+    except BaseException:
+        upload.abort()
+        raise
+
+    return {
+        "status": "ok",
+        "paths": {key: value['path'] for key, value in saved.items()},
+        "files": {key: {k: value[k] for k in ('sha256', 'size', 'deduplicated')} for key, value in saved.items()}
+    }
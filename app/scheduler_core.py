@@ -1,109 +1,382 @@
+import os
+import time
 import random
+import numpy as np
 import pandas as pd
 from deap import base, creator, tools, algorithms
-from collections import defaultdict
 import yaml
 
-def schedule(courses_df, students_df, rooms_df, enrollments_df, config):
+from app.problem_instance import compile_instance
+from app.conflict_graph import build_conflict_graph
+from app.graph_coloring import color_courses, seed_population
+from app.local_search import memetic_operator
+from app.fitness import (
+    BASE_SCORE, fitness_data_from_instance, evaluate_population, evaluate_incremental,
+    create_evaluation_pool, evaluate_chunk, FitnessCache, cached_evaluator
+)
+
+def create_toolbox(n_courses, n_slots, tournament_size=3):
+    """Register the GA representation and operators (evaluation is added by the caller)."""
+    # Setup DEAP - avoid recreating classes
+    if not hasattr(creator, "FitnessMax"):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+    if not hasattr(creator, "Individual"):
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+    
+    toolbox = base.Toolbox()
+    toolbox.register("attr_int", random.randint, 0, n_slots - 1)
+    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_int, n_courses)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    toolbox.register("mate", tools.cxTwoPoint)
+    toolbox.register("mutate", tools.mutUniformInt, low=0, up=n_slots-1, indpb=0.1)
+    toolbox.register("select", tools.selTournament, tournsize=tournament_size)
+    return toolbox
+
+def evaluate_invalid(population, toolbox):
+    """Evaluate all individuals without a valid fitness in one batched call."""
+    invalid = [ind for ind in population if not ind.fitness.valid]
+    if invalid:
+        scores = toolbox.evaluate_population(invalid)
+        for ind, score in zip(invalid, scores):
+            ind.fitness.values = (float(score),)
+    return len(invalid)
+
+def evolve(population, toolbox, cxpb, mutpb, ngen, halloffame, stagnation=0, target_score=None,
+           time_limit=None, stop_event=None, callback=None):
+    """
+    Anytime generational GA loop. Offspring of each generation are scored
+    together in one batch, and the run stops early when any criterion is met.
+    The hall of fame always holds the best individual found so far.
+    
+    Args:
+        population: Initial population, evolved in place
+        toolbox: Toolbox with select, mate, mutate and evaluate_population, and
+            optionally improve, applied to the scored offspring (memetic mode)
+        cxpb, mutpb: Crossover and mutation probabilities
+        ngen: Maximum number of generations
+        halloffame: tools.HallOfFame receiving the best individuals
+        stagnation: Stop after this many generations without improvement (0 = off)
+        target_score: Stop once the best score reaches this value
+        time_limit: Wall-clock budget in seconds
+        stop_event: Object with is_set() (e.g. threading.Event) to stop on demand
+        callback: Called as callback(generation, best_individual) after each generation
+    
+    Returns:
+        tuple: (population, info) where info has generations, stop_reason,
+               elapsed and best_score
+    """
+    start = time.monotonic()
+    evaluate_invalid(population, toolbox)
+    halloffame.update(population)
+    
+    best_score = halloffame[0].fitness.values[0] if len(halloffame) else None
+    last_improvement = 0
+    stop_reason = 'generations'
+    gen = 0
+    
+    while gen < ngen:
+        if target_score is not None and best_score is not None and best_score >= target_score:
+            stop_reason = 'target_reached'
+            break
+        if stagnation and gen - last_improvement >= stagnation:
+            stop_reason = 'stagnation'
+            break
+        if time_limit is not None and time.monotonic() - start >= time_limit:
+            stop_reason = 'time_limit'
+            break
+        if stop_event is not None and stop_event.is_set():
+            stop_reason = 'cancelled'
+            break
+        
+        gen += 1
+        offspring = toolbox.select(population, len(population))
+        offspring = algorithms.varAnd(offspring, toolbox, cxpb, mutpb)
+        
+        evaluate_invalid(offspring, toolbox)
+        if hasattr(toolbox, 'improve'):
+            toolbox.improve(offspring)
+        halloffame.update(offspring)
+        population[:] = offspring
+        
+        if len(halloffame) and halloffame[0].fitness.values[0] > best_score:
+            best_score = halloffame[0].fitness.values[0]
+            last_improvement = gen
+        
+        if callback is not None:
+            callback(gen, halloffame[0])
+    
+    info = {
+        'generations': gen,
+        'stop_reason': stop_reason,
+        'elapsed': time.monotonic() - start,
+        'best_score': best_score
+    }
+    return population, info
+
+def stopping_criteria(opt_config, fitness_data):
+    """Read the anytime stopping criteria from the optimization config."""
+    target_score = opt_config.get('target_score')
+    if opt_config.get('stop_when_feasible', False):
+        # Zero hard-constraint penalty leaves only the constant room-split term
+        feasible_score = BASE_SCORE - fitness_data['room_split_penalty']
+        target_score = feasible_score if target_score is None else min(target_score, feasible_score)
+    
+    return {
+        'stagnation': opt_config.get('stagnation_generations', 0),
+        'target_score': target_score,
+        'time_limit': opt_config.get('time_limit_seconds') or None
+    }
+
+def schedule(courses_df, students_df, rooms_df, enrollments_df, config, conflict_graph=None,
+             stop_event=None, progress_callback=None, instance=None, previous_timetable=None,
+             changed_courses=None):
     """
-    Schedule exams using genetic algorithm.
+    Schedule exams using genetic algorithm, graph coloring or CP-SAT.
+    
+    Args:
+        instance: Optional ProblemInstance compiled from the same data and config;
+            compiled here from the DataFrames when omitted
+        conflict_graph: Optional prebuilt course conflict graph, used by the
+            greedy engine and for seeding the GA population
+        stop_event: Optional object with is_set(); the GA stops and returns its
+            current best when it is set
+        progress_callback: Optional callback(generation, best_individual) for the GA
+        previous_timetable: Optional published timetable (entries or course_id ->
+            slot); when given, only the courses affected by changes are re-solved
+            and moves away from it are penalized
+        changed_courses: Optional course IDs whose conflicts changed, e.g. from
+            update_conflict_graph, added to the courses re-solved
     
     Returns:
         dict: {timetable: [...], score: float}
     """
     
     # Load config defaults
-    pop_size = config.get('optimization', {}).get('population_size', 50)
-    generations = config.get('optimization', {}).get('generations', 100)
-    
-    # Create time slots from config
-    exam_days = config.get('exam_days', ['2024-05-01', '2024-05-02'])
-    exam_slots = config.get('exam_slots', [{'start_time': '09:00', 'end_time': '12:00'}])
-    
-    time_slots = []
-    for day in exam_days:
-        for slot in exam_slots:
-            time_slots.append({
-                'date': day,
-                'start_time': slot['start_time'],
-                'end_time': slot['end_time']
-            })
-    
-    courses = courses_df['course_id'].tolist()
+    opt_config = config.get('optimization', {})
+    pop_size = opt_config.get('population_size', 50)
+    generations = opt_config.get('generations', 100)
+    cxpb = opt_config.get('crossover_rate', 0.8)
+    mutpb = opt_config.get('mutation_rate', 0.1)
+    tournament_size = opt_config.get('tournament_size', 3)
+    incremental = opt_config.get('incremental_evaluation', False)
+    parallel_config = opt_config.get('parallel', {})
+    island_config = opt_config.get('islands', {})
+    engine = opt_config.get('engine', 'ga')
+    coloring_method = opt_config.get('coloring', 'dsatur')
+    seed_fraction = opt_config.get('seed_fraction', 0.0)
+    cache_size = opt_config.get('fitness_cache_size', 0)
+    ls_config = opt_config.get('local_search', {})
+    decomposition_config = opt_config.get('decomposition', {})
+    decompose = decomposition_config.get('enabled', False)
+    rescheduling_config = opt_config.get('rescheduling', {})
+    
+    # A fixed seed makes runs on the same data and config repeatable
+    seed = opt_config.get('seed')
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    
+    if instance is None:
+        instance = compile_instance({
+            'students': students_df,
+            'courses': courses_df,
+            'rooms': rooms_df,
+            'enrollments': enrollments_df
+        }, config)
+    
+    time_slots = instance.time_slots
+    courses = instance.course_ids
     n_courses = len(courses)
     n_slots = len(time_slots)
     
-    # Student-course mapping
-    student_courses = enrollments_df.groupby('student_id')['course_id'].apply(list).to_dict()
+    if n_slots == 0:
+        raise ValueError("No exam slots available - check exam_days and exam_slots")
     
-    # Setup DEAP - avoid recreating classes
-    if not hasattr(creator, "FitnessMax"):
-        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-    if not hasattr(creator, "Individual"):
-        creator.create("Individual", list, fitness=creator.FitnessMax)
+    # Every generation is scored from the instance's compiled arrays
+    fitness_data = fitness_data_from_instance(
+        instance, max_per_day=config.get('max_exams_per_student_per_day', 1)
+    )
     
-    toolbox = base.Toolbox()
-    toolbox.register("attr_int", random.randint, 0, n_slots - 1)
-    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_int, n_courses)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    # Two-point crossover needs at least two genes
+    if n_courses < 2:
+        cxpb = 0.0
     
-    def evaluate(individual):
-        # Map courses to slots
-        course_to_slot = {courses[i]: individual[i] for i in range(n_courses)}
-        
-        penalty = 0
+    toolbox = create_toolbox(n_courses, n_slots, tournament_size)
+    
+    ga_params = {
+        'n_courses': n_courses,
+        'n_slots': n_slots,
+        'cxpb': cxpb,
+        'mutpb': mutpb,
+        'tournament_size': tournament_size,
+        'cache_size': cache_size,
+        'local_search': ls_config
+    }
+    
+    if previous_timetable is not None:
+        from app.rescheduler import previous_assignment, reschedule
         
-        # Hard constraint: max 1 exam per student per day
-        for student_id, student_course_list in student_courses.items():
-            day_exams = defaultdict(int)
-            for course_id in student_course_list:
-                slot_idx = course_to_slot[course_id]
-                day = time_slots[slot_idx]['date']
-                day_exams[day] += 1
-            
-            for day, count in day_exams.items():
-                if count > 1:
-                    penalty += (count - 1) * 1000  # Heavy penalty
+        changed = [instance.course_index[c] for c in changed_courses or [] if c in instance.course_index]
+        best_genes, best_score, search_info = reschedule(
+            fitness_data, previous_assignment(previous_timetable, instance), ga_params,
+            rescheduling_config, pop_size, generations, changed=changed, opt_config=opt_config,
+            stop_event=stop_event, callback=progress_callback
+        )
+        search_info['moved_courses'] = [courses[c] for c in search_info['moved_courses']]
+        best_individual = creator.Individual(best_genes)
+        best_individual.fitness.values = (best_score,)
+        result = _build_result(best_individual, instance)
+        result['search'] = search_info
+        return result
+    
+    if engine not in ('ga', 'greedy', 'cpsat'):
+        raise ValueError(f"Unknown scheduling engine '{engine}'")
+    
+    if engine in ('greedy', 'cpsat') or seed_fraction > 0 or decompose:
+        if conflict_graph is None:
+            conflict_graph = build_conflict_graph(enrollments_df, instance=instance, output='csr')
+        course_sizes = fitness_data['course_sizes'].tolist()
+    
+    if engine == 'greedy':
+        genes = color_courses(conflict_graph, courses, time_slots, course_sizes, coloring_method)
+        best_individual = creator.Individual(genes)
+        best_individual.fitness.values = (float(evaluate_population([genes], fitness_data)[0]),)
+        return _build_result(best_individual, instance)
+    
+    if engine == 'cpsat':
+        return _schedule_cpsat(fitness_data, conflict_graph, instance, opt_config)
+    
+    # Part of the initial population is constructed by graph coloring
+    seeds = []
+    n_seeds = min(pop_size, int(round(seed_fraction * pop_size)))
+    if n_seeds > 0:
+        seeds = seed_population(conflict_graph, courses, time_slots, course_sizes, n_seeds,
+                                random.Random(random.getrandbits(32)))
+    
+    if decompose:
+        from app.decomposition import run_decomposed
         
-        # Soft penalty: room splits (simplified - assume need room splits if >50 students)
-        room_split_penalty = 0
-        for course_id in courses:
-            course_students = len(enrollments_df[enrollments_df['course_id'] == course_id])
-            if course_students > 50:  # Simplified threshold
-                room_split_penalty += 10
+        best_genes, best_score, search_info = run_decomposed(
+            fitness_data, conflict_graph, courses, ga_params, decomposition_config,
+            pop_size, generations, seeds=seeds, opt_config=opt_config,
+            stop_event=stop_event, callback=progress_callback
+        )
+        best_individual = creator.Individual(best_genes)
+        best_individual.fitness.values = (best_score,)
+        result = _build_result(best_individual, instance)
+        result['search'] = search_info
+        return result
+    
+    if island_config.get('count', 0) > 1:
+        from app.island_model import run_islands
         
-        penalty += room_split_penalty
+        best_genes, best_score, search_info = run_islands(
+            fitness_data, ga_params, island_config, pop_size, generations,
+            workers=island_config.get('workers', 0), seeds=seeds,
+            stop_event=stop_event, callback=progress_callback,
+            **stopping_criteria(opt_config, fitness_data)
+        )
+        best_individual = creator.Individual(best_genes)
+        best_individual.fitness.values = (best_score,)
+        result = _build_result(best_individual, instance)
+        result['search'] = search_info
+        return result
+    
+    # Opt-in process pool; workers receive the enrollment arrays once at startup
+    pool = None
+    if parallel_config.get('enabled', False):
+        workers = parallel_config.get('workers', 0) or os.cpu_count() or 1
+        pool = create_evaluation_pool(fitness_data, workers)
+        toolbox.register("map", pool.map)
+    
+    def evaluate_batch(individuals):
+        genes = np.array(individuals, dtype=np.int64).reshape(len(individuals), n_courses)
+        if pool is None:
+            return evaluate_population(genes, fitness_data)
         
-        return (1000 - penalty,)  # Higher is better
+        chunk_size = parallel_config.get('chunk_size', 0) or -(-len(genes) // workers)
+        chunks = [genes[i:i + chunk_size] for i in range(0, len(genes), chunk_size)]
+        return np.concatenate(list(toolbox.map(evaluate_chunk, chunks)))
     
-    toolbox.register("evaluate", evaluate)
-    toolbox.register("mate", tools.cxTwoPoint)
-    toolbox.register("mutate", tools.mutUniformInt, low=0, up=n_slots-1, indpb=0.1)
-    toolbox.register("select", tools.selTournament, tournsize=3)
+    if incremental and pool is None:
+        # Offspring inherit their parent's day counters and only rescore changed courses
+        evaluate_fn = lambda individuals: evaluate_incremental(individuals, fitness_data)
+    else:
+        evaluate_fn = evaluate_batch
+    
+    cache = FitnessCache(cache_size) if cache_size > 0 else None
+    if cache is not None:
+        evaluate_fn = cached_evaluator(evaluate_fn, cache)
+    toolbox.register("evaluate_population", evaluate_fn)
+    
+    if ls_config.get('enabled', False):
+        toolbox.register("improve", memetic_operator(fitness_data, ls_config,
+                                                     rng=random.Random(random.getrandbits(32))))
     
     # Run GA
-    pop = toolbox.population(n=pop_size)
+    pop = [creator.Individual(genes) for genes in seeds] + toolbox.population(n=pop_size - len(seeds))
     hof = tools.HallOfFame(1)
     
-    algorithms.eaSimple(pop, toolbox, cxpb=0.8, mutpb=0.1, ngen=generations, 
-                       halloffame=hof, verbose=False)
+    try:
+        _, search_info = evolve(
+            pop, toolbox, cxpb=cxpb, mutpb=mutpb, ngen=generations, halloffame=hof,
+            stop_event=stop_event, callback=progress_callback,
+            **stopping_criteria(opt_config, fitness_data)
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown()
     
-    # Build timetable from best solution
-    best_individual = hof[0]
-    course_to_slot = {courses[i]: best_individual[i] for i in range(n_courses)}
+    if cache is not None:
+        search_info['fitness_cache'] = cache.stats()
     
+    result = _build_result(hof[0], instance)
+    result['search'] = search_info
+    return result
+
+def _schedule_cpsat(fitness_data, conflict_graph, instance, opt_config):
+    """Run the CP-SAT engine, warm-started from a DSatur timetable."""
+    from app.cpsat_scheduler import solve_cpsat
+    
+    cpsat_config = opt_config.get('cpsat', {})
+    time_limit = cpsat_config.get('time_limit_seconds', 30)
+    hint = color_courses(conflict_graph, instance.course_ids, instance.time_slots,
+                         fitness_data['course_sizes'].tolist())
+    
+    solution = solve_cpsat(
+        fitness_data, len(instance.time_slots), instance.total_capacity,
+        time_limit=time_limit, workers=cpsat_config.get('workers', 0), hint=hint
+    )
+    
+    if solution['status'] == 'infeasible':
+        raise ValueError(
+            "CP-SAT proved that no timetable satisfies the per-student daily exam limit "
+            "and slot capacity with the configured exam days and slots"
+        )
+    if solution['genes'] is None:
+        raise ValueError(f"CP-SAT found no feasible timetable within {time_limit} seconds")
+    
+    best_individual = creator.Individual(solution['genes'])
+    best_individual.fitness.values = (float(evaluate_population([solution['genes']], fitness_data)[0]),)
+    
+    result = _build_result(best_individual, instance)
+    result['solver'] = {key: value for key, value in solution.items() if key != 'genes'}
+    result['solver']['oversized_courses'] = [instance.course_ids[c] for c in solution['oversized_courses']]
+    return result
+
+def _build_result(best_individual, instance):
+    """Build the timetable and score from the best individual."""
     timetable = []
-    for course_id, slot_idx in course_to_slot.items():
-        slot = time_slots[slot_idx]
-        course_students = enrollments_df[enrollments_df['course_id'] == course_id]['student_id'].tolist()
-        
-        # Get course details
-        course_info = courses_df[courses_df['course_id'] == course_id].iloc[0]
+    for i, course_id in enumerate(instance.course_ids):
+        slot = instance.time_slots[best_individual[i]]
+        # Compact instances keep student indices; the exporters decode them
+        course_students = (instance.students_of(i) if instance.compact
+                           else [instance.student_ids[s] for s in instance.students_of(i)])
         
         timetable.append({
             'course_id': course_id,
-            'course_code': course_info.get('code', ''),
-            'course_name': course_info.get('name', ''),
+            'course_code': instance.course_codes[i],
+            'course_name': instance.course_names[i],
             'slot_date': slot['date'],
             'slot_time': f"{slot['start_time']}-{slot['end_time']}",
             'assignments': [{
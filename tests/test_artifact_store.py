@@ -0,0 +1,67 @@
+import pytest
+import os
+import time
+from app.artifact_store import create_run, record_run, list_runs, get_run, latest_run, evict_runs, load_response
+
+def add_run(root, score, size=100, status='success'):
+    run_id, directory = create_run(root)
+    path = os.path.join(directory, 'timetable.xlsx')
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    record_run(root, run_id, {'status': status, 'score': score}, files={'excel': path})
+    return run_id
+
+def test_runs_are_indexed_with_metadata(tmp_path):
+    """Runs get their own directory, metadata file and index record"""
+    root = str(tmp_path)
+
+    first = add_run(root, 1.0)
+    second = add_run(root, 2.0)
+    add_run(root, None, status='failed')
+
+    runs = list_runs(root)
+    assert len(runs) == 3
+    assert [run['run_id'] for run in list_runs(root, status='success')] == [second, first]
+    assert latest_run(root)['run_id'] == second
+
+    run = get_run(root, first)
+    assert run['score'] == 1.0
+    assert run['metadata'] == {'status': 'success', 'score': 1.0}
+    assert run['files']['excel'] == os.path.join(root, first, 'timetable.xlsx')
+    assert get_run(root, 'missing') is None
+
+def test_eviction_by_size_and_age(tmp_path):
+    """The oldest finished runs go first; live and kept runs survive both bounds"""
+    root = str(tmp_path)
+
+    runs = [add_run(root, float(i), size=1000) for i in range(3)]
+    running, _ = create_run(root)
+
+    sizes = {run['run_id']: run['size_bytes'] for run in list_runs(root)}
+    evicted = evict_runs(root, max_bytes=sizes[runs[2]] + 1, keep=runs[1])
+    assert evicted == [runs[0], runs[2]]
+    assert not os.path.exists(os.path.join(root, runs[0]))
+    assert {run['run_id'] for run in list_runs(root)} == {runs[1], running}
+
+    # A live run survives age eviction
+    time.sleep(0.01)
+    assert evict_runs(root, max_age_days=0.01 / 86400) == [runs[1]]
+    assert [run['run_id'] for run in list_runs(root)] == [running]
+
+    # A crashed run is marked failed with its leftover size, then counts toward the bound
+    with open(os.path.join(root, running, 'partial.xlsx'), 'wb') as f:
+        f.write(b'x' * 500)
+    assert evict_runs(root, max_bytes=100, stale_after_hours=0) == [running]
+    assert list_runs(root) == []
+
+def test_run_ids_cannot_escape_the_root(tmp_path):
+    """IDs that are not run IDs never reach the file system"""
+    root = str(tmp_path / 'runs')
+    add_run(root, 1.0)
+    (tmp_path / 'response.json').write_text('{"files": {}}')
+    
+    for run_id in ('..', '../runs', str(tmp_path), '20240101-000000-0000000g'):
+        assert get_run(root, run_id) is None
+        assert load_response(root, run_id) is None
+    with pytest.raises(ValueError):
+        create_run(root, '..')
@@ -1,7 +1,7 @@
 import pytest
 import pandas as pd
 import networkx as nx
-from app.conflict_graph import build_conflict_graph, graph_stats
+from app.conflict_graph import build_conflict_graph, graph_stats, ConflictGraph
 
 def test_build_conflict_graph_basic():
     """Test basic conflict graph construction"""
@@ -112,4 +112,87 @@ def test_complex_conflict_scenario():
     # C001 should have highest degree (connected to C002, C003, C004)
     degrees = dict(G.degree())
     assert degrees['C001'] == 3
-    assert stats['max_degree_course'] == 'C001'
\ No newline at end of file
+    assert stats['max_degree_course'] == 'C001'
+def test_conflict_graph_weights_and_csr_output():
+    """Edges carry shared-student counts and the CSR output matches the graph"""
+    
+    enrollments = pd.DataFrame([
+        {'student_id': 'S001', 'course_id': 'C001'},
+        {'student_id': 'S001', 'course_id': 'C002'},
+        {'student_id': 'S002', 'course_id': 'C001'},
+        {'student_id': 'S002', 'course_id': 'C002'},
+        {'student_id': 'S002', 'course_id': 'C002'},  # duplicate enrollment counts once
+        {'student_id': 'S003', 'course_id': 'C002'},
+        {'student_id': 'S003', 'course_id': 'C003'},
+    ])
+    
+    G = build_conflict_graph(enrollments)
+    assert G['C001']['C002']['weight'] == 2
+    assert G['C002']['C003']['weight'] == 1
+    assert not G.has_edge('C001', 'C003')
+    
+    csr = build_conflict_graph(enrollments, output='csr')
+    assert csr.courses == ['C001', 'C002', 'C003']
+    assert csr.indptr.tolist() == [0, 1, 3, 4]
+    assert csr.indices.tolist() == [1, 0, 2, 1]
+    assert csr.weights.tolist() == [2, 2, 1, 1]
+    
+    with pytest.raises(ValueError):
+        build_conflict_graph(enrollments, output='matrix')
+
+def test_array_graph_matches_networkx():
+    """The CSR graph answers the same queries and stats as the networkx graph"""
+    
+    enrollments = pd.DataFrame([
+        {'student_id': f'S{s:03d}', 'course_id': f'C{(s * k) % 7:03d}'} for s in range(20) for k in (1, 2, 3)
+    ])
+    G = build_conflict_graph(enrollments)
+    C = build_conflict_graph(enrollments, output='csr')
+    
+    assert isinstance(C, ConflictGraph)
+    assert graph_stats(C) == pytest.approx(graph_stats(G))
+    assert C.number_of_edges() == G.number_of_edges()
+    assert dict(C.degree(weight='weight')) == dict(G.degree(weight='weight'))
+    assert C.degrees.tolist() == [G.degree(node) for node in C.nodes()]
+    for node in C.nodes():
+        assert sorted(C.neighbors(node)) == sorted(G.neighbors(node))
+        assert C[node] == dict(G[node])
+    assert C.has_edge('C001', 'C002') == G.has_edge('C001', 'C002')
+    assert sorted(map(sorted, C.connected_components())) == sorted(map(sorted, nx.connected_components(G)))
+    assert nx.utils.graphs_equal(C.to_networkx(), G)
+
+def test_update_conflict_graph_matches_rebuild():
+    """Applying add/drop changes gives the same graph as rebuilding from scratch"""
+    from app.conflict_graph import student_course_sets, update_conflict_graph
+
+    enrollments = pd.DataFrame([
+        {'student_id': 'S001', 'course_id': 'C001'},
+        {'student_id': 'S001', 'course_id': 'C002'},
+        {'student_id': 'S002', 'course_id': 'C002'},
+        {'student_id': 'S002', 'course_id': 'C003'},
+    ])
+    added = [('S003', 'C004'), ('S003', 'C001')]
+    removed = [('S002', 'C002')]
+    after = pd.concat([
+        enrollments[~((enrollments['student_id'] == 'S002') & (enrollments['course_id'] == 'C002'))],
+        pd.DataFrame(added, columns=['student_id', 'course_id'])
+    ])
+    expected = set(build_conflict_graph(after).edges(data='weight'))
+    normalize = lambda edges: {tuple(sorted((u, v))) + (w,) for u, v, w in edges}
+
+    for output in ('networkx', 'csr'):
+        G = build_conflict_graph(enrollments, output=output)
+        report = update_conflict_graph(G, student_course_sets(enrollments), added, removed)
+
+        assert normalize(G.edges(data='weight')) == normalize(expected)
+        assert 'C004' in G
+        assert report['changed_courses'] == ['C001', 'C002', 'C003', 'C004']
+        assert report['removed_edges'] == [('C002', 'C003')]
+        assert report['added_edges'] == [('C001', 'C004')]
+
+    # Weight-only changes are written into the existing CSR arrays
+    G = build_conflict_graph(enrollments, output='csr')
+    weights = G.weights
+    update_conflict_graph(G, student_course_sets(enrollments), [('S004', 'C001'), ('S004', 'C002')])
+    assert G.weights is weights
+    assert G['C001']['C002']['weight'] == 2 and G['C002']['C001']['weight'] == 2
@@ -0,0 +1,99 @@
+import pytest
+import pandas as pd
+from app.fitness import compile_fitness_data
+from app.cpsat_scheduler import solve_cpsat
+from app.scheduler_core import schedule
+
+def make_data(n_days, slots_per_day=1):
+    # Triangle of conflicts: needs three different days
+    enrollments_df = pd.DataFrame([
+        {'student_id': 'S1', 'course_id': 'C1'}, {'student_id': 'S1', 'course_id': 'C2'},
+        {'student_id': 'S2', 'course_id': 'C2'}, {'student_id': 'S2', 'course_id': 'C3'},
+        {'student_id': 'S3', 'course_id': 'C1'}, {'student_id': 'S3', 'course_id': 'C3'},
+    ])
+    time_slots = [{'date': f'd{d}'} for d in range(n_days) for _ in range(slots_per_day)]
+    return compile_fitness_data(['C1', 'C2', 'C3'], enrollments_df, time_slots), time_slots
+
+def test_cpsat_finds_feasible_timetable():
+    """Three mutually conflicting courses go to three different days"""
+    
+    data, time_slots = make_data(n_days=3)
+    solution = solve_cpsat(data, len(time_slots), slot_capacity=10, time_limit=10, workers=1)
+    
+    assert solution['status'] == 'optimal'
+    assert solution['gap'] == 0.0
+    assert sorted(data['slot_day'][solution['genes']].tolist()) == [0, 1, 2]
+
+def test_cpsat_proves_infeasibility():
+    """Two days cannot hold a triangle of conflicts"""
+    
+    data, time_slots = make_data(n_days=2, slots_per_day=2)
+    solution = solve_cpsat(data, len(time_slots), slot_capacity=10, time_limit=10, workers=1)
+    
+    assert solution['status'] == 'infeasible'
+    assert solution['genes'] is None
+
+def test_cpsat_respects_slot_capacity():
+    """Courses that do not fit together are put in different slots"""
+    
+    enrollments_df = pd.DataFrame(
+        [{'student_id': f'A{i}', 'course_id': 'C1'} for i in range(6)] +
+        [{'student_id': f'B{i}', 'course_id': 'C2'} for i in range(6)]
+    )
+    time_slots = [{'date': 'd0'}, {'date': 'd0'}]
+    data = compile_fitness_data(['C1', 'C2'], enrollments_df, time_slots)
+    
+    solution = solve_cpsat(data, 2, slot_capacity=10, time_limit=10, workers=1)
+    
+    assert solution['genes'][0] != solution['genes'][1]
+
+def test_cpsat_reports_oversized_course():
+    """A course larger than the slot capacity is reported instead of making the model infeasible"""
+    
+    enrollments_df = pd.DataFrame(
+        [{'student_id': f'A{i}', 'course_id': 'C1'} for i in range(12)] +
+        [{'student_id': f'B{i}', 'course_id': 'C2'} for i in range(6)] +
+        [{'student_id': f'C{i}', 'course_id': 'C3'} for i in range(6)]
+    )
+    time_slots = [{'date': 'd0'}, {'date': 'd0'}]
+    data = compile_fitness_data(['C1', 'C2', 'C3'], enrollments_df, time_slots)
+    
+    solution = solve_cpsat(data, 2, slot_capacity=10, time_limit=10, workers=1)
+    
+    assert solution['status'] == 'optimal'
+    assert solution['oversized_courses'] == [0]
+    assert solution['genes'][1] != solution['genes'][2]
+    assert solution['objective'] == 6
+
+def test_schedule_cpsat_engine():
+    """CP-SAT engine returns a timetable with solver statistics or a diagnostic"""
+    
+    courses_df = pd.DataFrame([{'course_id': c, 'code': c, 'name': c} for c in ['C1', 'C2', 'C3']])
+    students_df = pd.DataFrame([{'student_id': s, 'name': s} for s in ['S1', 'S2', 'S3']])
+    enrollments_df = pd.DataFrame([
+        {'student_id': 'S1', 'course_id': 'C1'}, {'student_id': 'S1', 'course_id': 'C2'},
+        {'student_id': 'S2', 'course_id': 'C2'}, {'student_id': 'S2', 'course_id': 'C3'},
+        {'student_id': 'S3', 'course_id': 'C1'}, {'student_id': 'S3', 'course_id': 'C3'},
+    ])
+    rooms_df = pd.DataFrame([{'room_id': 'R001', 'name': 'Room A', 'capacity': 30}])
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02', '2024-05-03'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {'engine': 'cpsat', 'cpsat': {'time_limit_seconds': 10, 'workers': 1}}
+    }
+    
+    result = schedule(courses_df, students_df, rooms_df, enrollments_df, config)
+    
+    assert result['score'] == 1000
+    assert result['solver']['status'] == 'optimal'
+    
+    config['exam_days'] = ['2024-05-01', '2024-05-02']
+    with pytest.raises(ValueError, match="CP-SAT proved"):
+        schedule(courses_df, students_df, rooms_df, enrollments_df, config)
+    
+    # Rooms too small for any course: the engine still returns a timetable
+    config['exam_days'] = ['2024-05-01', '2024-05-02', '2024-05-03']
+    small_rooms_df = pd.DataFrame([{'room_id': 'R001', 'name': 'Room A', 'capacity': 1}])
+    result = schedule(courses_df, students_df, small_rooms_df, enrollments_df, config)
+    assert result['solver']['oversized_courses'] == ['C1', 'C2', 'C3']
+    assert len(result['timetable']) == 3
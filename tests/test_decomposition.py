@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import networkx as nx
+from app.fitness import compile_fitness_data, subset_fitness_data, evaluate_population, init_eval_state
+from app.decomposition import decompose, balance_days, balance_slots
+from app.scheduler_core import schedule
+
+def two_cluster_data():
+    """Two departments whose students never share a course"""
+    courses = [f'ACT{i}' for i in range(4)] + [f'CSE{i}' for i in range(4)]
+    rows = []
+    for s in range(8):
+        dept = 'ACT' if s < 4 else 'CSE'
+        rows += [{'student_id': f'S{s:03d}', 'course_id': f'{dept}{(s + k) % 4}'} for k in range(2)]
+    time_slots = [
+        {'date': f'2024-05-{d + 1:02d}', 'start_time': start, 'end_time': '12:00'}
+        for d in range(3) for start in ('09:00', '14:00')
+    ]
+    return courses, pd.DataFrame(rows), time_slots
+
+def test_decompose_components_and_pooling():
+    """Components become groups, small ones are pooled and large ones split"""
+
+    G = nx.Graph([('A', 'B'), ('B', 'C'), ('D', 'E')])
+    G.add_node('F')
+    courses = ['A', 'B', 'C', 'D', 'E', 'F', 'G']
+
+    groups, coupled = decompose(G, courses)
+    assert groups[0] == [0, 1, 2]
+    assert sorted(map(tuple, groups)) == [(0, 1, 2), (3, 4), (5,), (6,)]
+    assert not coupled
+
+    groups, _ = decompose(G, courses, min_size=3)
+    assert sorted(map(tuple, groups)) == [(0, 1, 2), (3, 4, 5), (6,)]
+
+    ring = nx.cycle_graph(12)
+    groups, coupled = decompose(ring, list(range(12)), max_size=4, seed=0)
+    assert coupled
+    assert sorted(i for group in groups for i in group) == list(range(12))
+
+def test_subsets_score_independently():
+    """Violations of independent groups add up to the violations of the whole"""
+
+    courses, enrollments_df, time_slots = two_cluster_data()
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+    genes = np.random.default_rng(0).integers(0, len(time_slots), size=len(courses))
+
+    total = init_eval_state(genes, data)['violations']
+    parts = [init_eval_state(genes[g], subset_fitness_data(data, g))['violations'] for g in ([0, 1, 2, 3], [4, 5, 6, 7])]
+    assert total == sum(parts)
+
+def test_balancing_keeps_violations():
+    """Day permutations per group and slot balancing never change the score"""
+
+    courses, enrollments_df, time_slots = two_cluster_data()
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+    genes = np.random.default_rng(1).integers(0, len(time_slots), size=len(courses))
+    before = evaluate_population(genes[None, :], data)[0]
+
+    balance_days(genes, [[0, 1, 2, 3], [4, 5, 6, 7]], data, np.bincount(data['slot_day']))
+    balance_slots(genes, data)
+
+    assert evaluate_population(genes[None, :], data)[0] == before
+
+def test_schedule_decomposed():
+    """Decomposition mode schedules every course and reports its groups"""
+
+    courses, enrollments_df, time_slots = two_cluster_data()
+    courses_df = pd.DataFrame([{'course_id': c, 'code': c, 'name': c} for c in courses])
+    students_df = pd.DataFrame({'student_id': enrollments_df['student_id'].unique()})
+    rooms_df = pd.DataFrame([{'room_id': 'R001', 'capacity': 30}])
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02', '2024-05-03'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}, {'start_time': '14:00', 'end_time': '17:00'}],
+        'optimization': {
+            'population_size': 10, 'generations': 30, 'stop_when_feasible': True,
+            'decomposition': {'enabled': True, 'workers': 1}
+        }
+    }
+
+    result = schedule(courses_df, students_df, rooms_df, enrollments_df, config)
+    assert len(result['timetable']) == 8
+    assert result['score'] == 1000
+    assert [group['courses'] for group in result['search']['groups']] == [4, 4]
@@ -0,0 +1,215 @@
+import random
+import pytest
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from app.fitness import (
+    compile_fitness_data, evaluate_population, evaluate_incremental,
+    init_eval_state, apply_gene_changes, gene_change_delta, FitnessCache, cached_evaluator
+)
+
+def reference_score(individual, courses, enrollments_df, time_slots, max_per_day=1):
+    """Straightforward per-student evaluation used as the ground truth"""
+    course_to_slot = {courses[i]: individual[i] for i in range(len(courses))}
+    student_courses = enrollments_df.groupby('student_id')['course_id'].apply(list).to_dict()
+
+    penalty = 0
+    for student_id, course_list in student_courses.items():
+        day_exams = defaultdict(int)
+        for course_id in course_list:
+            day_exams[time_slots[course_to_slot[course_id]]['date']] += 1
+        for count in day_exams.values():
+            if count > max_per_day:
+                penalty += (count - max_per_day) * 1000
+
+    for course_id in courses:
+        if len(enrollments_df[enrollments_df['course_id'] == course_id]) > 50:
+            penalty += 10
+
+    return 1000 - penalty
+
+def make_instance(n_students=120, n_courses=12, courses_per_student=4, seed=0):
+    rng = random.Random(seed)
+    courses = [f'C{i:03d}' for i in range(n_courses)]
+    rows = []
+    for s in range(n_students):
+        for course_id in rng.sample(courses, courses_per_student):
+            rows.append({'student_id': f'S{s:04d}', 'course_id': course_id})
+    time_slots = [
+        {'date': day, 'start_time': start, 'end_time': end}
+        for day in ['2024-05-01', '2024-05-02', '2024-05-03']
+        for start, end in [('09:00', '12:00'), ('14:00', '17:00')]
+    ]
+    return courses, pd.DataFrame(rows), time_slots
+
+def test_batched_scores_match_reference():
+    """Batched NumPy scores equal the per-student evaluation"""
+
+    courses, enrollments_df, time_slots = make_instance()
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+
+    rng = np.random.default_rng(1)
+    genes = rng.integers(0, len(time_slots), size=(25, len(courses)))
+    scores = evaluate_population(genes, data)
+
+    expected = [reference_score(list(row), courses, enrollments_df, time_slots) for row in genes]
+    assert scores.tolist() == pytest.approx(expected)
+
+def test_batched_scores_respect_max_per_day():
+    """Violations are counted above max_exams_per_student_per_day"""
+
+    courses, enrollments_df, time_slots = make_instance(seed=3)
+    data = compile_fitness_data(courses, enrollments_df, time_slots, max_per_day=2)
+
+    genes = np.random.default_rng(2).integers(0, len(time_slots), size=(10, len(courses)))
+    expected = [reference_score(list(row), courses, enrollments_df, time_slots, max_per_day=2) for row in genes]
+
+    assert evaluate_population(genes, data).tolist() == pytest.approx(expected)
+
+def test_room_split_penalty_precomputed():
+    """Courses with more than 50 students add a constant room-split penalty"""
+
+    enrollments_df = pd.DataFrame(
+        [{'student_id': f'S{i:03d}', 'course_id': 'C001'} for i in range(60)] +
+        [{'student_id': 'S000', 'course_id': 'C002'}]
+    )
+    time_slots = [{'date': '2024-05-01'}, {'date': '2024-05-02'}]
+    data = compile_fitness_data(['C001', 'C002'], enrollments_df, time_slots)
+
+    assert data['room_split_penalty'] == 10
+    # Same day for S000 -> one violation
+    assert evaluate_population([[0, 0], [0, 1]], data).tolist() == [1000 - 1010, 1000 - 10]
+
+def test_empty_population_and_courses():
+    """Evaluator handles empty inputs"""
+
+    data = compile_fitness_data([], pd.DataFrame(columns=['student_id', 'course_id']), [{'date': 'd'}])
+    assert evaluate_population(np.empty((3, 0), dtype=int), data).tolist() == [1000.0] * 3
+
+class Genes(list):
+    """List subclass that can carry an eval_state attribute like a DEAP individual"""
+
+def test_delta_updates_match_full_recount():
+    """Applying a sequence of gene changes tracks the full recount"""
+
+    courses, enrollments_df, time_slots = make_instance(seed=5)
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+
+    rng = np.random.default_rng(7)
+    genes = rng.integers(0, len(time_slots), size=len(courses))
+    state = init_eval_state(genes, data)
+
+    for _ in range(50):
+        new_genes = genes.copy()
+        changed = rng.choice(len(courses), size=rng.integers(1, 4), replace=False)
+        new_genes[changed] = rng.integers(0, len(time_slots), size=len(changed))
+
+        apply_gene_changes(state, new_genes, changed, data)
+        genes = new_genes
+
+        assert state['violations'] == init_eval_state(genes, data)['violations']
+        assert np.array_equal(state['counts'], init_eval_state(genes, data)['counts'])
+
+def test_evaluate_incremental_matches_batched():
+    """Offspring carrying a parent's state score the same as a batched evaluation"""
+
+    courses, enrollments_df, time_slots = make_instance(seed=9)
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+
+    rng = np.random.default_rng(3)
+    parents = [Genes(rng.integers(0, len(time_slots), size=len(courses)).tolist()) for _ in range(8)]
+    evaluate_incremental(parents, data)
+
+    children = []
+    for parent in parents:
+        child = Genes(parent)
+        child.eval_state = {key: np.copy(value) if isinstance(value, np.ndarray) else value
+                            for key, value in parent.eval_state.items()}
+        child[rng.integers(len(courses))] = int(rng.integers(len(time_slots)))
+        children.append(child)
+
+    assert evaluate_incremental(children, data).tolist() == evaluate_population(children, data).tolist()
+
+def test_fitness_cache_lru_and_counters():
+    """Cache evicts the least recently used entry and counts hits and misses"""
+
+    cache = FitnessCache(max_size=2)
+    a, b, c = (cache.key(genes) for genes in ([0, 1], [1, 0], [1, 1]))
+
+    cache.put(a, 1.0)
+    cache.put(b, 2.0)
+    assert cache.get(a) == 1.0  # a becomes most recent
+    cache.put(c, 3.0)           # evicts b
+
+    assert cache.get(b) is None
+    assert cache.get(c) == 3.0
+    assert cache.stats()['hits'] == 2
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['size'] == 2
+
+def test_cached_evaluator_skips_duplicates():
+    """Identical individuals are evaluated once, repeats come from the cache"""
+
+    courses, enrollments_df, time_slots = make_instance(seed=11)
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+
+    evaluated = []
+    def evaluate(individuals):
+        evaluated.append(len(individuals))
+        return evaluate_population(individuals, data)
+
+    cache = FitnessCache()
+    evaluate_cached = cached_evaluator(evaluate, cache)
+
+    genes = np.random.default_rng(0).integers(0, len(time_slots), size=(3, len(courses))).tolist()
+    batch = [genes[0], genes[1], genes[0], genes[2], genes[1]]
+
+    assert evaluate_cached(batch).tolist() == evaluate_population(batch, data).tolist()
+    assert evaluated == [3]
+
+    evaluate_cached(batch)
+    assert evaluated == [3]
+    assert cache.stats()['hits'] == 5
+
+def test_gene_change_delta_matches_applied_change():
+    """Move deltas equal the change after applying the move, and leave the state untouched"""
+
+    courses, enrollments_df, time_slots = make_instance(seed=13)
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+
+    rng = np.random.default_rng(5)
+    genes = rng.integers(0, len(time_slots), size=len(courses))
+    state = init_eval_state(genes, data)
+
+    for _ in range(30):
+        changed = rng.choice(len(courses), size=rng.integers(1, 5), replace=False)
+        new_slots = rng.integers(0, len(time_slots), size=len(changed))
+
+        delta = gene_change_delta(state, changed, new_slots, data)
+        assert state['violations'] == init_eval_state(genes, data)['violations']
+
+        new_genes = genes.copy()
+        new_genes[changed] = new_slots
+        assert delta == init_eval_state(new_genes, data)['violations'] - state['violations']
+
+def test_identical_students_collapse_into_weighted_groups():
+    """Students with the same course list share one counter row weighted by group size"""
+
+    enrollments_df = pd.DataFrame(
+        [{'student_id': f'S{i:03d}', 'course_id': c} for i in range(30) for c in ('C001', 'C002')] +
+        [{'student_id': 'S100', 'course_id': 'C002'}, {'student_id': 'S100', 'course_id': 'C003'}]
+    )
+    courses = ['C001', 'C002', 'C003']
+    time_slots = [{'date': '2024-05-01'}, {'date': '2024-05-02'}]
+    data = compile_fitness_data(courses, enrollments_df, time_slots)
+
+    assert data['n_students'] == 31
+    assert data['n_groups'] == 2
+    assert sorted(data['group_weights'].tolist()) == [1, 30]
+    assert data['course_sizes'].tolist() == [30, 31, 1]
+
+    # All 30 students clash on day 0, S100 clashes too when C003 joins them
+    assert evaluate_population([[0, 0, 1], [0, 0, 0], [0, 1, 1]], data).tolist() == [
+        1000 - 30000, 1000 - 31000, 1000 - 1000
+    ]
+    assert init_eval_state([0, 0, 0], data)['violations'] == 31
@@ -0,0 +1,80 @@
+import random
+import pytest
+import networkx as nx
+import pandas as pd
+from app.graph_coloring import dsatur_coloring, rlf_coloring, color_courses, seed_population
+from app.scheduler_core import schedule
+
+def is_proper(G, coloring):
+    return all(coloring[u] != coloring[v] for u, v in G.edges())
+
+@pytest.mark.parametrize("coloring_fn", [dsatur_coloring, rlf_coloring])
+def test_colorings_are_proper(coloring_fn):
+    """No two adjacent courses share a color"""
+    
+    for seed in range(5):
+        G = nx.gnp_random_graph(30, 0.2, seed=seed)
+        coloring = coloring_fn(G, random.Random(seed))
+        
+        assert set(coloring) == set(G.nodes())
+        assert is_proper(G, coloring)
+
+@pytest.mark.parametrize("coloring_fn", [dsatur_coloring, rlf_coloring])
+def test_colorings_are_optimal_on_simple_graphs(coloring_fn):
+    """Bipartite graphs and odd cycles get their chromatic number"""
+    
+    assert len(set(coloring_fn(nx.cycle_graph(6)).values())) == 2
+    assert len(set(coloring_fn(nx.cycle_graph(7)).values())) == 3
+    assert len(set(coloring_fn(nx.complete_graph(4)).values())) == 4
+
+def test_color_courses_maps_colors_to_days():
+    """Conflicting courses land on different days when enough days exist"""
+    
+    G = nx.cycle_graph(['C1', 'C2', 'C3', 'C4', 'C5'])
+    courses = ['C1', 'C2', 'C3', 'C4', 'C5', 'C6']  # C6 has no enrollments
+    time_slots = [
+        {'date': day, 'start_time': start, 'end_time': end}
+        for day in ['d1', 'd2', 'd3']
+        for start, end in [('09:00', '12:00'), ('14:00', '17:00')]
+    ]
+    
+    for method in ['dsatur', 'rlf']:
+        genes = color_courses(G, courses, time_slots, [10] * 6, method)
+        day_of = {course: time_slots[slot]['date'] for course, slot in zip(courses, genes)}
+        
+        assert all(day_of[u] != day_of[v] for u, v in G.edges())
+    
+    with pytest.raises(ValueError, match="Unknown coloring method"):
+        color_courses(G, courses, time_slots, [10] * 6, 'tabucol')
+
+def test_seed_population_size():
+    """Seeding returns the requested number of slot vectors"""
+    
+    G = nx.path_graph(['C1', 'C2', 'C3'])
+    seeds = seed_population(G, ['C1', 'C2', 'C3'], [{'date': 'd1'}, {'date': 'd2'}], [1, 1, 1], 4)
+    
+    assert len(seeds) == 4
+    assert all(len(genes) == 3 for genes in seeds)
+
+def test_schedule_greedy_engine():
+    """Greedy engine finds a conflict-free timetable without evolution"""
+    
+    courses_df = pd.DataFrame([
+        {'course_id': f'C{i:03d}', 'code': f'CODE{i}', 'name': f'Course {i}'} for i in range(6)
+    ])
+    students_df = pd.DataFrame([{'student_id': f'S{i:03d}', 'name': f'Student {i}'} for i in range(12)])
+    enrollments_df = pd.DataFrame([
+        {'student_id': f'S{i:03d}', 'course_id': f'C{(i + k) % 6:03d}'} for i in range(12) for k in range(2)
+    ])
+    rooms_df = pd.DataFrame([{'room_id': 'R001', 'name': 'Room A', 'capacity': 30}])
+    
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02', '2024-05-03'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {'engine': 'greedy', 'coloring': 'rlf'}
+    }
+    
+    result = schedule(courses_df, students_df, rooms_df, enrollments_df, config)
+    
+    assert len(result['timetable']) == 6
+    assert result['score'] == 1000
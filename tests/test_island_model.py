@@ -0,0 +1,62 @@
+import random
+import pytest
+import pandas as pd
+from app.island_model import migrate, migration_targets
+from app.scheduler_core import schedule
+
+def test_migration_targets_topologies():
+    """Each topology sends migrants to the expected islands"""
+    
+    rng = random.Random(0)
+    
+    assert migration_targets(3, 'ring', rng) == [[1], [2], [0]]
+    assert migration_targets(3, 'complete', rng) == [[1, 2], [0, 2], [0, 1]]
+    
+    for i, targets in enumerate(migration_targets(4, 'random', rng)):
+        assert len(targets) == 1 and targets[0] != i
+    
+    with pytest.raises(ValueError, match="Unknown migration topology"):
+        migration_targets(3, 'star', rng)
+
+def test_migrate_replaces_worst_with_best():
+    """Best individuals of a source island overwrite the worst of its target"""
+    
+    islands = [
+        ([[0, 0], [1, 1], [2, 2]], [10.0, 30.0, 20.0]),
+        ([[5, 5], [6, 6], [7, 7]], [1.0, 3.0, 2.0])
+    ]
+    
+    migrate(islands, migration_size=1, topology='ring', rng=random.Random(0))
+    
+    # Island 0 sends [1, 1] (30) over island 1's worst [5, 5] (1)
+    assert islands[1][0] == [[1, 1], [6, 6], [7, 7]]
+    assert islands[1][1] == [30.0, 3.0, 2.0]
+    # Island 1 sends [6, 6] (3) over island 0's worst [0, 0] (10)
+    assert islands[0][0] == [[6, 6], [1, 1], [2, 2]]
+
+def test_schedule_island_mode():
+    """Island mode returns a full timetable"""
+    
+    courses_df = pd.DataFrame([
+        {'course_id': f'C{i:03d}', 'code': f'CODE{i}', 'name': f'Course {i}'} for i in range(4)
+    ])
+    students_df = pd.DataFrame([{'student_id': f'S{i:03d}', 'name': f'Student {i}'} for i in range(6)])
+    enrollments_df = pd.DataFrame([
+        {'student_id': f'S{i:03d}', 'course_id': f'C{(i + k) % 4:03d}'} for i in range(6) for k in range(2)
+    ])
+    rooms_df = pd.DataFrame([{'room_id': 'R001', 'name': 'Room A', 'capacity': 30}])
+    
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {
+            'population_size': 6,
+            'generations': 5,
+            'islands': {'count': 2, 'migration_interval': 2, 'migration_size': 1, 'workers': 2}
+        }
+    }
+    
+    result = schedule(courses_df, students_df, rooms_df, enrollments_df, config)
+    
+    assert len(result['timetable']) == 4
+    assert isinstance(result['score'], float)
@@ -0,0 +1,110 @@
+import pytest
+import time
+import threading
+import asyncio
+from concurrent.futures import CancelledError
+from fastapi import HTTPException
+from app.jobs import JobQueue, JobCancelled, check_cancelled
+from app.artifact_store import get_run, list_runs
+from app.routes import schedule as schedule_route
+
+def add(a, b, stop_event=None):
+    return a + b
+
+def fail(message, stop_event=None):
+    raise ValueError(message)
+
+def wait_for_cancel(stop_event=None):
+    while True:
+        check_cancelled(stop_event)
+        time.sleep(0.01)
+
+def wait_done(queue, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while queue.status(job_id)['status'] in ('queued', 'running', 'cancelling'):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+    return queue.status(job_id)
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(workers=1, max_pending=5, keep_finished=10)
+    yield queue
+    queue.shutdown(wait=True)
+
+def test_job_results_and_errors(queue):
+    """Jobs run in a worker process; failures keep their exception"""
+
+    ok = queue.submit(add, 2, 3)
+    bad = queue.submit(fail, "bad data")
+
+    assert wait_done(queue, ok)['status'] == 'succeeded'
+    assert queue.result(ok) == 5
+
+    status = wait_done(queue, bad)
+    assert status['status'] == 'failed'
+    assert status['error'] == "bad data"
+    with pytest.raises(ValueError):
+        queue.result(bad)
+    assert queue.status('missing') is None
+
+def test_cancel_running_and_queued(queue):
+    """A running job stops at its next check and a queued one never starts"""
+
+    running = queue.submit(wait_for_cancel)
+    queued = queue.submit(add, 1, 1)
+
+    assert queue.cancel(queued)
+    assert queue.cancel(running)
+    assert wait_done(queue, running)['status'] == 'cancelled'
+    assert wait_done(queue, queued)['status'] == 'cancelled'
+    with pytest.raises(CancelledError):
+        queue.result(running)
+    assert not queue.cancel(running)
+
+def test_schedule_job_error_maps_to_status(queue, monkeypatch, tmp_path):
+    """POST /schedule returns a job ID; a failed run's result carries the pipeline's status code"""
+    monkeypatch.setattr(schedule_route, 'job_queue', queue)
+    # Runs are stored under tmp_path; the worker forks after the patch
+    root = str(tmp_path / 'runs')
+    build_config = schedule_route.build_config
+    monkeypatch.setattr(schedule_route, 'build_config',
+                        lambda request: dict(build_config(request), artifacts={'directory': root}))
+    monkeypatch.setattr(schedule_route, 'artifacts_root', lambda: root)
+
+    request = schedule_route.ScheduleRequest(
+        students_csv_path='missing/students.csv',
+        courses_csv_path='missing/courses.csv',
+        rooms_csv_path='missing/rooms.csv'
+    )
+    job = asyncio.run(schedule_route.run_schedule_pipeline(request, cache_control=None))
+    assert job['status'] == 'queued'
+
+    wait_done(queue, job['job_id'])
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(schedule_route.get_schedule_result(job['job_id']))
+    assert excinfo.value.status_code == 400
+    assert "Error reading CSV files" in excinfo.value.detail
+
+    # The failed run is recorded in the artifact store under the job ID
+    run = get_run(root, job['job_id'])
+    assert run['status'] == 'failed'
+    assert run['metadata']['input_hashes']['students'] is None
+
+def test_cancel_during_export_ends_cancelled(monkeypatch, tmp_path):
+    """A cancel that arrives after the last stage check still ends the run as cancelled"""
+    root = str(tmp_path / 'runs')
+    build_config = schedule_route.build_config
+    monkeypatch.setattr(schedule_route, 'build_config',
+                        lambda request: dict(build_config(request), artifacts={'directory': root}))
+    stop_event = threading.Event()
+
+    def export_then_cancel(request, config, run_directory, timings, stop_event):
+        stop_event.set()
+        return {'status': 'success', 'score': 1.0, 'statistics': {}, 'files': {}}
+    monkeypatch.setattr(schedule_route, 'execute_pipeline', export_then_cancel)
+
+    request = {'students_csv_path': 's.csv', 'courses_csv_path': 'c.csv', 'rooms_csv_path': 'r.csv'}
+    with pytest.raises(JobCancelled):
+        schedule_route.run_pipeline(request, stop_event=stop_event)
+    assert [run['status'] for run in list_runs(root)] == ['cancelled']
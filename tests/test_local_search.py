@@ -0,0 +1,72 @@
+import random
+import numpy as np
+import pandas as pd
+from app.fitness import compile_fitness_data, init_eval_state
+from app.local_search import course_neighbors, conflicted_courses, kempe_chain, local_search
+from app.scheduler_core import schedule
+
+def ring_data(n_courses=6, n_days=3):
+    """Courses in a ring of shared students: colorable with two days when even"""
+    courses = [f'C{i:03d}' for i in range(n_courses)]
+    enrollments_df = pd.DataFrame([
+        {'student_id': f'S{i:03d}', 'course_id': courses[(i + k) % n_courses]}
+        for i in range(n_courses) for k in range(2)
+    ])
+    time_slots = [
+        {'date': f'2024-05-{d + 1:02d}', 'start_time': start, 'end_time': '12:00'}
+        for d in range(n_days) for start in ('09:00', '14:00')
+    ]
+    return compile_fitness_data(courses, enrollments_df, time_slots)
+
+def test_course_neighbors_and_conflicts():
+    """Adjacency follows shared students and conflicts follow same-day pairs"""
+
+    data = ring_data()
+    neighbors = course_neighbors(data)
+    assert neighbors[0].tolist() == [1, 5]
+    assert neighbors[3].tolist() == [2, 4]
+
+    # C000 and C001 share day 0, the rest are spread out
+    state = init_eval_state([0, 1, 2, 4, 2, 4], data)
+    assert conflicted_courses(state, data).tolist() == [0, 1]
+
+def test_kempe_chain_stays_on_two_days():
+    """The chain contains only courses on the two days, connected to the start course"""
+
+    data = ring_data()
+    neighbors = course_neighbors(data)
+    genes = np.array([0, 2, 0, 2, 4, 4])  # days 0, 1, 0, 1, 2, 2
+    chain = kempe_chain(0, 1, genes, neighbors, data['slot_day'])
+    assert chain == [0, 1, 2, 3]
+
+def test_local_search_reaches_feasibility():
+    """Tabu search removes all violations from a single-day timetable"""
+
+    data = ring_data(n_courses=8, n_days=2)
+    genes, state = local_search([0] * 8, data, course_neighbors(data), max_iterations=100,
+                                rng=random.Random(1))
+
+    assert state['violations'] == 0
+    assert init_eval_state(genes, data)['violations'] == 0
+
+def test_schedule_memetic_mode():
+    """The GA with local search finds a feasible timetable without seeding"""
+
+    courses_df = pd.DataFrame([{'course_id': f'C{i:03d}', 'code': f'CODE{i}', 'name': f'Course {i}'} for i in range(10)])
+    students_df = pd.DataFrame([{'student_id': f'S{i:03d}'} for i in range(10)])
+    enrollments_df = pd.DataFrame([
+        {'student_id': f'S{i:03d}', 'course_id': f'C{(i + k) % 10:03d}'} for i in range(10) for k in range(2)
+    ])
+    rooms_df = pd.DataFrame([{'room_id': 'R001', 'capacity': 30}])
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {
+            'population_size': 10, 'generations': 50, 'stop_when_feasible': True,
+            'local_search': {'enabled': True, 'rate': 0.2, 'max_iterations': 50}
+        }
+    }
+
+    result = schedule(courses_df, students_df, rooms_df, enrollments_df, config)
+    assert result['score'] == 1000
+    assert result['search']['stop_reason'] == 'target_reached'
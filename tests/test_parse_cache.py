@@ -0,0 +1,62 @@
+import os
+import pandas as pd
+from app.parse_cache import cached_parse_csvs, evict, _write_frame, _read_frame
+
+def write_csvs(directory, students="S001,Alice,MATH101;PHYS101\nS002,Bob,PHYS101"):
+    paths = []
+    for name, content in [
+        ('students.csv', "student_id,name,enrolled_courses\n" + students),
+        ('courses.csv', "course_id,code,name\nC001,MATH101,Mathematics\nC002,PHYS101,Physics"),
+        ('rooms.csv', "room_id,name,capacity\nR001,Room A,30")
+    ]:
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        paths.append(path)
+    return paths
+
+def test_cache_hit_and_content_key(tmp_path):
+    """Same content hits the cache, changed content is parsed again"""
+    
+    paths = write_csvs(tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+    
+    first = cached_parse_csvs(*paths, cache_dir=cache_dir)
+    second = cached_parse_csvs(*paths, cache_dir=cache_dir)
+    
+    assert not first['cache']['hit'] and second['cache']['hit']
+    for name in ('students', 'courses', 'rooms', 'enrollments'):
+        pd.testing.assert_frame_equal(first[name], second[name])
+    
+    write_csvs(tmp_path, students="S001,Alice,MATH101")
+    third = cached_parse_csvs(*paths, cache_dir=cache_dir)
+    assert not third['cache']['hit']
+    assert len(third['enrollments']) == 1
+
+def test_eviction_keeps_newest(tmp_path):
+    """Least recently used entries are evicted once the cache exceeds its size"""
+    
+    paths = write_csvs(tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+    old_key = cached_parse_csvs(*paths, cache_dir=cache_dir)['cache']['key']
+    
+    write_csvs(tmp_path, students="S003,Carol,MATH101")
+    new_key = cached_parse_csvs(*paths, cache_dir=cache_dir, max_bytes=1)['cache']['key']
+    
+    assert os.listdir(cache_dir) == [new_key]
+    assert evict(cache_dir, 1, keep=new_key) == []
+    assert old_key != new_key
+
+def test_entries_are_parquet(tmp_path):
+    """Entries are parquet only; mixed-type object columns are stored as strings"""
+    
+    paths = write_csvs(tmp_path)
+    cache_dir = str(tmp_path / 'cache')
+    key = cached_parse_csvs(*paths, cache_dir=cache_dir)['cache']['key']
+    
+    files = sorted(os.listdir(os.path.join(cache_dir, key)))
+    assert files == ['courses.parquet', 'enrollments.parquet', 'meta.json', 'rooms.parquet', 'students.parquet']
+    
+    _write_frame(pd.DataFrame({'mixed': ['a', 1, None]}), str(tmp_path / 'frame'))
+    mixed = _read_frame(str(tmp_path / 'frame'))['mixed']
+    assert mixed[:2].tolist() == ['a', '1'] and pd.isna(mixed[2])
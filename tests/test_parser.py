@@ -127,4 +127,75 @@ R001,Room A,30"""
         enrollments = result['enrollments']
         assert len(enrollments[enrollments['student_id'] == 'S001']) == 2
         assert len(enrollments[enrollments['student_id'] == 'S002']) == 2
-        assert len(enrollments[enrollments['student_id'] == 'S003']) == 2
\ No newline at end of file
+        assert len(enrollments[enrollments['student_id'] == 'S003']) == 2
+def test_parse_enrollments_unknown_codes():
+    """Unknown codes are counted once in a report instead of being dropped silently"""
+    from app.parser import parse_enrollments
+    
+    students_df = pd.DataFrame({
+        'student_id': ['S001', 'S002', 'S003'],
+        'enrolled_courses': ['MATH101, XYZ999', 'XYZ999 | PHYS101', None]
+    })
+    courses_df = pd.DataFrame({'course_id': ['C001', 'C002'], 'code': ['MATH101', 'PHYS101']})
+    
+    enrollments_df, unknown_codes = parse_enrollments(students_df, courses_df)
+    
+    assert enrollments_df.values.tolist() == [['S001', 'C001'], ['S002', 'C002']]
+    assert unknown_codes == {'XYZ999': 2}
+
+def test_parse_csvs_streaming_matches_whole_file():
+    """Streaming the students file in small chunks compiles the same instance"""
+    from app.parser import parse_csvs_streaming
+    from app.problem_instance import compile_instance
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        students_path = os.path.join(temp_dir, "students.csv")
+        with open(students_path, 'w') as f:
+            f.write("""Student_ID,name,section,enrolled_courses
+S001,Alice,A,MATH101;PHYS101
+S002,Bob,B,PHYS101|CHEM101|BIO999
+S003,Charlie,A,MATH101
+S004,Diana,B,CHEM101;MATH101""")
+        
+        courses_path = os.path.join(temp_dir, "courses.csv")
+        with open(courses_path, 'w') as f:
+            f.write("""course_id,code,name
+C001,MATH101,Mathematics
+C002,PHYS101,Physics
+C003,CHEM101,Chemistry""")
+        
+        rooms_path = os.path.join(temp_dir, "rooms.csv")
+        with open(rooms_path, 'w') as f:
+            f.write("""room_id,name,capacity
+R001,Room A,30""")
+        
+        config = {'exam_days': ['2024-05-01'], 'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}]}
+        streamed = parse_csvs_streaming(students_path, courses_path, rooms_path, config, chunksize=3)
+        whole = compile_instance(parse_csvs(students_path, courses_path, rooms_path), config)
+        
+        instance = streamed['instance']
+        assert streamed['unknown_codes'] == {'BIO999': 1}
+        assert instance.student_ids == whole.student_ids
+        assert instance.student_sections == whole.student_sections
+        assert instance.enroll_student.tolist() == whole.enroll_student.tolist()
+        assert instance.enroll_course.tolist() == whole.enroll_course.tolist()
+        
+        # Columns are still validated on the first chunk
+        with open(students_path, 'w') as f:
+            f.write("id,name\nS001,Alice")
+        with pytest.raises(ValueError, match="Missing required column"):
+            parse_csvs_streaming(students_path, courses_path, rooms_path, config, chunksize=3)
+
+def test_parse_enrollments_compact():
+    """Compact parsing returns categorical IDs equal to the plain parse"""
+    from app.parser import parse_enrollments
+    
+    students_df = pd.DataFrame({'student_id': ['S001', 'S002'], 'enrolled_courses': ['MATH101;PHYS101', 'PHYS101']})
+    courses_df = pd.DataFrame({'course_id': ['C001', 'C002'], 'code': ['MATH101', 'PHYS101']})
+    
+    plain, _ = parse_enrollments(students_df, courses_df)
+    compact, _ = parse_enrollments(students_df, courses_df, compact=True)
+    
+    assert isinstance(compact['student_id'].dtype, pd.CategoricalDtype)
+    assert compact['course_id'].cat.codes.tolist() == [0, 1, 1]
+    assert compact.astype(str).values.tolist() == plain.values.tolist()
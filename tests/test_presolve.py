@@ -0,0 +1,63 @@
+import pandas as pd
+from app.problem_instance import compile_instance
+from app.conflict_graph import build_conflict_graph
+from app.presolve import analyze_feasibility, feasibility_message
+
+CONFIG = {
+    'max_exams_per_student_per_day': 1,
+    'exam_days': ['2024-05-01', '2024-05-02'],
+    'exam_slots': [
+        {'start_time': '09:00', 'end_time': '12:00'},
+        {'start_time': '14:00', 'end_time': '17:00'}
+    ]
+}
+
+def make_instance(pairs, capacity=10):
+    """Instance with one room and the given (student_id, course_id) enrollments"""
+    enrollments = pd.DataFrame(pairs, columns=['student_id', 'course_id'])
+    courses = sorted(enrollments['course_id'].unique())
+    return compile_instance({
+        'students': pd.DataFrame({'student_id': enrollments['student_id'].unique()}),
+        'courses': pd.DataFrame([{'course_id': c, 'code': c, 'name': c} for c in courses]),
+        'rooms': pd.DataFrame([{'room_id': 'R001', 'capacity': capacity}]),
+        'enrollments': enrollments
+    }, CONFIG)
+
+def test_feasible_instance():
+    """A path of conflicts fits two days and needs no extra days"""
+
+    instance = make_instance([('S1', 'C1'), ('S1', 'C2'), ('S2', 'C2'), ('S2', 'C3')])
+    report = analyze_feasibility(instance, CONFIG)
+
+    assert report['feasible']
+    assert report['min_days'] == 2
+    assert report['coloring_days'] == 2
+    assert report['extra_days_needed'] == 0
+
+def test_clique_bound():
+    """Three pairwise conflicting courses need three days even though no student takes all three"""
+
+    instance = make_instance([('S1', 'C1'), ('S1', 'C2'), ('S2', 'C2'), ('S2', 'C3'), ('S3', 'C1'), ('S3', 'C3')])
+    graph = build_conflict_graph(None, instance=instance)
+    report = analyze_feasibility(instance, CONFIG, graph)
+
+    assert not report['feasible']
+    assert sorted(report['max_clique']) == ['C1', 'C2', 'C3']
+    assert report['extra_days_needed'] == 1
+    assert not report['overloaded_students']
+    assert "1 more exam day" in feasibility_message(report)
+
+def test_overloaded_students_and_capacity():
+    """Students with too many exams and courses larger than all rooms are reported"""
+
+    instance = make_instance([('S1', 'C1'), ('S1', 'C2'), ('S1', 'C3'), ('S2', 'C1'), ('S3', 'C1')], capacity=2)
+    report = analyze_feasibility(instance, dict(CONFIG, max_exams_per_student_per_day=2))
+
+    # Two exams a day fit S1's three exams, but course C1 never fits one slot
+    assert report['overloaded_students'] == []
+    assert report['oversized_courses'] == [{'course_id': 'C1', 'students': 3}]
+    assert report['coloring_days'] is None
+
+    report = analyze_feasibility(instance, CONFIG)
+    assert report['overloaded_students'] == [{'student_id': 'S1', 'exams': 3}]
+    assert report['extra_days_needed'] == 1
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from app.problem_instance import compile_instance
+from app.conflict_graph import build_conflict_graph
+from app.room_allocator import allocate_rooms
+from app.invigilator_assigner import assign_invigilators
+from app.scheduler_core import schedule
+
+def sample_data():
+    return {
+        'students': pd.DataFrame([
+            {'student_id': 'S001', 'section': 'A', 'batch_type': 'Regular'},
+            {'student_id': 'S002', 'section': 'B', 'batch_type': 'Evening'},
+            {'student_id': 'S003', 'section': 'A', 'batch_type': 'Regular'}
+        ]),
+        'courses': pd.DataFrame([
+            {'course_id': 'C001', 'code': 'MATH101', 'name': 'Mathematics'},
+            {'course_id': 'C002', 'code': 'PHYS101', 'name': 'Physics'},
+            {'course_id': 'C003', 'code': 'CHEM101', 'name': 'Chemistry'}
+        ]),
+        'rooms': pd.DataFrame([
+            {'room_id': 'R001', 'capacity': 2, 'num_columns': 2},
+            {'room_id': 'R002', 'capacity': 10, 'num_columns': 3}
+        ]),
+        'enrollments': pd.DataFrame([
+            {'student_id': 'S001', 'course_id': 'C001'},
+            {'student_id': 'S001', 'course_id': 'C002'},
+            {'student_id': 'S002', 'course_id': 'C002'},
+            {'student_id': 'S003', 'course_id': 'C001'},
+            {'student_id': 'S003', 'course_id': 'C003'}
+        ])
+    }
+
+CONFIG = {
+    'exam_days': ['2024-05-01', '2024-05-02'],
+    'exam_slots': [
+        {'start_time': '09:00', 'end_time': '12:00'},
+        {'start_time': '14:00', 'end_time': '17:00'}
+    ],
+    'optimization': {'population_size': 10, 'generations': 5}
+}
+
+def test_compile_instance_arrays():
+    """Enrollment CSR arrays agree with the enrollments DataFrame in both directions"""
+
+    data = sample_data()
+    instance = compile_instance(data, CONFIG)
+
+    assert instance.n_courses == 3
+    assert instance.n_students == 3
+    assert instance.course_sizes.tolist() == [2, 2, 1]
+    assert instance.slot_day.tolist() == [0, 0, 1, 1]
+    assert instance.n_days == 2
+
+    for course, course_id in enumerate(instance.course_ids):
+        expected = data['enrollments'][data['enrollments']['course_id'] == course_id]['student_id']
+        assert sorted(instance.student_ids[s] for s in instance.students_of(course)) == sorted(expected)
+
+    s001 = instance.student_index['S001']
+    assert sorted(instance.course_ids[c] for c in instance.courses_of(s001)) == ['C001', 'C002']
+    assert instance.student_batch_types[instance.student_index['S002']] == 'Evening'
+
+def test_compile_instance_rooms_and_unknown_courses():
+    """Rooms are sorted largest first and unknown enrollment courses are dropped"""
+
+    data = sample_data()
+    data['enrollments'] = pd.concat([
+        data['enrollments'], pd.DataFrame([{'student_id': 'S004', 'course_id': 'C999'}])
+    ], ignore_index=True)
+    instance = compile_instance(data, CONFIG)
+
+    assert [room['room_id'] for room in instance.rooms] == ['R002', 'R001']
+    assert instance.total_capacity == 12
+    assert len(instance.enroll_course) == 5
+    assert 'S004' in instance.student_index
+
+def test_pipeline_stages_share_instance():
+    """Graph, scheduler, rooms and invigilators produce the same output with an instance"""
+
+    data = sample_data()
+    invigilators_df = pd.DataFrame([
+        {'teacher_id': 'T001', 'availability': [{'date': '2024-05-01', 'time': '09:00-12:00'}]},
+        {'teacher_id': 'T002', 'availability': []}
+    ])
+    instance = compile_instance(data, CONFIG, invigilators_df)
+
+    graph = build_conflict_graph(data['enrollments'], instance=instance)
+    assert set(map(frozenset, graph.edges())) == set(
+        map(frozenset, build_conflict_graph(data['enrollments']).edges())
+    )
+
+    np.random.seed(0)
+    result = schedule(data['courses'], data['students'], data['rooms'], data['enrollments'], CONFIG,
+                      instance=instance)
+    assert [exam['course_code'] for exam in result['timetable']] == ['MATH101', 'PHYS101', 'CHEM101']
+    assert sorted(result['timetable'][0]['assignments'][0]['students']) == ['S001', 'S003']
+
+    with_instance = allocate_rooms([dict(exam) for exam in result['timetable']], data['rooms'], CONFIG,
+                                   instance=instance)
+    without = allocate_rooms([dict(exam) for exam in result['timetable']], data['rooms'], CONFIG)
+    assert with_instance == without
+
+    assigned = assign_invigilators(with_instance, invigilators_df, CONFIG, instance=instance)
+    assert assigned == assign_invigilators(without, invigilators_df, CONFIG)
+
+def test_compact_ids_decode_in_exporter():
+    """Compact instances carry int32 student indices that only the exporter decodes"""
+    from app.exporter import decode_timetable
+
+    data = sample_data()
+    data['enrollments'] = data['enrollments'].astype('category')
+    config = dict(CONFIG, ingestion={'compact_ids': True})
+    instance = compile_instance(data, config)
+    plain = compile_instance(sample_data(), CONFIG)
+
+    assert instance.enroll_student.dtype == np.int32
+    assert instance.enroll_student.tolist() == plain.enroll_student.tolist()
+    assert instance.enroll_course.tolist() == plain.enroll_course.tolist()
+
+    result = schedule(data['courses'], data['students'], data['rooms'], data['enrollments'], config,
+                      instance=instance)
+    assert result['timetable'][0]['assignments'][0]['students'].dtype == np.int32
+
+    timetable = decode_timetable(allocate_rooms(result['timetable'], data['rooms'], config, instance=instance),
+                                 instance)
+    assert sorted(timetable[0]['assignments'][0]['students']) == ['S001', 'S003']
+    assert {seat['student_id'] for seat in timetable[0]['assignments'][0]['seat_assignments']} == {'S001', 'S003'}
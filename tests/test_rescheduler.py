@@ -0,0 +1,57 @@
+import pandas as pd
+from app.problem_instance import compile_instance
+from app.fitness import fitness_data_from_instance
+from app.rescheduler import previous_assignment, affected_courses
+from app.scheduler_core import schedule
+
+CONFIG = {
+    'exam_days': ['2024-05-01', '2024-05-02', '2024-05-03'],
+    'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}, {'start_time': '14:00', 'end_time': '17:00'}],
+    'optimization': {'population_size': 10, 'generations': 30, 'stop_when_feasible': True}
+}
+
+def chain_data(n_courses=8, extra=()):
+    """Students taking consecutive course pairs, plus extra (student, course) enrollments"""
+    courses = [f'C{i}' for i in range(n_courses)]
+    rows = [(f'S{i}', courses[i + k]) for i in range(n_courses - 1) for k in range(2)] + list(extra)
+    enrollments = pd.DataFrame(rows, columns=['student_id', 'course_id'])
+    return {
+        'courses': pd.DataFrame([{'course_id': c, 'code': c, 'name': c} for c in courses]),
+        'students': pd.DataFrame({'student_id': enrollments['student_id'].unique()}),
+        'rooms': pd.DataFrame([{'room_id': 'R001', 'capacity': 30}]),
+        'enrollments': enrollments
+    }
+
+def test_previous_assignment_and_affected_courses():
+    """Previous slots are read by slot label and only clashing or new courses are affected"""
+
+    instance = compile_instance(chain_data(), CONFIG)
+    previous = {f'C{i}': i % 2 * 2 for i in range(7)}  # alternate days 0 and 1, C7 is new
+    previous['C0'] = {'slot_date': '2024-05-02', 'slot_time': '09:00-12:00'}
+
+    genes = previous_assignment(previous, instance)
+    assert genes.tolist() == [2, 2, 0, 2, 0, 2, 0, -1]
+
+    data = fitness_data_from_instance(instance)
+    assert affected_courses(genes, data) == [0, 1, 7]
+    assert affected_courses(genes, data, changed=[4]) == [0, 1, 4, 7]
+
+def test_reschedule_keeps_unaffected_courses():
+    """A late enrollment only moves courses around the new clash"""
+
+    data = chain_data()
+    first = schedule(data['courses'], data['students'], data['rooms'], data['enrollments'], CONFIG)
+    assert first['score'] == 1000
+
+    # A new student links C0 and C2; if they share a day, one of them must move
+    changed = chain_data(extra=[('S99', 'C0'), ('S99', 'C2')])
+    result = schedule(changed['courses'], changed['students'], changed['rooms'], changed['enrollments'],
+                      CONFIG, previous_timetable=first['timetable'], changed_courses=['C0', 'C2'])
+
+    assert result['score'] == 1000
+    moved = set(result['search']['moved_courses'])
+    assert moved <= {'C0', 'C1', 'C2', 'C3'}
+    kept = {e['course_id']: (e['slot_date'], e['slot_time']) for e in first['timetable']}
+    for entry in result['timetable']:
+        if entry['course_id'] not in moved:
+            assert (entry['slot_date'], entry['slot_time']) == kept[entry['course_id']]
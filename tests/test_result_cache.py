@@ -0,0 +1,95 @@
+import pytest
+import os
+import asyncio
+from fastapi import HTTPException
+from app.jobs import JobQueue
+from app.routes import schedule as schedule_route
+from app.artifact_store import create_run, record_run, find_cached_run
+from app.routes.schedule import ScheduleRequest, build_config, input_hashes, result_cache_key
+
+def make_request(tmp_path, **overrides):
+    paths = {}
+    for kind in ('students', 'courses', 'rooms'):
+        path = tmp_path / f"{kind}.csv"
+        if not path.exists():
+            path.write_text(f"{kind}_id\n1\n")
+        paths[f"{kind}_csv_path"] = str(path)
+    return ScheduleRequest(**paths, **overrides)
+
+def key_of(request):
+    return result_cache_key(request, build_config(request), input_hashes(request))
+
+def test_key_follows_contents_config_and_seed(tmp_path):
+    """The key depends on file contents, effective config and seed, not on paths or cache options"""
+
+    base = key_of(make_request(tmp_path))
+    assert key_of(make_request(tmp_path, no_cache=True)) == base
+    assert key_of(make_request(tmp_path, seed=7)) != base
+    assert key_of(make_request(tmp_path, max_global_exams_per_day=3)) != base
+
+    # Same contents under another name
+    copy = tmp_path / "copy.csv"
+    copy.write_text((tmp_path / "rooms.csv").read_text())
+    request = make_request(tmp_path)
+    assert key_of(request.model_copy(update={'rooms_csv_path': str(copy)})) == base
+
+    (tmp_path / "rooms.csv").write_text("rooms_id\n2\n")
+    assert key_of(make_request(tmp_path)) != base
+
+def test_cached_run_lookup(tmp_path):
+    """Only successful runs whose files still exist are hits"""
+    root = str(tmp_path / "runs")
+
+    run_id, directory = create_run(root)
+    path = os.path.join(directory, 'timetable.xlsx')
+    with open(path, 'wb') as f:
+        f.write(b'x')
+    response = {'status': 'success', 'score': 1.0, 'files': {'excel': path}}
+    record_run(root, run_id, {'status': 'success', 'score': 1.0}, files=response['files'],
+               response=response, cache_key='k')
+
+    failed, _ = create_run(root)
+    record_run(root, failed, {'status': 'failed'}, cache_key='f')
+
+    assert find_cached_run(root, 'k') == (run_id, response)
+    assert find_cached_run(root, 'f') == (None, None)
+    os.remove(path)
+    assert find_cached_run(root, 'k') == (None, None)
+
+def test_stored_run_status_fallback(tmp_path, monkeypatch):
+    """Runs the job queue does not know are answered from the artifact store"""
+    root = str(tmp_path / "runs")
+    monkeypatch.setattr(schedule_route, 'artifacts_root', lambda: root)
+    monkeypatch.setattr(schedule_route, 'job_queue', JobQueue())
+
+    run_id, directory = create_run(root)
+    response = {'status': 'success', 'score': 1.0, 'files': {}}
+    record_run(root, run_id, {'status': 'success', 'score': 1.0}, response=response, cache_key='k')
+
+    status = asyncio.run(schedule_route.get_schedule_job(run_id))
+    assert status['job_id'] == run_id and status['status'] == 'succeeded'
+    assert asyncio.run(schedule_route.get_schedule_result(run_id)) == response
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(schedule_route.get_schedule_job('..'))
+    assert excinfo.value.status_code == 404
+
+def test_only_exports_are_downloaded(tmp_path, monkeypatch):
+    """The exports of a run are served by name; its metadata and the index are not"""
+    root = str(tmp_path / "runs")
+    monkeypatch.setattr(schedule_route, 'artifacts_root', lambda: root)
+
+    run_id, directory = create_run(root)
+    with open(os.path.join(directory, 'timetable.pdf'), 'wb') as f:
+        f.write(b'%PDF')
+    record_run(root, run_id, {'status': 'success', 'score': 1.0})
+
+    response = asyncio.run(schedule_route.download_schedule_file(run_id, 'timetable.pdf'))
+    assert response.path == os.path.join(directory, 'timetable.pdf')
+    assert schedule_route.download_urls(run_id)['pdf'] == f"/schedule/jobs/{run_id}/files/timetable.pdf"
+
+    for job_id, name in [(run_id, 'meta.json'), (run_id, 'timetable.xlsx'), ('..', 'timetable.pdf'),
+                         (run_id, '../index.sqlite')]:
+        with pytest.raises(HTTPException) as excinfo:
+            asyncio.run(schedule_route.download_schedule_file(job_id, name))
+        assert excinfo.value.status_code == 404
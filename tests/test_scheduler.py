@@ -163,4 +163,156 @@ def test_empty_schedule():
     
     # Should return empty timetable
     assert len(result['timetable']) == 0
-    assert isinstance(result['score'], (int, float))
\ No newline at end of file
+    assert isinstance(result['score'], (int, float))
+
+def test_schedule_incremental_evaluation():
+    """Incremental evaluation mode produces a consistent score"""
+    
+    courses_df = pd.DataFrame([
+        {'course_id': f'C{i:03d}', 'code': f'CODE{i}', 'name': f'Course {i}'} for i in range(6)
+    ])
+    students_df = pd.DataFrame([{'student_id': f'S{i:03d}', 'name': f'Student {i}'} for i in range(10)])
+    enrollments_df = pd.DataFrame([
+        {'student_id': f'S{i:03d}', 'course_id': f'C{(i + k) % 6:03d}'} for i in range(10) for k in range(3)
+    ])
+    rooms_df = pd.DataFrame([{'room_id': 'R001', 'name': 'Room A', 'capacity': 30}])
+    
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02', '2024-05-03'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {'population_size': 10, 'generations': 5, 'incremental_evaluation': True}
+    }
+    
+    result = schedule(courses_df, students_df, rooms_df, enrollments_df, config)
+    
+    # Recount the best timetable's violations from scratch
+    day_of = {exam['course_id']: exam['slot_date'] for exam in result['timetable']}
+    violations = 0
+    for _, group in enrollments_df.groupby('student_id'):
+        days = group['course_id'].map(day_of)
+        violations += len(days) - days.nunique()
+    
+    assert len(result['timetable']) == 6
+    assert result['score'] == 1000 - violations * 1000
+
+def test_schedule_parallel_evaluation():
+    """Process-pool evaluation schedules every course with a valid score"""
+    
+    courses_df = pd.DataFrame([
+        {'course_id': f'C{i:03d}', 'code': f'CODE{i}', 'name': f'Course {i}'} for i in range(5)
+    ])
+    students_df = pd.DataFrame([{'student_id': f'S{i:03d}', 'name': f'Student {i}'} for i in range(8)])
+    enrollments_df = pd.DataFrame([
+        {'student_id': f'S{i:03d}', 'course_id': f'C{(i + k) % 5:03d}'} for i in range(8) for k in range(2)
+    ])
+    rooms_df = pd.DataFrame([{'room_id': 'R001', 'name': 'Room A', 'capacity': 30}])
+    
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02', '2024-05-03'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {
+            'population_size': 12,
+            'generations': 3,
+            'parallel': {'enabled': True, 'workers': 2, 'chunk_size': 5}
+        }
+    }
+    
+    result = schedule(courses_df, students_df, rooms_df, enrollments_df, config)
+    
+    assert len(result['timetable']) == 5
+    assert result['score'] <= 1000
+
+def _conflict_instance():
+    courses_df = pd.DataFrame([
+        {'course_id': f'C{i:03d}', 'code': f'CODE{i}', 'name': f'Course {i}'} for i in range(6)
+    ])
+    students_df = pd.DataFrame([{'student_id': f'S{i:03d}', 'name': f'Student {i}'} for i in range(12)])
+    enrollments_df = pd.DataFrame([
+        {'student_id': f'S{i:03d}', 'course_id': f'C{(i + k) % 6:03d}'} for i in range(12) for k in range(3)
+    ])
+    rooms_df = pd.DataFrame([{'room_id': 'R001', 'name': 'Room A', 'capacity': 30}])
+    return courses_df, students_df, rooms_df, enrollments_df
+
+def test_anytime_stops_when_feasible():
+    """The GA stops as soon as no student has two exams on one day"""
+    
+    config = {
+        'exam_days': [f'2024-05-{d:02d}' for d in range(1, 7)],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {
+            'population_size': 20, 'generations': 500, 'seed_fraction': 0.5,
+            'stop_when_feasible': True
+        }
+    }
+    
+    result = schedule(*_conflict_instance(), config)
+    
+    assert result['score'] == 1000
+    assert result['search']['stop_reason'] == 'target_reached'
+    assert result['search']['generations'] < 500
+
+def test_anytime_stagnation_and_time_limit():
+    """Stagnation and wall-clock limits end the run early"""
+    
+    # Two days for six mutually overlapping courses: never feasible
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {'population_size': 10, 'generations': 10000, 'stagnation_generations': 5}
+    }
+    
+    result = schedule(*_conflict_instance(), config)
+    assert result['search']['stop_reason'] == 'stagnation'
+    
+    config['optimization'] = {'population_size': 10, 'generations': 10**7, 'time_limit_seconds': 0.2}
+    result = schedule(*_conflict_instance(), config)
+    assert result['search']['stop_reason'] == 'time_limit'
+    assert result['search']['elapsed'] < 5
+
+def test_stagnation_needs_a_plateau():
+    """Slow but steady progress keeps the search going; only a plateau stops it"""
+    
+    from deap import tools
+    from app.scheduler_core import create_toolbox, evolve
+    
+    # The best score rises every second generation up to generation 20, then stays flat
+    generation = [0]
+    def evaluate_population(individuals):
+        score = min(generation[0] // 2, 10)
+        generation[0] += 1
+        return [score] * len(individuals)
+    
+    toolbox = create_toolbox(n_courses=4, n_slots=3)
+    toolbox.register("evaluate_population", evaluate_population)
+    population = toolbox.population(n=4)
+    
+    _, info = evolve(population, toolbox, 1.0, 1.0, 1000, tools.HallOfFame(1), stagnation=3)
+    
+    assert info['stop_reason'] == 'stagnation'
+    assert info['best_score'] == 10
+    assert info['generations'] == 23
+
+def test_anytime_stop_event_and_callback():
+    """A stop event returns the current best; the callback sees every generation"""
+    
+    import threading
+    
+    stop_event = threading.Event()
+    seen = []
+    
+    def on_generation(generation, best):
+        seen.append((generation, best.fitness.values[0]))
+        if generation == 3:
+            stop_event.set()
+    
+    config = {
+        'exam_days': ['2024-05-01', '2024-05-02'],
+        'exam_slots': [{'start_time': '09:00', 'end_time': '12:00'}],
+        'optimization': {'population_size': 10, 'generations': 100}
+    }
+    
+    result = schedule(*_conflict_instance(), config, stop_event=stop_event, progress_callback=on_generation)
+    
+    assert result['search']['stop_reason'] == 'cancelled'
+    assert [generation for generation, _ in seen] == [1, 2, 3]
+    assert result['score'] == seen[-1][1]
@@ -0,0 +1,117 @@
+import pytest
+import os
+import asyncio
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.routes import upload
+from app.routes.upload import UploadWriter, request_size_limit
+
+STUDENTS = b"Student_ID,name,enrolled_courses\nS001,Alice,MATH101\nS002,Bob,PHYS101\n"
+COURSES = b"course_id,code,name\nC001,MATH101,Mathematics\n"
+ROOMS = b"room_id,name,capacity\nR001,Room A,30\n"
+
+def write_all(content, directory, max_bytes=0, kind='students', chunk_size=16):
+    writer = UploadWriter(kind, directory, max_bytes)
+    try:
+        for i in range(0, len(content), chunk_size):
+            writer.write(content[i:i + chunk_size])
+        return writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
+
+def multipart_request(parts, chunk_size=None, content_length=True):
+    """
+    Starlette Request with a multipart body of (field, filename, content)
+    parts, delivered in chunks of chunk_size bytes; also returns the list of
+    chunks the app has read.
+    """
+    boundary = b'testboundary'
+    body = b''
+    for field, filename, content in parts:
+        body += (b'--' + boundary + b'\r\nContent-Disposition: form-data; name="' + field.encode() +
+                 b'"; filename="' + filename.encode() + b'"\r\nContent-Type: text/csv\r\n\r\n' + content + b'\r\n')
+    body += b'--' + boundary + b'--\r\n'
+    headers = [(b'content-type', b'multipart/form-data; boundary=' + boundary)]
+    if content_length:
+        headers.append((b'content-length', str(len(body)).encode()))
+
+    chunk_size = chunk_size or len(body)
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    received = []
+
+    async def receive():
+        received.append(chunks[len(received)])
+        return {'type': 'http.request', 'body': received[-1], 'more_body': len(received) < len(chunks)}
+
+    return Request({'type': 'http', 'method': 'POST', 'path': '/upload', 'headers': headers}, receive), received
+
+def test_upload_writer_hashes_and_deduplicates(tmp_path):
+    """Uploads are written in chunks, stored by content hash and deduplicated"""
+
+    first = write_all(STUDENTS, str(tmp_path))
+    second = write_all(STUDENTS, str(tmp_path))
+
+    assert first['path'] == second['path'] == os.path.join(str(tmp_path), first['sha256'] + '.csv')
+    assert first['size'] == len(STUDENTS)
+    assert not first['deduplicated'] and second['deduplicated']
+    with open(first['path'], 'rb') as f:
+        assert f.read() == STUDENTS
+    assert os.listdir(tmp_path) == [first['sha256'] + '.csv']
+
+def test_upload_writer_rejects_bad_header_and_size(tmp_path):
+    """Missing columns and oversized files are rejected without leaving files behind"""
+
+    with pytest.raises(HTTPException) as error:
+        write_all(b"id,name\nS001,Alice\n", str(tmp_path))
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException) as error:
+        write_all(STUDENTS, str(tmp_path), max_bytes=32)
+    assert error.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+def test_upload_streams_form_in_one_pass(tmp_path, monkeypatch):
+    """A chunked form without Content-Length is parsed while it arrives and every file is stored"""
+    monkeypatch.setattr(upload.yaml, 'safe_load', lambda f: {'upload': {'directory': str(tmp_path)}})
+
+    request, _ = multipart_request(
+        [('students', 's.csv', STUDENTS), ('courses', 'c.csv', COURSES), ('rooms', 'r.csv', ROOMS)],
+        chunk_size=7, content_length=False
+    )
+    result = asyncio.run(upload.upload_csvs(request))
+
+    assert set(result['paths']) == {'students', 'courses', 'rooms'}
+    with open(result['paths']['rooms'], 'rb') as f:
+        assert f.read() == ROOMS
+    assert result['files']['students']['size'] == len(STUDENTS)
+
+def test_upload_rejects_bad_file_before_the_body_ends(tmp_path, monkeypatch):
+    """A bad header, an oversized body and missing files are all rejected without stored files"""
+    monkeypatch.setattr(upload.yaml, 'safe_load', lambda f: {'upload': {'directory': str(tmp_path)}})
+    big = STUDENTS + b"S003,Carol,MATH101\n" * 5000
+
+    # The students header is checked on its first chunk, long before the rest arrives
+    request, received = multipart_request(
+        [('students', 's.csv', b"id,name\n" + big), ('courses', 'c.csv', COURSES), ('rooms', 'r.csv', ROOMS)],
+        chunk_size=256
+    )
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(upload.upload_csvs(request))
+    assert error.value.status_code == 400
+    assert len(received) <= 2
+
+    # The running byte count enforces the limit when no Content-Length is sent
+    assert request_size_limit({kind: 1 for kind in upload.UPLOAD_KINDS}) == 4 * 1024 * 1024 + upload.MULTIPART_OVERHEAD
+    monkeypatch.setattr(upload, 'request_size_limit', lambda max_file_mb: 1024)
+    request, received = multipart_request([('students', 's.csv', big)], chunk_size=256, content_length=False)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(upload.upload_csvs(request))
+    assert error.value.status_code == 413
+    assert len(received) == 5
+
+    request, _ = multipart_request([('students', 's.csv', STUDENTS)])
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(upload.upload_csvs(request))
+    assert "courses file is required" in error.value.detail
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.part')] == []